@@ -21,14 +21,25 @@ Base utilities to build API operation managers and objects on top of.
 """
 import abc
 import copy
+import functools
+import hashlib
+import random
+import time
+import types
 
+from oslo_serialization import jsonutils
 from oslo_utils import reflection
 from oslo_utils import strutils
 from urllib import parse
 
 from heatclient._i18n import _
+from heatclient.common import catalog_cache
+from heatclient.common import utils
 from heatclient import exc as exceptions
 
+# Number of distinct sets of keys whose field index records share
+FIELD_INDEX_CACHE_SIZE = 256
+
 
 def getid(obj):
     """Return id if argument is a Resource.
@@ -86,6 +97,13 @@ class BaseManager(HookableMixin):
     etc.) and provide CRUD operations for them.
     """
     resource_class = None
+    record_class = None
+    # When True, accessing a missing attribute of an object which has not
+    # been loaded raises LazyLoadError instead of fetching it from the server
+    strict_loading = False
+    # Name of the local catalog cache of near-static managers
+    catalog_name = None
+    catalog = None
 
     def __init__(self, client):
         """Initializes BaseManager with `client`.
@@ -95,7 +113,71 @@ class BaseManager(HookableMixin):
         super().__init__()
         self.client = client
 
-    def _list(self, url, response_key=None, obj_class=None, json=None):
+    def enable_cache(self, cache_dir=None, ttl=catalog_cache.DEFAULT_TTL):
+        """Serve this manager's catalog from a local cache.
+
+        The catalog is kept in memory, and on disk per endpoint when
+        cache_dir is given, and is dropped when the build info of the
+        endpoint changes.
+
+        :param cache_dir: directory to store the catalog in, or None to only
+            cache it in memory
+        :param ttl: seconds after which entries are refreshed in the
+            background
+        """
+        def build_info():
+            return utils.get_response_body(self.client.get('/build_info'))
+
+        self.catalog = catalog_cache.CatalogCache(
+            self.catalog_name or type(self).__name__,
+            catalog_cache.client_endpoint(self.client),
+            cache_dir=cache_dir, ttl=ttl, build_info=build_info)
+
+    def _cached_list(self, url, response_key):
+        """List the collection, from the catalog cache when enabled.
+
+        :param url: a partial URL, e.g., '/servers'
+        :param response_key: the key to be looked up in response dictionary
+        """
+        if self.catalog is None:
+            return self._list(url, response_key)
+        data = self.catalog.get(
+            url, lambda: self.client.get(url).json()[response_key])
+        return [self.resource_class(self, res, loaded=True)
+                for res in data if res]
+
+    def prefetch(self, objs, fields=None,
+                 max_workers=utils.DEFAULT_CONCURRENCY):
+        """Load the details of many objects in one concurrent batch.
+
+        This avoids the one request per object which lazy loading performs
+        when iterating over partially loaded objects.
+
+        :param objs: iterable of :class:`Resource` objects
+        :param fields: only load objects which are missing one of these
+            attributes. All objects which have not been loaded yet are
+            loaded by default.
+        :param max_workers: maximum number of requests issued in parallel
+        :returns: list of the objects passed in
+        """
+        objs = list(objs)
+
+        def needs_load(obj):
+            if obj.is_loaded():
+                return False
+            if fields is None:
+                return True
+            return any(f not in obj.__dict__ for f in fields)
+
+        pending = [obj for obj in objs if needs_load(obj)]
+        errors = [error for obj, result, error in utils.run_concurrently(
+            lambda obj: obj.get(), pending, max_workers) if error]
+        if errors:
+            raise errors[0]
+        return objs
+
+    def _list(self, url, response_key=None, obj_class=None, json=None,
+              compact=False):
         """List the collection.
 
         :param url: a partial URL, e.g., '/servers'
@@ -106,6 +188,9 @@ class BaseManager(HookableMixin):
             (self.resource_class will be used by default)
         :param json: data that will be encoded as JSON and passed in POST
             request (GET will be sent by default)
+        :param compact: build read-only :class:`ResourceRecord` objects
+            (self.record_class) instead of full resources, which keeps
+            the memory footprint of large listings down
         """
         if json:
             body = self.client.post(url, json=json).json()
@@ -113,7 +198,10 @@ class BaseManager(HookableMixin):
             body = self.client.get(url).json()
 
         if obj_class is None:
-            obj_class = self.resource_class
+            if compact:
+                obj_class = self.record_class or ResourceRecord
+            else:
+                obj_class = self.resource_class
 
         data = body[response_key] if response_key is not None else body
         # NOTE(ja): keystone returns values as list as {'values': [ ... ]}
@@ -205,6 +293,53 @@ class BaseManager(HookableMixin):
         """
         return self.client.delete(url)
 
+    def _watch(self, url, response_key=None, interval=utils.WATCH_INTERVAL,
+               max_interval=utils.WATCH_MAX_INTERVAL, timeout=None):
+        """Poll an object, yielding its content each time it changes.
+
+        The current content is always yielded first. Requests are made
+        conditional when the server returns an ETag or Last-Modified
+        validator, and the content is otherwise compared by hash so that
+        unchanged responses are not yielded. The delay between polls doubles
+        while nothing changes, up to max_interval, and is jittered so that
+        many watchers don't poll in lockstep.
+
+        :param url: a partial URL, e.g., '/servers/my-server/metadata'
+        :param response_key: the key to be looked up in response dictionary
+        :param interval: initial seconds between polls
+        :param max_interval: maximum seconds between polls
+        :param timeout: stop watching after this many seconds
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        validators = {}
+        digest = None
+        delay = interval
+        while True:
+            resp = self.client.get(url, headers=validators or {})
+            changed = False
+            if resp.status_code != 304:
+                validators = {}
+                if resp.headers.get('ETag'):
+                    validators['If-None-Match'] = resp.headers['ETag']
+                if resp.headers.get('Last-Modified'):
+                    validators['If-Modified-Since'] = (
+                        resp.headers['Last-Modified'])
+                body = utils.get_response_body(resp) or {}
+                data = body.get(response_key) if response_key else body
+                new_digest = hashlib.sha256(
+                    jsonutils.dump_as_bytes(data, sort_keys=True)).digest()
+                if new_digest != digest:
+                    digest = new_digest
+                    changed = True
+                    yield data
+            delay = interval if changed else min(delay * 2, max_interval)
+            wait = random.uniform(delay / 2.0, delay)
+            if deadline is not None:
+                if time.monotonic() >= deadline:
+                    return
+                wait = min(wait, deadline - time.monotonic())
+            time.sleep(max(wait, 0))
+
 
 class ManagerWithFind(BaseManager, metaclass=abc.ABCMeta):
     """Manager with additional `find()`/`findall()` methods."""
@@ -462,6 +597,11 @@ class Resource:
         if k not in self.__dict__:
             # NOTE(bcwaldon): disallow lazy-loading if already loaded once
             if not self.is_loaded():
+                if getattr(self.manager, 'strict_loading', False):
+                    raise exceptions.LazyLoadError(
+                        _("Accessing %(attr)s would lazily load %(obj)s, "
+                          "use prefetch() instead") %
+                        {'attr': k, 'obj': self})
                 self.get()
                 return self.__getattr__(k)
 
@@ -510,5 +650,95 @@ class Resource:
     def set_loaded(self, val):
         self._loaded = val
 
-    def to_dict(self):
+    def to_dict(self, read_only=False):
+        """Return the resource attributes as a dict.
+
+        :param read_only: return a read-only view of the attributes instead
+            of a deep copy, which avoids copying large structures such as
+            stack outputs and parameters. Nested values are shared with the
+            resource and must not be modified.
+        """
+        if read_only:
+            return types.MappingProxyType(self._info)
+        return copy.deepcopy(self._info)
+
+
+@functools.lru_cache(maxsize=FIELD_INDEX_CACHE_SIZE)
+def _field_index(keys):
+    """Return the index of each of the keys, shared by records."""
+    return {k: i for i, k in enumerate(keys)}
+
+
+class ResourceRecord:
+    """Compact, read-only representation of a listed resource.
+
+    Unlike :class:`Resource`, a record keeps a single tuple of values and
+    resolves attributes through a field index which is shared by every
+    record with the same set of keys. Large listings therefore avoid a
+    per-instance ``__dict__`` and a second copy of the data in ``_info``.
+    """
+    __slots__ = ('manager', '_fields', '_values')
+
+    def __init__(self, manager, info, loaded=True):
+        """Populate and bind to a manager.
+
+        :param manager: BaseManager object
+        :param info: dictionary representing resource attributes
+        :param loaded: ignored, records are never lazy-loaded
+        """
+        object.__setattr__(self, 'manager', manager)
+        object.__setattr__(self, '_fields', _field_index(tuple(info)))
+        object.__setattr__(self, '_values', tuple(info.values()))
+
+    def __repr__(self):
+        info = ", ".join(f"{k}={getattr(self, k)}"
+                         for k in sorted(self._fields) if k[0] != '_')
+        class_name = reflection.get_class_name(self, fully_qualified=False)
+        return f"<{class_name} {info}>"
+
+    def __getattr__(self, k):
+        if k in ResourceRecord.__slots__:
+            raise AttributeError(k)
+        try:
+            return self._values[self._fields[k]]
+        except KeyError:
+            raise AttributeError(k)
+
+    def __setattr__(self, k, v):
+        raise AttributeError(
+            _("%(name)s is read-only") % {'name': type(self).__name__})
+
+    def __delattr__(self, k):
+        raise AttributeError(
+            _("%(name)s is read-only") % {'name': type(self).__name__})
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(self._fields))
+
+    def __reduce__(self):
+        return (self.__class__, (self.manager, self._info))
+
+    def __eq__(self, other):
+        if not isinstance(other, ResourceRecord):
+            return NotImplemented
+        if not isinstance(other, self.__class__):
+            return False
+        return self._info == other._info
+
+    __hash__ = None
+
+    @property
+    def _info(self):
+        return dict(zip(self._fields, self._values))
+
+    def is_loaded(self):
+        return True
+
+    def to_dict(self, read_only=False):
+        """Return the record attributes as a dict.
+
+        :param read_only: return a read-only view instead of a deep copy
+        """
+        if read_only:
+            return types.MappingProxyType(self._info)
         return copy.deepcopy(self._info)
@@ -0,0 +1,221 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""On-disk cache of near-static API catalogs, such as resource types."""
+
+import atexit
+import copy
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from oslo_serialization import jsonutils
+
+LOG = logging.getLogger(__name__)
+
+# Bumped whenever the layout of the cache files changes
+CACHE_VERSION = 1
+
+# Default seconds after which cached entries are refreshed
+DEFAULT_TTL = 24 * 60 * 60
+
+# Build info of each endpoint fetched by this process, shared by the caches
+# of all the managers
+_build_infos = {}
+_build_infos_lock = threading.Lock()
+
+
+def default_cache_dir():
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+        os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'heatclient')
+
+
+def client_endpoint(client):
+    """Return the endpoint URL an HTTP client sends its requests to."""
+    try:
+        endpoint = client.get_endpoint()
+    except Exception:
+        endpoint = None
+    if not isinstance(endpoint, str):
+        endpoint = getattr(client, 'endpoint', None)
+    return endpoint if isinstance(endpoint, str) else None
+
+
+class CatalogCache:
+    """Cache of API responses keyed by URL, persisted per endpoint.
+
+    Entries are served from memory once loaded, as copies. Entries older
+    than the TTL are still returned, but refreshed in a background thread
+    so that later lookups get the new value. Pending refreshes are waited
+    for before the cache is written to disk.
+
+    The whole cache is dropped when the build info of the endpoint changes,
+    e.g. after an upgrade of the service. The build info is checked when a
+    cache older than the TTL is loaded, at most once per process and
+    endpoint.
+
+    :param name: name of the catalog, used as cache file name
+    :param endpoint: endpoint URL the catalog belongs to
+    :param cache_dir: directory to store cache files in, or None to keep
+        the catalog in memory only
+    :param ttl: seconds after which entries are refreshed
+    :param build_info: callable returning the build info of the endpoint
+    """
+
+    def __init__(self, name, endpoint, cache_dir=None, ttl=DEFAULT_TTL,
+                 build_info=None):
+        self.name = name
+        self.ttl = ttl
+        self._endpoint = endpoint
+        self._build_info = build_info
+        self._path = None
+        if cache_dir and endpoint:
+            digest = hashlib.sha256(endpoint.encode('utf-8')).hexdigest()
+            self._path = os.path.join(cache_dir, digest, '%s.json' % name)
+        self._lock = threading.RLock()
+        self._entries = None
+        self._current_build_info = None
+        self._validated = None
+        # refresh threads by key
+        self._refreshing = {}
+        self._dirty = False
+        if self._path:
+            atexit.register(self.flush)
+
+    def get(self, key, loader):
+        """Return the cached value of key, calling loader on a miss.
+
+        :param key: cache key, usually the request URL
+        :param loader: callable fetching the current value from the API
+        """
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(key)
+            if entry is None:
+                stale = False
+            else:
+                stale = time.time() - entry['time'] > self.ttl
+                if stale and key not in self._refreshing:
+                    thread = threading.Thread(target=self._refresh,
+                                              args=(key, loader),
+                                              daemon=True)
+                    self._refreshing[key] = thread
+                    thread.start()
+        if entry is not None:
+            return copy.deepcopy(entry['value'])
+        value = loader()
+        self._store(key, value)
+        return copy.deepcopy(value)
+
+    def invalidate(self):
+        """Drop every cached entry, in memory and on disk."""
+        with self._lock:
+            self._entries = {}
+            self._dirty = False
+            if self._path:
+                try:
+                    os.remove(self._path)
+                except OSError:
+                    pass
+
+    def flush(self):
+        """Write the entries added since the last flush to disk.
+
+        Refreshes in progress are waited for, so that short-lived processes
+        don't exit before storing them.
+        """
+        with self._lock:
+            pending = list(self._refreshing.values())
+        for thread in pending:
+            thread.join()
+        with self._lock:
+            if not (self._path and self._dirty):
+                return
+            data = {'version': CACHE_VERSION,
+                    'build_info': self._current_build_info,
+                    'validated': self._validated,
+                    'entries': self._entries}
+            try:
+                os.makedirs(os.path.dirname(self._path), exist_ok=True)
+                fd, tmp = tempfile.mkstemp(
+                    dir=os.path.dirname(self._path), suffix='.tmp')
+                with os.fdopen(fd, 'w') as f:
+                    f.write(jsonutils.dumps(data))
+                os.replace(tmp, self._path)
+            except (OSError, TypeError, ValueError) as e:
+                LOG.debug('Unable to write %s cache: %s', self.name, e)
+                return
+            self._dirty = False
+
+    def _refresh(self, key, loader):
+        try:
+            self._store(key, loader())
+        except Exception as e:
+            LOG.debug('Unable to refresh %s cache entry %s: %s',
+                      self.name, key, e)
+        finally:
+            with self._lock:
+                self._refreshing.pop(key, None)
+
+    def _store(self, key, value):
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._load()[key] = {'time': time.time(), 'value': value}
+            self._dirty = bool(self._path)
+
+    def _endpoint_build_info(self):
+        with _build_infos_lock:
+            if self._endpoint not in _build_infos:
+                build_info = None
+                if self._build_info is not None:
+                    try:
+                        build_info = self._build_info()
+                    except Exception as e:
+                        LOG.debug('Unable to get build info: %s', e)
+                _build_infos[self._endpoint] = build_info
+            return _build_infos[self._endpoint]
+
+    def _load(self):
+        if self._entries is not None:
+            return self._entries
+        self._entries = {}
+        if not self._path:
+            return self._entries
+        try:
+            with open(self._path) as f:
+                data = jsonutils.loads(f.read())
+        except (OSError, ValueError):
+            data = None
+        if not (isinstance(data, dict) and
+                data.get('version') == CACHE_VERSION):
+            self._validate()
+            return self._entries
+        self._current_build_info = data.get('build_info')
+        self._validated = data.get('validated') or 0
+        if time.time() - self._validated <= self.ttl:
+            self._entries = data.get('entries') or {}
+        elif self._validate() == data.get('build_info'):
+            self._entries = data.get('entries') or {}
+        else:
+            LOG.debug('Discarding outdated %s cache %s',
+                      self.name, self._path)
+        return self._entries
+
+    def _validate(self):
+        self._current_build_info = self._endpoint_build_info()
+        self._validated = time.time()
+        self._dirty = True
+        return self._current_build_info
@@ -11,6 +11,7 @@
 #    under the License.
 
 import copy
+import threading
 import uuid
 
 from swiftclient import client as sc
@@ -26,7 +27,7 @@ def build_derived_config_params(action, source, name, input_values,
                                 server_id, signal_transport, signal_id=None):
 
     if isinstance(source, software_configs.SoftwareConfig):
-        source = source.to_dict()
+        source = source.to_dict(read_only=True)
     input_values = input_values or {}
     inputs = copy.deepcopy(source.get('inputs')) or []
 
@@ -91,19 +92,46 @@ def build_derived_config_params(action, source, name, input_values,
     }
 
 
+def derive_server_config_params(params, server_id, signal_id=None):
+    """Copy derived config params for a deployment to the given server.
+
+    :param params: params returned by build_derived_config_params
+    :param server_id: ID of the server being deployed to
+    :param signal_id: ID of signal to use for signaling output values
+    """
+    params = dict(params)
+    inputs = []
+    for inp in params['inputs']:
+        if inp['name'] == 'deploy_server_id':
+            inp = dict(inp, value=server_id)
+        elif inp['name'] == 'deploy_signal_id':
+            inp = dict(inp, value=signal_id)
+        inputs.append(inp)
+    params['inputs'] = inputs
+    return params
+
+
 def create_temp_url(swift_client, name, timeout, container=None):
 
     container = container or '{name}-{uuid}'.format(
         name=name, uuid=uuid.uuid4())
-    object_name = str(uuid.uuid4())
-
     swift_client.put_container(container)
+    key = _temp_url_key(swift_client)
+    return _put_temp_url(swift_client, container, key, timeout)
+
+
+def _temp_url_key(swift_client):
     key_header = 'x-account-meta-temp-url-key'
-    if key_header not in swift_client.head_account():
+    account = swift_client.head_account()
+    if key_header not in account:
         swift_client.post_account({
             key_header: str(uuid.uuid4())[:32]})
+        account = swift_client.head_account()
+    return account[key_header]
+
 
-    key = swift_client.head_account()[key_header]
+def _put_temp_url(swift_client, container, key, timeout):
+    object_name = str(uuid.uuid4())
     project_path = swift_client.url.split('/')[-1]
     path = f'/v1/{project_path}/{container}/{object_name}'
     timeout_secs = timeout * 60
@@ -115,22 +143,66 @@ def create_temp_url(swift_client, name, timeout, container=None):
     return put_url
 
 
-def build_signal_id(hc, args):
-    if args.signal_transport != 'TEMP_URL_SIGNAL':
-        return
-
+def _check_signal_auth(hc, args):
     # NOTE(pas-ha) only heatclient has os-no-client-auth arg,
     # osc plugin does not have it
     if getattr(args, 'os_no_client_auth', False):
         raise exc.CommandError(_(
             'Cannot use --os-no-client-auth, auth required to create '
             'a Swift TempURL.'))
+    # clients using a cached token have no keystone session
+    if getattr(hc.http_client, 'session', None) is None:
+        raise exc.CommandError(_(
+            'A keystone session is required to create a Swift TempURL, '
+            'the token cache can not be used.'))
+
+
+def build_signal_id(hc, args):
+    if args.signal_transport != 'TEMP_URL_SIGNAL':
+        return
+
+    _check_signal_auth(hc, args)
     swift_client = create_swift_client(
         hc.http_client.auth, hc.http_client.session, args)
 
     return create_temp_url(swift_client, args.name, args.timeout)
 
 
+def signal_id_factory(hc, args):
+    """Return a callable building a new signal ID on each call.
+
+    The TempURL objects of all the signals are stored in one container,
+    which is created, and the account TempURL key fetched, only once. Each
+    call then makes a single request, and the callable can be called from
+    several threads, each one using its own Swift connection.
+    """
+    if args.signal_transport != 'TEMP_URL_SIGNAL':
+        return lambda: None
+
+    _check_signal_auth(hc, args)
+
+    def connection():
+        return create_swift_client(
+            hc.http_client.auth, hc.http_client.session, args)
+
+    swift_client = connection()
+    container = getattr(args, 'container', None) or '{name}-{uuid}'.format(
+        name=args.name, uuid=uuid.uuid4())
+    swift_client.put_container(container)
+    key = _temp_url_key(swift_client)
+
+    local = threading.local()
+    local.swift_client = swift_client
+
+    def signal_id():
+        if getattr(local, 'swift_client', None) is None:
+            local.swift_client = connection()
+        return _put_temp_url(local.swift_client, container, key,
+                             args.timeout)
+
+    return signal_id
+
+
 def create_swift_client(auth, session, args):
     auth_token = auth.get_token(session)
     endpoint = auth.get_endpoint(session,
@@ -213,9 +213,7 @@ def poll_for_events(hc, stack_name, action=None, poll_period=5, marker=None,
             no_event_polls = 0
             # set marker to last event that was received.
             marker = getattr(events[-1], 'id', None)
-            events_log = utils.event_log_formatter(events, event_log_context)
-            out.write(events_log)
-            out.write('\n')
+            utils.write_event_log(events, out, event_log_context)
 
             for event in events:
                 # check if stack event was also received
@@ -253,9 +251,7 @@ def wait_for_events(ws, stack_name, out=None):
         event.event_time = data['timestamp']
         event.resource_status = '{}_{}'.format(event.resource_action,
                                                event.resource_status)
-        events_log = utils.event_log_formatter([event], event_log_context)
-        out.write(events_log)
-        out.write('\n')
+        utils.write_event_log([event], out, event_log_context)
         if data['payload']['resource_name'] == stack_name:
             stack_status = data['payload']['resource_status']
             if stack_status in ('COMPLETE', 'FAILED'):
@@ -10,10 +10,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import fnmatch
 import logging
 
 from heatclient._i18n import _
+from heatclient.common import utils
 from heatclient import exc
 
 logger = logging.getLogger(__name__)
@@ -35,6 +37,13 @@ def clear_hook(hc, stack_id, resource_name, hook_type):
 
 def clear_wildcard_hooks(hc, stack_id, stack_patterns, hook_type,
                          resource_pattern):
+    for stack, resource_name in _find_hook_resources_recursive(
+            hc, stack_id, stack_patterns, resource_pattern):
+        clear_hook(hc, stack, resource_name, hook_type)
+
+
+def _find_hook_resources_recursive(hc, stack_id, stack_patterns,
+                                   resource_pattern):
     if stack_patterns:
         for resource in hc.resources.list(stack_id):
             res_name = resource.resource_name
@@ -42,15 +51,113 @@ def clear_wildcard_hooks(hc, stack_id, stack_patterns, hook_type,
                 nested_stack = hc.resources.get(
                     stack_id=stack_id,
                     resource_name=res_name)
-                clear_wildcard_hooks(
+                yield from _find_hook_resources_recursive(
                     hc,
                     nested_stack.physical_resource_id,
-                    stack_patterns[1:], hook_type, resource_pattern)
+                    stack_patterns[1:], resource_pattern)
     else:
         for resource in hc.resources.list(stack_id):
             res_name = resource.resource_name
             if fnmatch.fnmatchcase(res_name, resource_pattern):
-                clear_hook(hc, stack_id, res_name, hook_type)
+                yield stack_id, res_name
+
+
+def _stack_identifier(resource):
+    for link in getattr(resource, 'links', None) or []:
+        if link.get('rel') == 'stack' and link.get('href'):
+            return '/'.join(link['href'].rstrip('/').split('/')[-2:])
+
+
+def _is_stack(identifier, stack_id):
+    """Return whether a stack name/id identifier matches stack_id.
+
+    stack_id may be a name, an id or a name/id identifier.
+    """
+    stack_id = stack_id.strip('/')
+    return stack_id == identifier or stack_id in identifier.split('/')
+
+
+def find_hook_resources(hc, stack_id, stack_patterns, resource_pattern):
+    """Find the resources matching a hook path.
+
+    The resources of all the nested stacks involved are fetched with a
+    single nested resource listing.
+
+    :param stack_patterns: list of patterns matching the nested stack
+        resources leading to the resources, one per nesting level
+    :param resource_pattern: pattern matching the resource names
+    :returns: list of (stack identifier, resource name) tuples, or None if
+        the listing does not carry enough information to resolve the path
+    """
+    if not stack_patterns:
+        return [(stack_id, resource.resource_name)
+                for resource in hc.resources.list(stack_id)
+                if fnmatch.fnmatchcase(resource.resource_name,
+                                       resource_pattern)]
+
+    # parent_resource is set on the resources of any nested stack, the
+    # inspected stack included when it is nested itself, so the resources
+    # are grouped by the stack they belong to instead
+    stacks = collections.defaultdict(list)
+    for resource in hc.resources.list(stack_id,
+                                      nested_depth=len(stack_patterns)):
+        identifier = _stack_identifier(resource)
+        if identifier is None:
+            return None
+        stacks[identifier].append(resource)
+
+    top_level = [identifier for identifier in stacks
+                 if _is_stack(identifier, stack_id)]
+    if len(top_level) != 1:
+        return None
+    level = [(top_level[0], stacks[top_level[0]])]
+    for pattern in stack_patterns:
+        next_level = []
+        for _stack_id, stack_resources in level:
+            for resource in stack_resources:
+                if not fnmatch.fnmatchcase(resource.resource_name, pattern):
+                    continue
+                nested_id = utils.resource_nested_identifier(resource)
+                if nested_id:
+                    next_level.append((nested_id, stacks.get(nested_id, [])))
+        level = next_level
+
+    return [(_stack_id, resource.resource_name)
+            for _stack_id, stack_resources in level
+            for resource in stack_resources
+            if fnmatch.fnmatchcase(resource.resource_name, resource_pattern)]
+
+
+def clear_hooks(hc, stack_id, hooks, hook_type,
+                max_workers=utils.DEFAULT_CONCURRENCY, rate_limit=None):
+    """Clear hooks on many resources concurrently.
+
+    :param hooks: list of hook paths such as ``nested_stack/an*/*_resource``
+    :param max_workers: maximum number of signals sent in parallel
+    :param rate_limit: maximum number of signals sent per second
+    :returns: generator of (stack identifier, resource name, error) tuples
+        in completion order, where error is None if the hook was cleared
+    """
+    targets = []
+    for hook_string in hooks:
+        hook = [b for b in hook_string.split('/') if b]
+        try:
+            found = find_hook_resources(hc, stack_id, hook[:-1], hook[-1])
+        except exc.HTTPBadRequest:
+            found = None
+        if found is None:
+            found = list(_find_hook_resources_recursive(
+                hc, stack_id, hook[:-1], hook[-1]))
+        targets.extend(found)
+    targets = list(dict.fromkeys(targets))
+
+    def unset_hook(target):
+        hc.resources.signal(stack_id=target[0], resource_name=target[1],
+                            data={'unset_hook': hook_type})
+
+    for target, result, error in utils.run_concurrently(
+            unset_hook, targets, max_workers, rate_limit):
+        yield target[0], target[1], error
 
 
 def get_hook_type_via_status(hc, stack_id):
@@ -58,7 +165,7 @@ def get_hook_type_via_status(hc, stack_id):
     # pre-delete based on the stack status, also sanity assertions
     # that we're in-progress.
     try:
-        stack = hc.stacks.get(stack_id=stack_id)
+        stack = hc.stacks.get(stack_id=stack_id, lazy_outputs=True)
     except exc.HTTPNotFound:
         raise exc.CommandError(_('Stack not found: %s') % stack_id)
     else:
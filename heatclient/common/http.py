@@ -13,11 +13,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import copy
 import hashlib
 import logging
 import os
 import socket
+import time
 
 from keystoneauth1 import adapter
 from oslo_serialization import jsonutils
@@ -27,6 +27,7 @@ import requests
 from urllib import parse
 
 from heatclient._i18n import _
+from heatclient.common import metrics
 from heatclient.common import utils
 from heatclient import exc
 
@@ -68,7 +69,50 @@ def get_system_ca_file():
     LOG.warning("System ca file could not be found.")
 
 
-class HTTPClient:
+class _RequestHooksMixin:
+    """Callbacks getting the metrics of each request sent by a client."""
+
+    # tuple so that hooks can be added while requests are sent
+    request_hooks = ()
+
+    def add_request_hook(self, hook):
+        """Call hook with the :class:`metrics.RequestRecord` of requests.
+
+        Hooks are called in the thread which sent the request, once it has
+        completed or failed, and their errors are ignored.
+        """
+        self.request_hooks = self.request_hooks + (hook,)
+
+    def remove_request_hook(self, hook):
+        self.request_hooks = tuple(h for h in self.request_hooks
+                                   if h != hook)
+
+    def _hooked_request(self, send, url, method, kwargs):
+        if not self.request_hooks:
+            return send(url, method, **kwargs)
+        responses = []
+
+        def on_response(resp, *args, **kw):
+            responses.append(resp)
+
+        hooks = dict(kwargs.get('hooks') or {})
+        hooks['response'] = list(hooks.get('response') or []) + [on_response]
+        kwargs['hooks'] = hooks
+        start = time.perf_counter()
+        try:
+            return send(url, method, **kwargs)
+        finally:
+            record = metrics.make_record(method, url, responses,
+                                         time.perf_counter() - start,
+                                         kwargs.get('data'))
+            for hook in self.request_hooks:
+                try:
+                    hook(record)
+                except Exception as e:
+                    LOG.debug('Request hook %s failed: %s', hook, e)
+
+
+class HTTPClient(_RequestHooksMixin):
 
     def __init__(self, endpoint, **kwargs):
         self.endpoint = endpoint
@@ -102,6 +146,10 @@ class HTTPClient:
         # we should move to inheriting this class from the oslo HTTPClient
         self.last_request_id = None
 
+        # requests.Session to send requests with, so that they reuse
+        # connections, see share_connections()
+        self.requests_session = None
+
     def safe_header(self, name, value):
         if name in SENSITIVE_HEADERS:
             # because in python3 byte string handling is ... ug
@@ -155,29 +203,38 @@ class HTTPClient:
             dump.extend([content, ''])
         LOG.debug('\n'.join(dump))
 
+    def _request_headers(self, headers):
+        # Copy the headers so we can reuse the original in case of redirects,
+        # their values are strings so a shallow copy is enough
+        headers = dict(headers or {})
+        headers.setdefault('User-Agent', USER_AGENT)
+        if self.auth_token:
+            headers.setdefault('X-Auth-Token', self.auth_token)
+        else:
+            headers.update(self.credentials_headers())
+        if self.auth_url:
+            headers.setdefault('X-Auth-Url', self.auth_url)
+        if self.region_name:
+            headers.setdefault('X-Region-Name', self.region_name)
+        if self.include_pass and 'X-Auth-Key' not in headers:
+            headers.update(self.credentials_headers())
+        if osprofiler_web:
+            headers.update(osprofiler_web.get_trace_id_headers())
+        return headers
+
     def _http_request(self, url, method, **kwargs):
         """Send an http request with the specified characteristics.
 
         Wrapper around requests.request to handle tasks such as
         setting headers and error handling.
         """
-        # Copy the kwargs so we can reuse the original in case of redirects
-        kwargs['headers'] = copy.deepcopy(kwargs.get('headers', {}))
-        kwargs['headers'].setdefault('User-Agent', USER_AGENT)
-        if self.auth_token:
-            kwargs['headers'].setdefault('X-Auth-Token', self.auth_token)
-        else:
-            kwargs['headers'].update(self.credentials_headers())
-        if self.auth_url:
-            kwargs['headers'].setdefault('X-Auth-Url', self.auth_url)
-        if self.region_name:
-            kwargs['headers'].setdefault('X-Region-Name', self.region_name)
-        if self.include_pass and 'X-Auth-Key' not in kwargs['headers']:
-            kwargs['headers'].update(self.credentials_headers())
-        if osprofiler_web:
-            kwargs['headers'].update(osprofiler_web.get_trace_id_headers())
+        kwargs['headers'] = self._request_headers(kwargs.get('headers'))
 
-        self.log_curl_request(method, url, kwargs)
+        # Building the log messages is costly, so only do it when they are
+        # going to be emitted
+        debug = LOG.isEnabledFor(logging.DEBUG)
+        if debug:
+            self.log_curl_request(method, url, kwargs)
 
         if self.cert_file and self.key_file:
             kwargs['cert'] = (self.cert_file, self.key_file)
@@ -207,7 +264,7 @@ class HTTPClient:
             url = self.endpoint_url + url
 
         try:
-            resp = requests.request(
+            resp = (self.requests_session or requests).request(
                 method,
                 url,
                 allow_redirects=allow_redirects,
@@ -222,11 +279,11 @@ class HTTPClient:
                        {'endpoint': endpoint, 'e': e})
             raise exc.CommunicationError(message=message)
 
-        self.log_http_response(resp)
-        txt_content = encodeutils.safe_decode(resp.content, 'utf-8')
-        if not ('X-Auth-Key' in kwargs['headers']) and (
-                resp.status_code == 401 or
-                (resp.status_code == 500 and "(HTTP 401)" in txt_content)):
+        if debug:
+            self.log_http_response(resp)
+        if (resp.status_code in (401, 500) and
+                'X-Auth-Key' not in kwargs['headers'] and
+                self._is_auth_failure(resp)):
             raise exc.HTTPUnauthorized(_("Authentication failed: %s")
                                        % resp.content)
         elif 400 <= resp.status_code < 600:
@@ -245,6 +302,13 @@ class HTTPClient:
 
         return resp
 
+    @staticmethod
+    def _is_auth_failure(resp):
+        if resp.status_code == 401:
+            return True
+        # only decode the body of errors which may hide an auth failure
+        return "(HTTP 401)" in encodeutils.safe_decode(resp.content, 'utf-8')
+
     def credentials_headers(self):
         creds = {}
         # NOTE(dhu): (shardy) When deferred_auth_method=password, Heat
@@ -267,7 +331,7 @@ class HTTPClient:
         if 'data' in kwargs:
             kwargs['data'] = jsonutils.dumps(kwargs['data'])
 
-        resp = self._http_request(url, method, **kwargs)
+        resp = self._hooked_request(self._http_request, url, method, kwargs)
         body = utils.get_response_body(resp)
         return resp, body
 
@@ -275,7 +339,7 @@ class HTTPClient:
         kwargs.setdefault('headers', {})
         kwargs['headers'].setdefault('Content-Type',
                                      'application/octet-stream')
-        return self._http_request(url, method, **kwargs)
+        return self._hooked_request(self._http_request, url, method, kwargs)
 
     def client_request(self, method, url, **kwargs):
         resp, body = self.json_request(method, url, **kwargs)
@@ -300,10 +364,13 @@ class HTTPClient:
         return self.client_request("PATCH", url, **kwargs)
 
 
-class SessionClient(adapter.LegacyJsonAdapter):
+class SessionClient(_RequestHooksMixin, adapter.LegacyJsonAdapter):
     """HTTP client based on Keystone client session."""
 
     def request(self, url, method, **kwargs):
+        return self._hooked_request(self._send_request, url, method, kwargs)
+
+    def _send_request(self, url, method, **kwargs):
         redirect = kwargs.get('redirect')
         kwargs.setdefault('user_agent', USER_AGENT)
 
@@ -324,7 +391,7 @@ class SessionClient(adapter.LegacyJsonAdapter):
             if redirect:
                 location = resp.headers.get('location')
                 path = self.strip_endpoint(location)
-                resp = self.request(path, method, **kwargs)
+                resp = self._send_request(path, method, **kwargs)
         elif resp.status_code == 300:
             raise exc.from_response(resp)
 
@@ -344,6 +411,27 @@ class SessionClient(adapter.LegacyJsonAdapter):
             return location
 
 
+def share_connections(http_client, pool_size=utils.DEFAULT_CONCURRENCY):
+    """Make the requests of a client reuse a pool of connections.
+
+    Clients without a session open a new connection for every request by
+    default, which is costly when many requests are sent in a row.
+
+    :param http_client: :class:`HTTPClient` or :class:`SessionClient`
+    :param pool_size: number of connections kept open per host, which should
+        be at least the number of requests sent at once
+    """
+    if isinstance(http_client, SessionClient):
+        session = http_client.session.session
+    else:
+        if http_client.requests_session is None:
+            http_client.requests_session = requests.Session()
+        session = http_client.requests_session
+    for transport in set(session.adapters.values()):
+        # keeps the connection options of the adapters, such as keepalive
+        transport.init_poolmanager(pool_size, pool_size)
+
+
 def _construct_http_client(endpoint=None, username=None, password=None,
                            include_pass=None, endpoint_type=None,
                            auth_url=None, **kwargs):
@@ -0,0 +1,57 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Deferred imports of modules which are costly to import.
+
+Commands only use a few of the modules imported by the command modules,
+so importing them on first use keeps the start up of every command fast.
+"""
+
+import importlib
+import importlib.util
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Module proxy which imports the module on first attribute access.
+
+    Attributes are looked up on the imported module every time, so that
+    they can still be patched on the module.
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self._module = None
+
+    def __getattr__(self, attr):
+        module = self._module
+        if module is None:
+            module = self._module = importlib.import_module(self.__name__)
+        return getattr(module, attr)
+
+    def __repr__(self):
+        return '<lazy module %r>' % self.__name__
+
+
+def import_module(name):
+    """Return a proxy of a module which is only imported when first used.
+
+    Unlike the module itself, the packages containing it are not imported
+    either until then.
+
+    :param name: absolute name of the module, e.g. 'urllib.request'
+    :raises ImportError: if the top level package isn't installed
+    """
+    package = name.partition('.')[0]
+    if importlib.util.find_spec(package) is None:
+        raise ImportError('No module named %r' % package, name=package)
+    return LazyModule(name)
@@ -0,0 +1,234 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Timing and size metrics of the requests sent by the HTTP clients.
+
+Callbacks added with ``add_request_hook`` on a client get a
+:class:`RequestRecord` for each request once it has completed, redirects and
+retries included. :class:`RequestMetrics` is such a callback aggregating the
+records per API call.
+"""
+
+import bisect
+import collections
+import threading
+from urllib import parse
+
+from heatclient.common import utils
+
+RequestRecord = collections.namedtuple('RequestRecord', [
+    'method',          # HTTP method
+    'url',             # URL of the first request
+    'url_template',    # path of the URL with its ids replaced by names
+    'status',          # status code of the last response, or None
+    'request_bytes',   # bytes of request bodies sent
+    'response_bytes',  # bytes of response bodies received
+    'latency',         # seconds from sending the request to the last response
+    'redirects',       # number of redirects followed
+    'retries',         # number of requests sent again after a failure
+])
+
+# Segments of the API paths which aren't ids, any other segment following a
+# collection is replaced by the name of its id in URL templates
+PATH_KEYWORDS = frozenset([
+    'abandon', 'actions', 'build_info', 'detail', 'environment', 'events',
+    'export', 'files', 'metadata', 'outputs', 'preview', 'resource_types',
+    'resources', 'services', 'signal', 'snapshots', 'software_configs',
+    'software_deployments', 'stacks', 'template', 'template_versions',
+    'functions', 'restore', 'validate',
+])
+
+# Names of the ids following each collection in URL templates
+PATH_IDS = {
+    'stacks': ('{stack_name}', '{stack_id}'),
+    'resources': ('{resource_name}',),
+    'events': ('{event_id}',),
+    'outputs': ('{output_key}',),
+    'snapshots': ('{snapshot_id}',),
+    'resource_types': ('{type_name}',),
+    'template_versions': ('{template_version}',),
+    'software_configs': ('{config_id}',),
+    'software_deployments': ('{deployment_id}',),
+    'metadata': ('{server_id}',),
+}
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0, 30.0, 60.0, float('inf'))
+
+SUMMARY_FIELDS = ('Method', 'URL', 'Count', 'Errors', 'Total', 'Mean',
+                  'p50', 'p90', 'p99', 'Max', 'Sent', 'Received',
+                  'Redirects', 'Retries')
+
+
+def url_template(url):
+    """Return the path of an API URL with its ids replaced by names.
+
+    e.g. /stacks/{stack_name}/{stack_id}/resources/{resource_name} for
+    http://heat/v1/tenant/stacks/mystack/0123/resources/server?x=y
+    """
+    path = parse.urlsplit(url).path
+    segments = path.strip('/').split('/')
+    for start, segment in enumerate(segments):
+        if segment in PATH_KEYWORDS:
+            break
+    else:
+        return path
+    template = []
+    ids = ()
+    for segment in segments[start:]:
+        if segment in PATH_KEYWORDS:
+            template.append(segment)
+            ids = PATH_IDS.get(segment, ())
+        elif ids:
+            template.append(ids[0])
+            ids = ids[1:]
+        else:
+            template.append(segment)
+    return '/' + '/'.join(template)
+
+
+def _body_size(body):
+    if body is None:
+        return 0
+    if isinstance(body, str):
+        return len(body.encode('utf-8'))
+    try:
+        return len(body)
+    except TypeError:
+        return 0
+
+
+def make_record(method, url, responses, latency, data=None):
+    """Build the record of a request.
+
+    :param method: HTTP method
+    :param url: URL of the first request
+    :param responses: every :class:`requests.Response` received, in order
+    :param latency: seconds taken by the request
+    :param data: request body, used when no response was received
+    """
+    if responses:
+        status = responses[-1].status_code
+        request_bytes = sum(_body_size(r.request.body) for r in responses
+                            if r.request is not None)
+        response_bytes = sum(_body_size(r.content) for r in responses)
+    else:
+        status = None
+        request_bytes = _body_size(data)
+        response_bytes = 0
+    redirects = len([r for r in responses[:-1]
+                     if 300 <= r.status_code < 400])
+    retries = max(0, len(responses) - 1 - redirects)
+    return RequestRecord(method, url, url_template(url), status,
+                         request_bytes, response_bytes, latency, redirects,
+                         retries)
+
+
+class LatencyHistogram:
+    """Histogram of latencies, with percentiles estimated from its buckets.
+
+    :param buckets: ascending upper bounds of the buckets, in seconds
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, latency):
+        self.counts[bisect.bisect_left(self.buckets, latency)] += 1
+        self.count += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percent):
+        """Return the upper bound of the bucket holding a percentile.
+
+        The bound is capped to the maximum latency seen, so that it is exact
+        for the slowest request.
+        """
+        if not self.count:
+            return 0.0
+        rank = percent / 100.0 * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+class _CallStats:
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.errors = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.redirects = 0
+        self.retries = 0
+
+
+class RequestMetrics:
+    """Request hook aggregating records per method and URL template.
+
+    It can be added to several clients, and used by several threads.
+    """
+
+    def __init__(self):
+        self._stats = collections.defaultdict(_CallStats)
+        self._lock = threading.Lock()
+
+    def __call__(self, record):
+        with self._lock:
+            stats = self._stats[(record.method, record.url_template)]
+            stats.latency.add(record.latency)
+            if record.status is None or record.status >= 400:
+                stats.errors += 1
+            stats.request_bytes += record.request_bytes
+            stats.response_bytes += record.response_bytes
+            stats.redirects += record.redirects
+            stats.retries += record.retries
+
+    def summary(self):
+        """Return a row of :data:`SUMMARY_FIELDS` per API call.
+
+        Rows are sorted by total time, the slowest calls first.
+        """
+        rows = []
+        with self._lock:
+            for (method, url), stats in self._stats.items():
+                latency = stats.latency
+                rows.append([method, url, latency.count, stats.errors,
+                             latency.total, latency.mean,
+                             latency.percentile(50), latency.percentile(90),
+                             latency.percentile(99), latency.max,
+                             stats.request_bytes, stats.response_bytes,
+                             stats.redirects, stats.retries])
+        rows.sort(key=lambda row: row[4], reverse=True)
+        return rows
+
+    def print_summary(self, out=None):
+        """Write the summary as a table, latencies in seconds."""
+        def fmt(row):
+            return row[:4] + ['%.3f' % v for v in row[4:10]] + row[10:]
+
+        rows = [fmt(row) for row in self.summary()]
+        if rows:
+            utils.stream_table(SUMMARY_FIELDS, rows,
+                               sample_size=None, out=out)
@@ -0,0 +1,195 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Profiling of commands, to find out where their time goes.
+
+A profiled command writes a cProfile dump, which can be loaded with
+:mod:`pstats` or tools such as snakeviz, and a JSON report next to it. The
+report holds the wall time of the command, its breakdown across phases such
+as template processing, HTTP requests and formatting, the number of calls
+of each manager method and a summary of the API calls made.
+"""
+
+import cProfile
+import logging
+import os
+import pstats
+import time
+
+from oslo_serialization import jsonutils
+
+from heatclient.common import base
+from heatclient.common import metrics
+
+LOG = logging.getLogger(__name__)
+
+REPORT_SUFFIX = '.json'
+
+# Functions whose time is accounted to each phase, as (path suffix, name).
+# Phases may overlap, e.g. template processing includes YAML parsing and
+# the requests fetching templates from URLs.
+PHASES = (
+    ('authentication', (
+        ('keystoneauth1/identity/base.py', 'get_access'),
+    )),
+    ('template processing', (
+        ('heatclient/common/template_utils.py', 'get_template_contents'),
+        ('heatclient/common/template_utils.py',
+         'process_multiple_environments_and_files'),
+        ('heatclient/common/template_utils.py',
+         'process_environment_and_files'),
+    )),
+    ('yaml parsing', (
+        ('heatclient/common/template_format.py', 'parse'),
+        ('heatclient/common/environment_format.py', 'parse'),
+    )),
+    ('http requests', (
+        ('requests/sessions.py', 'request'),
+    )),
+    ('http response parsing', (
+        ('heatclient/common/utils.py', 'get_response_body'),
+    )),
+    ('formatting', (
+        ('heatclient/common/utils.py', 'print_list'),
+        ('heatclient/common/utils.py', 'print_dict'),
+        ('heatclient/common/utils.py', 'print_update_list'),
+        ('heatclient/common/utils.py', 'write_event_log'),
+        ('cliff/display.py', 'produce_output'),
+    )),
+)
+
+
+def report_path(path):
+    """Return the path of the JSON report written with a profile dump."""
+    return path + REPORT_SUFFIX
+
+
+class CommandProfiler:
+    """Profile a command and write its profile and report on stop.
+
+    Only the thread which started the profiler is profiled, but the API
+    calls summary covers the requests of every thread.
+
+    :param path: file to write the cProfile dump to
+    :param command: name of the profiled command, for the report
+    """
+
+    def __init__(self, path, command=None):
+        self.path = path
+        self.command = command
+        self.request_metrics = metrics.RequestMetrics()
+        self._profile = cProfile.Profile()
+        self._start = None
+        self._wall_time = None
+
+    def attach(self, client):
+        """Record the API calls made by a heat client."""
+        client.http_client.add_request_hook(self.request_metrics)
+
+    def start(self):
+        self._start = time.perf_counter()
+        self._profile.enable()
+
+    def stop(self):
+        """Stop profiling, and write the profile dump and report."""
+        if self._start is None:
+            return
+        self._profile.disable()
+        self._wall_time = time.perf_counter() - self._start
+        self._start = None
+        try:
+            self._profile.dump_stats(self.path)
+            with open(report_path(self.path), 'w') as f:
+                f.write(jsonutils.dumps(self.report(), indent=2,
+                                        sort_keys=True))
+        except OSError as e:
+            LOG.warning('Unable to write the profile to %s: %s',
+                        self.path, e)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def report(self):
+        """Return the report of the profiled command as a dict."""
+        stats = pstats.Stats(self._profile).stats
+        return {
+            'command': self.command,
+            'wall_time': self._wall_time,
+            'phases': phase_times(stats),
+            'manager_calls': manager_calls(stats),
+            'api_calls': [dict(zip(metrics.SUMMARY_FIELDS, row))
+                          for row in self.request_metrics.summary()],
+        }
+
+
+def _matches(func, suffix, name):
+    filename, _line, funcname = func
+    return (funcname == name and
+            filename.replace(os.sep, '/').endswith('/' + suffix))
+
+
+def phase_times(stats):
+    """Return the seconds spent in each phase.
+
+    :param stats: stats dict of a :class:`pstats.Stats`
+    """
+    times = {}
+    for phase, functions in PHASES:
+        matched = {func for func in stats
+                   if any(_matches(func, suffix, name)
+                          for suffix, name in functions)}
+        total = 0.0
+        for func in matched:
+            _cc, _nc, _tt, cumtime, callers = stats[func]
+            # time spent under another function of the phase is already
+            # accounted to it
+            nested = sum(caller_stats[3]
+                         for caller, caller_stats in callers.items()
+                         if caller in matched and caller != func)
+            total += cumtime - nested
+        times[phase] = total
+    return times
+
+
+def _subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _subclasses(subclass)
+
+
+def _manager_methods():
+    methods = {}
+    for cls in _subclasses(base.BaseManager):
+        for name, attr in vars(cls).items():
+            code = getattr(getattr(attr, '__func__', attr), '__code__', None)
+            if code is not None:
+                key = (code.co_filename, code.co_firstlineno, code.co_name)
+                methods[key] = f'{cls.__name__}.{name}'
+    return methods
+
+
+def manager_calls(stats):
+    """Return the number of calls of each manager method, by name.
+
+    :param stats: stats dict of a :class:`pstats.Stats`
+    """
+    methods = _manager_methods()
+    calls = {}
+    for func, (_cc, ncalls, _tt, _ct, _callers) in stats.items():
+        name = methods.get(func)
+        if name is not None:
+            calls[name] = calls.get(name, 0) + ncalls
+    return calls
@@ -11,20 +11,33 @@
 #   under the License.
 #
 
+import abc
 import collections
 import hashlib
+from xml.sax import saxutils
 
 from cliff.formatters import base
+from oslo_serialization import jsonutils
+
+# Formats which are written from the resources rather than from columns
+GRAPH_FORMATS = ('dot', 'dot-stream', 'jsonl', 'graphml')
+
+
+def _dot_escape(text):
+    """Escape text to be written in a double quoted DOT string."""
+    return str(text).replace('\\', '\\\\').replace('"', '\\"')
 
 
 class ResourceDotInfo:
 
-    def __init__(self, res):
+    def __init__(self, res, dot_ids=None):
         self.resource = res
+        if dot_ids is None:
+            dot_ids = DotIdTable()
         links = {link['rel']: link['href'] for link in res.links}
-        self.nested_dot_id = self.dot_id(links.get('nested'), 'stack')
-        self.stack_dot_id = self.dot_id(links.get('stack'), 'stack')
-        self.res_dot_id = self.dot_id(links.get('self'))
+        self.nested_dot_id = dot_ids[links.get('nested'), 'stack']
+        self.stack_dot_id = dot_ids[links.get('stack'), 'stack']
+        self.res_dot_id = dot_ids[links.get('self'), None]
 
     @staticmethod
     def dot_id(url, prefix=None):
@@ -37,6 +50,14 @@ class ResourceDotInfo:
         return f'{prefix}_{hash_object.hexdigest()[:20]}'
 
 
+class DotIdTable(dict):
+    """Dot ids keyed by (url, prefix), so that each URL is hashed once."""
+
+    def __missing__(self, key):
+        dot_id = self[key] = ResourceDotInfo.dot_id(*key)
+        return dot_id
+
+
 class ResourceDotFormatter(base.ListFormatter):
     def add_argument_group(self, parser):
         pass
@@ -54,9 +75,10 @@ class ResourceDotWriter:
         self.resources_by_dot_id = collections.OrderedDict()
         self.nested_stack_ids = []
         self.stdout = stdout
+        dot_ids = DotIdTable()
 
         for r in data:
-            rinfo = ResourceDotInfo(r)
+            rinfo = ResourceDotInfo(r, dot_ids)
             if rinfo.stack_dot_id:
                 self.resources_by_stack[
                     rinfo.stack_dot_id][r.resource_name] = rinfo
@@ -104,8 +126,8 @@ class ResourceDotWriter:
             else:
                 style = ''
             stdout.write('%s%s [label="%s\n%s" %s];\n'
-                         % (spaces, dot_id, r.resource_name,
-                            r.resource_type, style))
+                         % (spaces, dot_id, _dot_escape(r.resource_name),
+                            _dot_escape(r.resource_type), style))
         stdout.write('\n')
 
     def write_subgraph(self, resources, nested_resource):
@@ -113,7 +135,7 @@ class ResourceDotWriter:
         stack_dot_id = nested_resource.nested_dot_id
         nested_name = nested_resource.resource.resource_name
         stdout.write('  subgraph cluster_%s {\n' % stack_dot_id)
-        stdout.write('    label="%s";\n' % nested_name)
+        stdout.write('    label="%s";\n' % _dot_escape(nested_name))
         self.write_nodes(resources, 4)
         stdout.write('  }\n\n')
 
@@ -148,3 +170,212 @@ class ResourceDotWriter:
                         % (dot_id, first_resource.res_dot_id,
                            rinfo.nested_dot_id))
         stdout.write('\n')
+
+
+class ResourceGraphWriter(metaclass=abc.ABCMeta):
+    """Write a graph of resources as they arrive, without holding them.
+
+    Stacks and resources get short ids from a table interning their URL and
+    name, rather than ids hashed from URLs. Each node is written as soon as
+    its resource arrives, and each edge as soon as both of its resources
+    have arrived. Edges to resources which never arrive are not written.
+
+    Subclasses write the nodes and edges in a given format.
+    """
+
+    def __init__(self, stdout):
+        self.stdout = stdout
+        self._ids = {}
+        self._root_stack_id = None
+        # nested stack id -> id of the node of its parent resource
+        self._parents = {}
+        # stack id -> id of the node of the first resource of the stack
+        self._first_nodes = {}
+        # node id -> ids of the nodes waiting for an edge to it
+        self._pending = collections.defaultdict(list)
+        self._seen = set()
+
+    def intern(self, key, prefix):
+        """Return the short id of a stack URL or a (stack URL, name) key."""
+        short_id = self._ids.get(key)
+        if short_id is None:
+            short_id = self._ids[key] = '%s%d' % (prefix, len(self._ids))
+        return short_id
+
+    def write(self, resources):
+        self.write_header()
+        for r in resources:
+            self.add(r)
+        self.write_footer()
+
+    def add(self, res):
+        links = {link['rel']: link['href']
+                 for link in getattr(res, 'links', [])}
+        stack_url = links.get('stack')
+        stack_id = self.intern(stack_url, 's') if stack_url else None
+        nested_id = (self.intern(links['nested'], 's')
+                     if links.get('nested') else None)
+        node_id = self.intern((stack_url, res.resource_name), 'r')
+        if self._root_stack_id is None:
+            # resources are listed starting with the ones of the root stack
+            self._root_stack_id = stack_id
+
+        self.write_node(node_id, res, stack_id, nested_id)
+        self._seen.add(node_id)
+        for source_id in self._pending.pop(node_id, ()):
+            self.write_edge(source_id, node_id)
+        if stack_url:
+            for req in getattr(res, 'required_by', None) or []:
+                target_id = self.intern((stack_url, req), 'r')
+                if target_id in self._seen:
+                    self.write_edge(node_id, target_id)
+                else:
+                    self._pending[target_id].append(node_id)
+
+        if nested_id:
+            self._parents[nested_id] = node_id
+            self.write_nested_stack(nested_id, res)
+            if nested_id in self._first_nodes:
+                self.write_edge(node_id, self._first_nodes[nested_id],
+                                nested_id)
+        if stack_id and stack_id not in self._first_nodes:
+            self._first_nodes[stack_id] = node_id
+            if stack_id in self._parents:
+                self.write_edge(self._parents[stack_id], node_id, stack_id)
+
+    def write_header(self):
+        pass
+
+    def write_footer(self):
+        pass
+
+    @abc.abstractmethod
+    def write_node(self, node_id, res, stack_id, nested_id):
+        """Write the node of a resource of the given stack."""
+
+    def write_nested_stack(self, stack_id, parent):
+        pass
+
+    @abc.abstractmethod
+    def write_edge(self, source_id, target_id, nested_id=None):
+        """Write an edge, from a parent to a nested stack if nested_id."""
+
+
+class ResourceDotStreamWriter(ResourceGraphWriter):
+    """Write resources in the DOT format as they arrive.
+
+    Nodes of nested stacks are written in a cluster per stack, which
+    Graphviz merges with the cluster statements of the same stack written
+    earlier.
+    """
+
+    def write_header(self):
+        self.stdout.write('digraph G {\n'
+                          '  graph [\n'
+                          '    fontsize=10 fontname="Verdana" '
+                          'compound=true rankdir=LR\n'
+                          '  ]\n')
+
+    def write_footer(self):
+        self.stdout.write('}\n')
+
+    def write_node(self, node_id, res, stack_id, nested_id):
+        if res.resource_status.endswith('FAILED'):
+            style = 'style=filled color=red'
+        else:
+            style = ''
+        node = '{} [label="{}\n{}" {}];\n'.format(
+            node_id, _dot_escape(res.resource_name),
+            _dot_escape(res.resource_type), style)
+        if stack_id == self._root_stack_id:
+            self.stdout.write('  ' + node)
+        else:
+            self.stdout.write('  subgraph cluster_%s {\n    %s  }\n'
+                              % (stack_id, node))
+
+    def write_nested_stack(self, stack_id, parent):
+        self.stdout.write('  subgraph cluster_%s {\n    label="%s";\n  }\n'
+                          % (stack_id, _dot_escape(parent.resource_name)))
+
+    def write_edge(self, source_id, target_id, nested_id=None):
+        if nested_id:
+            self.stdout.write('  %s -> %s [\n    color=dimgray '
+                              'lhead=cluster_%s arrowhead=none\n  ];\n'
+                              % (source_id, target_id, nested_id))
+        else:
+            self.stdout.write(f'  {source_id} -> {target_id};\n')
+
+
+class ResourceJsonLinesWriter(ResourceGraphWriter):
+    """Write resources as JSON objects, one node or edge per line."""
+
+    def _write(self, record):
+        self.stdout.write(jsonutils.dumps(record, separators=(',', ':')))
+        self.stdout.write('\n')
+
+    def write_node(self, node_id, res, stack_id, nested_id):
+        self._write({'kind': 'node', 'id': node_id, 'stack': stack_id,
+                     'name': res.resource_name,
+                     'resource_type': res.resource_type,
+                     'status': res.resource_status,
+                     'nested_stack': nested_id})
+
+    def write_edge(self, source_id, target_id, nested_id=None):
+        self._write({'kind': 'nested' if nested_id else 'required_by',
+                     'source': source_id, 'target': target_id})
+
+
+class ResourceGraphMLWriter(ResourceGraphWriter):
+    """Write resources in the GraphML format as they arrive."""
+
+    NODE_KEYS = ('name', 'resource_type', 'status', 'stack', 'nested_stack')
+
+    def write_header(self):
+        self.stdout.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n')
+        for key in self.NODE_KEYS:
+            self.stdout.write('  <key id="%s" for="node" attr.name="%s" '
+                              'attr.type="string"/>\n' % (key, key))
+        self.stdout.write('  <key id="kind" for="edge" attr.name="kind" '
+                          'attr.type="string"/>\n'
+                          '  <graph id="G" edgedefault="directed">\n')
+
+    def write_footer(self):
+        self.stdout.write('  </graph>\n</graphml>\n')
+
+    def write_node(self, node_id, res, stack_id, nested_id):
+        values = (res.resource_name, res.resource_type, res.resource_status,
+                  stack_id, nested_id)
+        data = ''.join('<data key="{}">{}</data>'.format(key, saxutils.escape(
+            str(value))) for key, value in zip(self.NODE_KEYS, values)
+            if value is not None)
+        self.stdout.write(f'    <node id="{node_id}">{data}</node>\n')
+
+    def write_edge(self, source_id, target_id, nested_id=None):
+        self.stdout.write(
+            '    <edge source="%s" target="%s"><data key="kind">%s</data>'
+            '</edge>\n' % (source_id, target_id,
+                           'nested' if nested_id else 'required_by'))
+
+
+class ResourceGraphFormatter(base.ListFormatter):
+    writer_class = None
+
+    def add_argument_group(self, parser):
+        pass
+
+    def emit_list(self, column_names, data, stdout, parsed_args):
+        self.writer_class(stdout).write(data)
+
+
+class ResourceDotStreamFormatter(ResourceGraphFormatter):
+    writer_class = ResourceDotStreamWriter
+
+
+class ResourceJsonLinesFormatter(ResourceGraphFormatter):
+    writer_class = ResourceJsonLinesWriter
+
+
+class ResourceGraphMLFormatter(ResourceGraphFormatter):
+    writer_class = ResourceGraphMLWriter
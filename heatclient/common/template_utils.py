@@ -14,6 +14,9 @@
 #    under the License.
 
 from collections import abc
+import glob
+import os
+
 from oslo_serialization import jsonutils
 from urllib import error
 from urllib import parse
@@ -26,8 +29,38 @@ from heatclient.common import utils
 from heatclient import exc
 
 
+TEMPLATE_EXTENSIONS = ('.yaml', '.yml', '.template', '.json')
+
+
+def expand_template_paths(template_paths):
+    """Expand directories and glob patterns into template paths.
+
+    Directories are expanded to the files with a template extension they
+    contain, and patterns which don't name an existing file to the files
+    they match. Other paths, such as URLs, are returned unchanged.
+
+    :param template_paths: list of template paths, directories or patterns
+    :returns: list of template paths without duplicates
+    """
+    paths = []
+    for path in template_paths:
+        if os.path.isdir(path):
+            paths.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.endswith(TEMPLATE_EXTENSIONS) and
+                os.path.isfile(os.path.join(path, name))))
+        elif glob.has_magic(path) and not os.path.exists(path):
+            matches = sorted(glob.glob(path))
+            if not matches:
+                raise exc.CommandError(_('No template matches %s') % path)
+            paths.extend(matches)
+        else:
+            paths.append(path)
+    return list(dict.fromkeys(paths))
+
+
 def process_template_path(template_path, object_request=None,
-                          existing=False, fetch_child=True):
+                          existing=False, fetch_child=True, file_cache=None):
     """Read template from template path.
 
     Attempt to read template first as a file or url. If that is unsuccessful,
@@ -38,19 +71,24 @@ def process_template_path(template_path, object_request=None,
                            if local or uri path fails
     :param existing: if the current stack's template should be used
     :param fetch_child: Whether to fetch the child templates
+    :param file_cache: dict of file contents keyed by URL, shared between
+                       calls to only fetch the files which several templates
+                       use once
     :returns: get_file dict and template contents
     :raises: error.URLError
     """
     try:
         return get_template_contents(template_file=template_path,
                                      existing=existing,
-                                     fetch_child=fetch_child)
+                                     fetch_child=fetch_child,
+                                     file_cache=file_cache)
     except error.URLError as template_file_exc:
         try:
             return get_template_contents(template_object=template_path,
                                          object_request=object_request,
                                          existing=existing,
-                                         fetch_child=fetch_child)
+                                         fetch_child=fetch_child,
+                                         file_cache=file_cache)
         except exc.HTTPNotFound:
             # The initial exception gives the user better failure context.
             raise template_file_exc
@@ -59,7 +97,7 @@ def process_template_path(template_path, object_request=None,
 def get_template_contents(template_file=None, template_url=None,
                           template_object=None, object_request=None,
                           files=None, existing=False,
-                          fetch_child=True):
+                          fetch_child=True, file_cache=None):
 
     is_object = False
     # Transform a bare file path to a file:// URL.
@@ -67,13 +105,16 @@ def get_template_contents(template_file=None, template_url=None,
         template_url = utils.normalise_file_path_to_url(template_file)
 
     if template_url:
-        tpl = request.urlopen(template_url).read()
+        tpl = _cached_read(
+            file_cache, template_url,
+            lambda: request.urlopen(template_url).read())
 
     elif template_object:
         is_object = True
         template_url = template_object
-        tpl = object_request and object_request('GET',
-                                                template_object)
+        tpl = object_request and _cached_read(
+            file_cache, template_object,
+            lambda: object_request('GET', template_object))
     elif existing:
         return {}, None
     else:
@@ -103,12 +144,21 @@ def get_template_contents(template_file=None, template_url=None,
     if fetch_child:
         tmpl_base_url = utils.base_url_for_url(template_url)
         resolve_template_get_files(template, files, tmpl_base_url, is_object,
-                                   object_request)
+                                   object_request, file_cache=file_cache)
     return files, template
 
 
+def _cached_read(file_cache, url, read):
+    if file_cache is None:
+        return read()
+    if url not in file_cache:
+        file_cache[url] = read()
+    return file_cache[url]
+
+
 def resolve_template_get_files(template, files, template_base_url,
-                               is_object=False, object_request=None):
+                               is_object=False, object_request=None,
+                               file_cache=None):
 
     def ignore_if(key, value):
         if key != 'get_file' and key != 'type':
@@ -124,7 +174,8 @@ def resolve_template_get_files(template, files, template_base_url,
         return isinstance(value, (dict, list))
 
     get_file_contents(template, files, template_base_url,
-                      ignore_if, recurse_if, is_object, object_request)
+                      ignore_if, recurse_if, is_object, object_request,
+                      file_cache=file_cache)
 
 
 def is_template(file_content):
@@ -139,7 +190,8 @@ def is_template(file_content):
 
 def get_file_contents(from_data, files, base_url=None,
                       ignore_if=None, recurse_if=None,
-                      is_object=False, object_request=None):
+                      is_object=False, object_request=None,
+                      file_cache=None):
 
     if recurse_if and recurse_if(from_data):
         if isinstance(from_data, dict):
@@ -148,7 +200,8 @@ def get_file_contents(from_data, files, base_url=None,
             recurse_data = from_data
         for value in recurse_data:
             get_file_contents(value, files, base_url, ignore_if, recurse_if,
-                              is_object, object_request)
+                              is_object, object_request,
+                              file_cache=file_cache)
 
     if isinstance(from_data, dict):
         for key, value in from_data.items():
@@ -161,17 +214,23 @@ def get_file_contents(from_data, files, base_url=None,
             str_url = parse.urljoin(base_url, value)
             if str_url not in files:
                 if is_object and object_request:
-                    file_content = object_request('GET', str_url)
+                    file_content = _cached_read(
+                        file_cache, str_url,
+                        lambda: object_request('GET', str_url))
                 else:
-                    file_content = utils.read_url_content(str_url)
+                    file_content = _cached_read(
+                        file_cache, str_url,
+                        lambda: utils.read_url_content(str_url))
                 if is_template(file_content):
                     if is_object:
                         template = get_template_contents(
                             template_object=str_url, files=files,
-                            object_request=object_request)[1]
+                            object_request=object_request,
+                            file_cache=file_cache)[1]
                     else:
                         template = get_template_contents(
-                            template_url=str_url, files=files)[1]
+                            template_url=str_url, files=files,
+                            file_cache=file_cache)[1]
                     file_content = jsonutils.dumps(template)
                 files[str_url] = file_content
             # replace the data value with the normalised absolute URL
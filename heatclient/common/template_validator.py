@@ -0,0 +1,309 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Local checks of templates which don't need a round trip to the API.
+
+Only errors which the API would also reject are reported, so that templates
+which pass can still be sent to the API for the checks which need the
+engine, such as resource property schemas.
+"""
+
+import collections
+import fnmatch
+import logging
+import re
+
+from heatclient._i18n import _
+from heatclient.common import environment_format
+from heatclient.common import template_format
+from heatclient.common import utils
+
+HOT_SECTIONS = ('heat_template_version', 'description', 'parameter_groups',
+                'parameters', 'resources', 'outputs', 'conditions')
+# as the _RESOURCE_KEYS of the HOT templates of Heat, across versions
+HOT_RESOURCE_KEYS = ('type', 'properties', 'metadata', 'depends_on',
+                     'deletion_policy', 'update_policy', 'description',
+                     'condition', 'external_id')
+HOT_OUTPUT_KEYS = ('value', 'description', 'condition')
+HOT_PSEUDO_PARAMETERS = ('OS::stack_name', 'OS::stack_id', 'OS::project_id')
+
+CFN_SECTIONS = ('AWSTemplateFormatVersion', 'HeatTemplateFormatVersion',
+                'Description', 'Mappings', 'Parameters', 'Resources',
+                'Outputs', 'Conditions', 'Metadata')
+CFN_RESOURCE_KEYS = ('Type', 'Properties', 'Metadata', 'DependsOn',
+                     'DeletionPolicy', 'UpdatePolicy', 'Description',
+                     'Condition')
+CFN_PSEUDO_PARAMETERS = ('AWS::StackName', 'AWS::StackId', 'AWS::Region',
+                         'AWS::AccountId', 'AWS::NoValue',
+                         'AWS::NotificationARNs') + HOT_PSEUDO_PARAMETERS
+
+LOG = logging.getLogger(__name__)
+
+_DATE_VERSION = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+class TemplateValidator:
+    """Validate templates against their own definitions and known catalogs.
+
+    :param resource_types: names of the resource types known to the API, or
+        None to skip resource type checks
+    :param template_functions: dict of the function names supported by each
+        template version, keyed by version name, e.g.
+        'heat_template_version.2016-10-14', or None to skip version and
+        function checks
+    """
+
+    def __init__(self, resource_types=None, template_functions=None):
+        self.resource_types = (frozenset(resource_types)
+                               if resource_types is not None else None)
+        self.template_functions = template_functions
+        self._all_functions = frozenset()
+        if template_functions:
+            self._all_functions = frozenset().union(
+                *template_functions.values())
+
+    @classmethod
+    def from_client(cls, hc):
+        """Build a validator using the cached catalogs of a client.
+
+        Catalogs are only used when the catalog cache of their manager is
+        enabled, so that validation doesn't cost extra requests, and are
+        skipped when they can't be fetched.
+        """
+        resource_types = None
+        if hc.resource_types.catalog is not None:
+            try:
+                resource_types = [t.resource_type
+                                  for t in hc.resource_types.list()]
+            except Exception as e:
+                LOG.debug('Unable to get resource types: %s', e)
+        template_functions = None
+        if hc.template_versions.catalog is not None:
+            try:
+                template_functions = {
+                    v.version: hc.template_versions.function_names(
+                        v.version, with_condition_func=True)
+                    for v in hc.template_versions.list()}
+            except Exception as e:
+                LOG.debug('Unable to get template functions: %s', e)
+        # an empty catalog most likely means it couldn't be listed
+        return cls(resource_types or None, template_functions or None)
+
+    def validate(self, template, files=None, environment=None):
+        """Validate a template.
+
+        :param template: parsed template
+        :param files: dict of the files referenced by the template, as built
+            by :func:`heatclient.common.template_utils.process_template_path`,
+            or None when they haven't been fetched
+        :param environment: parsed environment
+        :returns: list of error messages, empty if no error was found
+        """
+        errors = []
+        self._validate(template, files, environment or {}, '', errors,
+                       set())
+        return errors
+
+    def validate_many(self, jobs, max_workers=utils.DEFAULT_CONCURRENCY):
+        """Validate many templates in parallel.
+
+        :param jobs: iterable of dicts of :meth:`validate` keyword arguments
+        :param max_workers: maximum number of templates validated at once
+        :returns: iterator of (job, errors) tuples in completion order
+        """
+        for job, errors, error in utils.run_concurrently(
+                lambda job: self.validate(**job), jobs, max_workers):
+            if error is not None:
+                errors = [str(error)]
+            yield job, errors
+
+    def _validate(self, template, files, environment, prefix, errors,
+                  seen):
+        def error(path, msg):
+            errors.append(f'{prefix}{path}: {msg}' if path
+                          else prefix + msg)
+
+        if not isinstance(template, dict):
+            error('', _('The template is not a JSON object or YAML mapping.'))
+            return
+        if 'heat_template_version' in template:
+            spec = _HOT
+            self._validate_version(template['heat_template_version'], error)
+        else:
+            spec = _CFN
+
+        for section in template:
+            if section not in spec.sections:
+                error(section, _('The template section is invalid'))
+
+        params = template.get(spec.parameters) or {}
+        resources = template.get(spec.resources) or {}
+        if not isinstance(params, dict):
+            error(spec.parameters, _('The section must be a mapping'))
+            params = {}
+        if not isinstance(resources, dict):
+            error(spec.resources, _('The section must be a mapping'))
+            resources = {}
+        registry = environment.get(
+            environment_format.RESOURCE_REGISTRY) or {}
+        for name, rsrc in resources.items():
+            self._validate_resource(rsrc, f'{spec.resources}.{name}',
+                                    spec, resources, files, registry,
+                                    environment, prefix, error, errors, seen)
+        if spec is _HOT:
+            self._validate_outputs(template.get('outputs'), error)
+
+        functions = None
+        if spec is _HOT and self.template_functions:
+            functions = self.template_functions.get(
+                'heat_template_version.%s' % template['heat_template_version'])
+        for section in (spec.resources, spec.outputs, spec.conditions):
+            self._validate_functions(template.get(section), section, spec,
+                                     params, resources, files, functions,
+                                     error)
+
+    def _validate_resource(self, rsrc, path, spec, resources, files,
+                           registry, environment, prefix, error, errors,
+                           seen):
+        if not isinstance(rsrc, dict):
+            error(path, _('The resource definition must be a mapping'))
+            return
+        for key in rsrc:
+            if key not in spec.resource_keys:
+                error(path, _('"%s" is not a valid keyword inside a '
+                              'resource definition') % key)
+        rsrc_type = rsrc.get(spec.type_key)
+        if not isinstance(rsrc_type, str):
+            error(path, _('Resource type must be a string'))
+        else:
+            self._validate_type(rsrc_type, files, registry, environment,
+                                prefix, path, error, errors, seen)
+        depends = rsrc.get(spec.depends_key) or []
+        if isinstance(depends, str):
+            depends = [depends]
+        for dep in depends if isinstance(depends, list) else []:
+            if isinstance(dep, str) and dep not in resources:
+                error(path, _('depends on undefined resource "%s"') % dep)
+
+    def _validate_outputs(self, outputs, error):
+        if not isinstance(outputs, dict):
+            return
+        for name, output in outputs.items():
+            path = 'outputs.%s' % name
+            if not isinstance(output, dict) or 'value' not in output:
+                error(path, _('Each output definition must contain a value '
+                              'key'))
+                continue
+            for key in output:
+                if key not in HOT_OUTPUT_KEYS:
+                    error(path, _('"%s" is not a valid keyword inside an '
+                                  'output definition') % key)
+
+    def _validate_version(self, version, error):
+        if self.template_functions is None:
+            return
+        name = 'heat_template_version.%s' % version
+        # aliases such as release names are left to the API
+        if (_DATE_VERSION.match(str(version)) and
+                name not in self.template_functions):
+            error('heat_template_version',
+                  _('"%s" is not a valid template version') % version)
+
+    def _validate_type(self, rsrc_type, files, registry, environment,
+                       prefix, path, error, errors, seen):
+        mapped = registry.get(rsrc_type)
+        if isinstance(mapped, str) and mapped.endswith(('.yaml', '.template')):
+            rsrc_type = mapped
+        if rsrc_type.endswith(('.yaml', '.template')):
+            if files is None:
+                return
+            if rsrc_type not in files:
+                error(path, _('Could not fetch template %s') % rsrc_type)
+            elif rsrc_type not in seen:
+                seen.add(rsrc_type)
+                content = files[rsrc_type]
+                if isinstance(content, bytes):
+                    content = content.decode('utf-8')
+                try:
+                    nested = template_format.parse(content)
+                except ValueError as e:
+                    error(path, _('Error parsing template %(url)s '
+                                  '%(error)s') % {'url': rsrc_type,
+                                                  'error': e})
+                else:
+                    self._validate(nested, files, environment,
+                                   f'{prefix}{path}: ', errors, seen)
+            return
+        if self.resource_types is None or rsrc_type in self.resource_types:
+            return
+        if any(fnmatch.fnmatchcase(rsrc_type, key)
+               for key in registry if isinstance(key, str)):
+            return
+        error(path, _('The Resource Type (%s) could not be found.')
+              % rsrc_type)
+
+    def _validate_functions(self, data, path, spec, params, resources, files,
+                            functions, error):
+        if isinstance(data, list):
+            for i, value in enumerate(data):
+                self._validate_functions(value, '%s[%d]' % (path, i), spec,
+                                         params, resources, files,
+                                         functions, error)
+            return
+        if not isinstance(data, dict):
+            return
+        if len(data) == 1:
+            func, arg = next(iter(data.items()))
+            if (functions is not None and func in self._all_functions and
+                    func not in functions):
+                error(path, _('The function "%s" is not supported by this '
+                              'template version') % func)
+            target = arg[0] if isinstance(arg, list) and arg else arg
+            if isinstance(target, str):
+                if func in spec.param_functions:
+                    if (target not in params and
+                            target not in spec.pseudo_params and
+                            not (func == 'Ref' and target in resources)):
+                        error(path, _('The Parameter (%s) was not defined '
+                                      'in template.') % target)
+                elif func in spec.resource_functions:
+                    if target not in resources:
+                        error(path, _('The specified reference "%s" is '
+                                      'not in the template.') % target)
+                elif func == 'get_file' and files is not None:
+                    if target not in files:
+                        error(path, _('Could not fetch file %s') % target)
+        for key, value in data.items():
+            self._validate_functions(value, f'{path}.{key}', spec,
+                                     params, resources, files, functions,
+                                     error)
+
+
+_Spec = collections.namedtuple('_Spec', [
+    'sections', 'parameters', 'resources', 'outputs', 'conditions',
+    'type_key', 'depends_key', 'resource_keys', 'param_functions',
+    'resource_functions', 'pseudo_params'])
+
+_HOT = _Spec(sections=HOT_SECTIONS, parameters='parameters',
+             resources='resources', outputs='outputs',
+             conditions='conditions', type_key='type',
+             depends_key='depends_on', resource_keys=HOT_RESOURCE_KEYS,
+             param_functions=('get_param',),
+             resource_functions=('get_resource', 'get_attr'),
+             pseudo_params=HOT_PSEUDO_PARAMETERS)
+_CFN = _Spec(sections=CFN_SECTIONS, parameters='Parameters',
+             resources='Resources', outputs='Outputs',
+             conditions='Conditions', type_key='Type',
+             depends_key='DependsOn', resource_keys=CFN_RESOURCE_KEYS,
+             param_functions=('Ref',),
+             resource_functions=('Fn::GetAtt',),
+             pseudo_params=CFN_PSEUDO_PARAMETERS)
@@ -0,0 +1,163 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Encrypted on-disk cache of tokens and the endpoints they were issued for.
+
+Entries are encrypted with a key derived from both a random key stored in
+the cache directory, readable by its owner only, and the secret the token
+was obtained with, e.g. the password. A copy of the cache files alone can't
+be decrypted, and entries become unreadable when the password changes.
+"""
+
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import tempfile
+import time
+
+from oslo_serialization import jsonutils
+from oslo_utils import importutils
+
+LOG = logging.getLogger(__name__)
+
+fernet = importutils.try_import('cryptography.fernet')
+
+# Bumped whenever the layout of the cache entries changes
+CACHE_VERSION = 1
+
+# Tokens expiring within this many seconds are not used, so that they don't
+# expire while a command runs
+EXPIRY_MARGIN = 5 * 60
+
+KEY_SIZE = 32
+
+
+def is_supported():
+    """Return whether the cryptography library needed is installed."""
+    return fernet is not None
+
+
+class TokenCache:
+    """Cache of tokens and endpoints, keyed by the scope they are valid for.
+
+    :param cache_dir: directory to store the cache files in
+    :param expiry_margin: seconds before their expiry after which tokens
+        are no longer returned
+    :raises RuntimeError: if the cryptography library isn't installed
+    """
+
+    def __init__(self, cache_dir, expiry_margin=EXPIRY_MARGIN):
+        if not is_supported():
+            raise RuntimeError('The token cache requires the cryptography '
+                               'library')
+        self.cache_dir = os.path.join(cache_dir, 'tokens')
+        self.expiry_margin = expiry_margin
+
+    @staticmethod
+    def cache_key(**scope):
+        """Return the cache key of a token scope.
+
+        :param scope: everything the token and endpoint depend on, such as
+            the auth URL, user, project, region and interface
+        """
+        data = jsonutils.dumps(sorted(scope.items()))
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def get(self, key, secret):
+        """Return the cached (token, endpoint) of key, or None.
+
+        :param key: cache key, see :meth:`cache_key`
+        :param secret: secret the token was obtained with
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            entry = jsonutils.loads(
+                self._fernet(secret, create=False).decrypt(data))
+        except (OSError, ValueError, fernet.InvalidToken) as e:
+            LOG.debug('Discarding unreadable token cache entry %s: %s',
+                      path, e)
+            self.invalidate(key)
+            return None
+        if (not isinstance(entry, dict) or
+                entry.get('version') != CACHE_VERSION or
+                entry.get('expires', 0) - self.expiry_margin < time.time()):
+            LOG.debug('Discarding expired token cache entry %s', path)
+            self.invalidate(key)
+            return None
+        return entry['token'], entry['endpoint']
+
+    def store(self, key, secret, token, endpoint, expires):
+        """Cache a token and endpoint until the token expires.
+
+        :param key: cache key, see :meth:`cache_key`
+        :param secret: secret the token was obtained with
+        :param token: the token
+        :param endpoint: orchestration endpoint URL to use with the token
+        :param expires: time at which the token expires, in seconds since
+            the epoch
+        """
+        entry = {'version': CACHE_VERSION, 'token': token,
+                 'endpoint': endpoint, 'expires': expires}
+        try:
+            data = self._fernet(secret).encrypt(
+                jsonutils.dump_as_bytes(entry))
+            self._write(self._path(key), data)
+        except OSError as e:
+            LOG.debug('Unable to write token cache entry: %s', e)
+
+    def invalidate(self, key):
+        """Drop the entry of key, e.g. when its token was rejected."""
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def _fernet(self, secret, create=True):
+        key_path = os.path.join(self.cache_dir, 'key')
+        try:
+            with open(key_path, 'rb') as f:
+                master_key = f.read()
+        except FileNotFoundError:
+            if not create:
+                raise
+            master_key = os.urandom(KEY_SIZE)
+            self._write(key_path, master_key)
+        if len(master_key) != KEY_SIZE:
+            raise ValueError('Invalid token cache key %s' % key_path)
+        key = hmac.new(master_key, secret.encode('utf-8'),
+                       hashlib.sha256).digest()
+        return fernet.Fernet(base64.urlsafe_b64encode(key))
+
+    def _write(self, path, data):
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+        # mkstemp creates the file readable by its owner only
+        fd, tmp = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+            raise
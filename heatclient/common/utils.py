@@ -13,30 +13,60 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import argparse
 import base64
+import collections
+from concurrent import futures
+import itertools
 import logging
 import os
 from pathlib import Path
+import sys
 import textwrap
+import threading
+import time
 import uuid
 
 from oslo_serialization import jsonutils
 from oslo_utils import encodeutils
-import prettytable
-from urllib import error
 from urllib import parse
-from urllib import request
-import yaml
 
 from heatclient._i18n import _
+from heatclient.common import lazy
 from heatclient import exc
 
+# Only used by some of the commands, so imported on first use
+error = lazy.import_module('urllib.error')
+prettytable = lazy.import_module('prettytable')
+request = lazy.import_module('urllib.request')
+yaml = lazy.import_module('yaml')
+try:
+    wcwidth = lazy.import_module('wcwidth')
+except ImportError:
+    wcwidth = None
+
 LOG = logging.getLogger(__name__)
 
+# Default number of API requests issued in parallel by bulk operations
+DEFAULT_CONCURRENCY = 8
+
+# Default initial and maximum seconds between polls of a watched resource
+WATCH_INTERVAL = 5
+WATCH_MAX_INTERVAL = 60
+
+# Whether tables are written row by row instead of being rendered whole
+STREAM_TABLES = False
+
+# Number of rows used to size the columns of a streamed table
+STREAM_SAMPLE_SIZE = 1000
+
+# Default number of stacks an EventLogContext remembers
+EVENT_LOG_CONTEXT_SIZE = 10000
+
 
 supported_formats = {
     "json": lambda x: jsonutils.dumps(x, indent=2),
-    "yaml": yaml.safe_dump
+    "yaml": lambda x: yaml.safe_dump(x)
 }
 
 
@@ -67,6 +97,18 @@ def env(*args, **kwargs):
     return kwargs.get('default', '')
 
 
+def positive_int(value):
+    """Argument type accepting integers of at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+    if number < 1:
+        raise argparse.ArgumentTypeError(
+            _('%s is not a positive integer') % value)
+    return number
+
+
 def add_arg(func, *args, **kwargs):
     """Bind CLI arguments to a shell.py `do_foo` function."""
 
@@ -82,7 +124,8 @@ def add_arg(func, *args, **kwargs):
 
 
 def print_list(objs, fields, formatters=None, sortby_index=0,
-               mixed_case_fields=None, field_labels=None):
+               mixed_case_fields=None, field_labels=None, stream=None,
+               sample_size=STREAM_SAMPLE_SIZE):
     """Print a list of objects as a table, one row per object.
 
     :param objs: iterable of :class:`Resource`
@@ -93,6 +136,10 @@ def print_list(objs, fields, formatters=None, sortby_index=0,
         have mixed case names (e.g., 'serverId')
     :param field_labels: Labels to use in the heading of the table, default to
         fields.
+    :param stream: write the table row by row with :func:`stream_table`,
+        defaults to :data:`STREAM_TABLES`
+    :param sample_size: number of rows used to size the columns of a
+        streamed table, or None to size them from a first pass over objs
     """
     formatters = formatters or {}
     mixed_case_fields = mixed_case_fields or []
@@ -102,14 +149,7 @@ def print_list(objs, fields, formatters=None, sortby_index=0,
                            "of elements than fields list %(fields)s"),
                          {'labels': field_labels, 'fields': fields})
 
-    if sortby_index is None:
-        kwargs = {}
-    else:
-        kwargs = {'sortby': field_labels[sortby_index]}
-    pt = prettytable.PrettyTable(field_labels)
-    pt.align = 'l'
-
-    for o in objs:
+    def make_row(o):
         row = []
         for field in fields:
             if field in formatters:
@@ -121,11 +161,110 @@ def print_list(objs, fields, formatters=None, sortby_index=0,
                     field_name = field.lower().replace(' ', '_')
                 data = getattr(o, field_name, '')
                 row.append(data)
-        pt.add_row(row)
+        return row
+
+    if STREAM_TABLES if stream is None else stream:
+        stream_table(field_labels, map(make_row, objs),
+                     sortby_index=sortby_index, sample_size=sample_size)
+        return
+
+    if sortby_index is None:
+        kwargs = {}
+    else:
+        kwargs = {'sortby': field_labels[sortby_index]}
+    pt = prettytable.PrettyTable(field_labels)
+    pt.align = 'l'
+
+    for o in objs:
+        pt.add_row(make_row(o))
 
     print(encodeutils.safe_encode(pt.get_string(**kwargs)).decode())
 
 
+def stream_table(labels, rows, sortby_index=None,
+                 sample_size=STREAM_SAMPLE_SIZE, print_empty=True,
+                 out=None):
+    """Write a left aligned table row by row, in the print_list layout.
+
+    The columns are sized from the first sample_size rows, so that only
+    those rows are held in memory. Cells of later rows which are wider than
+    their column overflow it rather than being truncated. Sorting a table
+    needs every row, so sorted tables are held in memory and sized from all
+    of their rows.
+
+    :param labels: column headings
+    :param rows: iterable of rows, each a list of cell values, which is
+        only iterated once
+    :param sortby_index: index of the column for sorting rows, or None to
+        keep the order of rows
+    :param sample_size: number of rows used to size the columns, or None to
+        size them from all the rows, which are then held in memory
+    :param print_empty: write the headings when there is no row
+    :param out: file to write the table to, defaults to stdout
+    """
+    out = out or sys.stdout
+    if sortby_index is not None:
+        # sort like prettytable, using the whole row to break ties
+        rows = sorted(rows, key=lambda r: [r[sortby_index]] + r)
+        sample_size = None
+    widths = [_text_width(str(label)) for label in labels]
+
+    def fit(row):
+        for i, value in enumerate(row):
+            for line in str(value).split('\n'):
+                widths[i] = max(widths[i], _text_width(line))
+
+    remaining = iter(rows)
+    sample = list(itertools.islice(remaining, sample_size))
+    for row in sample:
+        fit(row)
+
+    border = '+%s+\n' % '+'.join('-' * (w + 2) for w in widths)
+    written = False
+    for row in itertools.chain(sample, remaining):
+        if not written:
+            out.write(border + _table_line(labels, widths) + border)
+            written = True
+        out.write(_table_line(row, widths))
+    if written:
+        out.write(border)
+    elif print_empty:
+        out.write(border + _table_line(labels, widths) + border + border)
+    else:
+        out.write('\n')
+    _flush(out)
+
+
+def _flush(out):
+    # not every file-like object written to can be flushed
+    flush = getattr(out, 'flush', None)
+    if flush is not None:
+        flush()
+
+
+def _table_line(row, widths):
+    cells = [str(value).split('\n') for value in row]
+    height = max(len(lines) for lines in cells) if cells else 1
+    text = []
+    for n in range(height):
+        line = []
+        for lines, width in zip(cells, widths):
+            cell = lines[n] if n < len(lines) else ''
+            line.append(' {}{} '.format(
+                cell, ' ' * (width - _text_width(cell))))
+        text.append('|%s|\n' % '|'.join(line))
+    return ''.join(text)
+
+
+def _text_width(text):
+    """Return the number of terminal columns text is displayed in."""
+    if wcwidth is not None:
+        width = wcwidth.wcswidth(text)
+        if width >= 0:
+            return width
+    return len(text)
+
+
 def link_formatter(links):
     def format_link(link):
         if 'rel' in link:
@@ -176,25 +315,68 @@ def print_dict(d, formatters=None):
 
 
 class EventLogContext:
+    """Resolve the resource paths of events from the events seen before.
 
-    def __init__(self):
+    The context remembers the parent of the max_size stacks looked up most
+    recently, as well as their resolved paths, so that following the events
+    of a long running stack doesn't use ever more memory.
+
+    :param max_size: maximum number of stacks remembered
+    """
+
+    def __init__(self, max_size=EVENT_LOG_CONTEXT_SIZE):
+        self.max_size = max_size
         # key is a stack id or the name of the nested stack, value is a tuple
         # of the parent stack id, and the name of the resource in the parent
         # stack
-        self.id_to_res_info = {}
+        self.id_to_res_info = collections.OrderedDict()
+        # key is a stack id, value is the tuple of resource names leading to
+        # the stack
+        self._paths = collections.OrderedDict()
 
     def prepend_paths(self, resource_path, stack_id):
-        if stack_id not in self.id_to_res_info:
-            return
-        stack_id, res_name = self.id_to_res_info.get(stack_id)
-        if res_name in self.id_to_res_info:
+        resource_path[0:0] = self.stack_path(stack_id)
+
+    def stack_path(self, stack_id):
+        """Return the resource names leading to a stack, outermost first."""
+        path = self._lru_get(self._paths, stack_id)
+        if path is not None:
+            return path
+        path = ()
+        res_info = self._lru_get(self.id_to_res_info, stack_id)
+        if res_info is not None:
+            res_name = res_info[1]
             # do a double lookup to skip the ugly stack name that doesn't
             # correspond to an actual resource name
-            n_stack_id, res_name = self.id_to_res_info.get(res_name)
-            resource_path.insert(0, res_name)
-            self.prepend_paths(resource_path, n_stack_id)
-        elif res_name:
-            resource_path.insert(0, res_name)
+            parent_info = self._lru_get(self.id_to_res_info, res_name)
+            if parent_info is not None:
+                n_stack_id, res_name = parent_info
+                if n_stack_id != stack_id:
+                    path = self.stack_path(n_stack_id)
+                path += (res_name,)
+            elif res_name:
+                path = (res_name,)
+        self._lru_set(self._paths, stack_id, path)
+        return path
+
+    def _add_res_info(self, key, res_info):
+        if self._lru_get(self.id_to_res_info, key) != res_info:
+            # a replaced nested stack moves every stack below it, so the
+            # resolved paths can't be trusted anymore
+            self._paths.clear()
+        self._lru_set(self.id_to_res_info, key, res_info)
+
+    def _lru_get(self, cache, key):
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+    def _lru_set(self, cache, key, value):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.max_size:
+            cache.popitem(last=False)
 
     def build_resource_name(self, event):
         res_name = getattr(event, 'resource_name')
@@ -221,74 +403,155 @@ class EventLogContext:
         is_stack_event = stack_id == phys_id
         if is_stack_event:
             # this is an event for a stack
-            self.id_to_res_info[stack_id] = (stack_id, res_name)
+            self._add_res_info(stack_id, (stack_id, res_name))
         elif phys_id and status == 'CREATE_IN_PROGRESS':
             # this might be an event for a resource which creates a stack
-            self.id_to_res_info[phys_id] = (stack_id, res_name)
+            self._add_res_info(phys_id, (stack_id, res_name))
 
         # Now build this resource path based on previous calls to
         # build_resource_name
-        resource_path = []
+        resource_path = self.stack_path(stack_id)
         if res_name and not is_stack_event:
-            resource_path.append(res_name)
-        self.prepend_paths(resource_path, stack_id)
+            resource_path += (res_name,)
 
         return '.'.join(resource_path)
 
 
-def event_log_formatter(events, event_log_context=None):
-    """Return the events in log format."""
-    event_log = []
+def _format_event(event, event_log_context):
     log_format = ("%(event_time)s %(event_id)s [%(rsrc_name)s]: "
                   "%(rsrc_status)s  %(rsrc_status_reason)s")
+    rsrc_name = event_log_context.build_resource_name(event)
+
+    event_time = getattr(event, 'event_time', '')
+    log_data = {
+        'event_time': event_time.replace('T', ' '),
+        'rsrc_name': rsrc_name,
+        'rsrc_status': getattr(event, 'resource_status', ''),
+        'rsrc_status_reason': getattr(event, 'resource_status_reason', ''),
+        'event_id': getattr(event, 'id', '')
+    }
+    return log_format % log_data
 
+
+def event_log_formatter(events, event_log_context=None):
+    """Return the events in log format."""
     # It is preferable for a context to be passed in, but there might be enough
     # events in this call to build a better resource name, so create a context
     # anyway
     if event_log_context is None:
         event_log_context = EventLogContext()
 
-    for event in events:
-        rsrc_name = event_log_context.build_resource_name(event)
+    return "\n".join(_format_event(event, event_log_context)
+                     for event in events)
 
-        event_time = getattr(event, 'event_time', '')
-        log_data = {
-            'event_time': event_time.replace('T', ' '),
-            'rsrc_name': rsrc_name,
-            'rsrc_status': getattr(event, 'resource_status', ''),
-            'rsrc_status_reason': getattr(event, 'resource_status_reason', ''),
-            'event_id': getattr(event, 'id', '')
-        }
 
-        log = log_format % log_data
-        event_log.append(log)
+def write_event_log(events, out, event_log_context=None):
+    """Write the events in log format, one line at a time.
 
-    return "\n".join(event_log)
+    Unlike :func:`event_log_formatter`, each event is written to out and
+    flushed as soon as it is formatted, so events can be consumed lazily
+    from a generator, the log is never held in memory whole, and followed
+    events are shown as they arrive.
+
+    :param events: iterable of events
+    :param out: file to write the log to
+    :param event_log_context: :class:`EventLogContext` shared by the calls
+        writing the same log
+    :returns: the number of events written
+    """
+    if event_log_context is None:
+        event_log_context = EventLogContext()
+    count = 0
+    for event in events:
+        out.write(_format_event(event, event_log_context))
+        out.write('\n')
+        _flush(out)
+        count += 1
+    return count
 
 
-def print_update_list(lst, fields, formatters=None):
+def print_update_list(lst, fields, formatters=None, stream=None,
+                      sample_size=STREAM_SAMPLE_SIZE):
     """Print the stack-update --dry-run output as a table.
 
     This function is necessary to print the stack-update --dry-run
     output, which contains additional information about the update.
+
+    :param stream: write the table row by row with :func:`stream_table`,
+        defaults to :data:`STREAM_TABLES`
+    :param sample_size: number of rows used to size the columns of a
+        streamed table, or None to size them from a first pass over lst
     """
     formatters = formatters or {}
-    pt = prettytable.PrettyTable(fields, caching=False, print_empty=False)
-    pt.align = 'l'
 
-    for change in lst:
+    def make_row(change):
         row = []
         for field in fields:
             if field in formatters:
                 row.append(formatters[field](change.get(field, None)))
             else:
                 row.append(change.get(field, None))
+        return row
 
-        pt.add_row(row)
+    if STREAM_TABLES if stream is None else stream:
+        stream_table(fields, map(make_row, lst),
+                     sample_size=sample_size, print_empty=False)
+        return
+
+    pt = prettytable.PrettyTable(fields, caching=False, print_empty=False)
+    pt.align = 'l'
+
+    for change in lst:
+        pt.add_row(make_row(change))
 
     print(encodeutils.safe_encode(pt.get_string()).decode())
 
 
+def run_concurrently(func, items, max_workers=DEFAULT_CONCURRENCY,
+                     rate_limit=None):
+    """Call func for every item using a bounded pool of worker threads.
+
+    Results are yielded as soon as they complete, so callers can start
+    processing (or printing) them before the whole batch has finished.
+
+    :param func: callable taking a single item
+    :param items: iterable of items to call func with
+    :param max_workers: maximum number of calls running at the same time
+    :param rate_limit: maximum number of calls started per second
+    :returns: generator of (item, result, error) tuples in completion
+        order, where error is the exception raised by func or None
+    """
+    items = list(items)
+    if not items:
+        return
+    if rate_limit:
+        func = _rate_limited(func, rate_limit)
+    max_workers = max(1, min(max_workers or 1, len(items)))
+    with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(func, item): item for item in items}
+        for future in futures.as_completed(pending):
+            error = future.exception()
+            result = None if error else future.result()
+            yield pending[future], result, error
+
+
+def _rate_limited(func, rate_limit):
+    interval = 1.0 / rate_limit
+    lock = threading.Lock()
+    next_call = [time.monotonic()]
+
+    def wrapper(item):
+        with lock:
+            now = time.monotonic()
+            delay = next_call[0] - now
+            next_call[0] = max(now, next_call[0]) + interval
+        if delay > 0:
+            time.sleep(delay)
+        return func(item)
+
+    return wrapper
+
+
 def find_resource(manager, name_or_id):
     """Helper for the _find_* methods."""
     # first try to get entity as integer id
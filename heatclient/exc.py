@@ -41,6 +41,10 @@ class CommunicationError(BaseException):
     """Unable to communicate with server."""
 
 
+class LazyLoadError(BaseException):
+    """Attribute access would lazily load the object from the server."""
+
+
 class HTTPException(BaseException):
     """Base exception for all HTTP-derived exceptions."""
     code = 'N/A'
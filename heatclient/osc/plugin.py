@@ -13,12 +13,22 @@
 
 """OpenStackClient plugin for Orchestration service."""
 
+import atexit
 import logging
+import sys
 
 from osc_lib import utils
 
+from heatclient.common import lazy
+
 LOG = logging.getLogger(__name__)
 
+# The plugin is loaded by every openstack command, so its few uses of these
+# don't need to slow all of them down
+strutils = lazy.import_module('oslo_utils.strutils')
+metrics = lazy.import_module('heatclient.common.metrics')
+profiling = lazy.import_module('heatclient.common.profiling')
+
 DEFAULT_ORCHESTRATION_API_VERSION = '1'
 API_VERSION_OPTION = 'os_orchestration_api_version'
 API_NAME = 'orchestration'
@@ -29,6 +39,16 @@ API_VERSIONS = {
 
 def make_client(instance):
     """Returns an orchestration service client"""
+    # The client is made when the command starts using it, so profile the
+    # command from there until it exits
+    profiler = None
+    profile_file = _cli_option(instance, 'orchestration_profile_file')
+    if profile_file:
+        profiler = profiling.CommandProfiler(profile_file,
+                                             ' '.join(sys.argv[1:]))
+        profiler.start()
+        atexit.register(profiler.stop)
+
     heat_client = utils.get_client_class(
         API_NAME,
         instance._api_version[API_NAME],
@@ -55,11 +75,34 @@ def make_client(instance):
                        'username': instance.auth_ref.username,
                        'token': instance.auth_ref.auth_token})
 
+    # Cache near-static catalogs such as resource types on disk when
+    # OS_ORCHESTRATION_CATALOG_CACHE is a true value or a directory
+    catalog_cache = utils.env('OS_ORCHESTRATION_CATALOG_CACHE')
+    if catalog_cache:
+        if catalog_cache.lower() in (strutils.TRUE_STRINGS +
+                                     strutils.FALSE_STRINGS):
+            catalog_cache = strutils.bool_from_string(catalog_cache)
+        kwargs['catalog_cache'] = catalog_cache
+
     client = heat_client(**kwargs)
 
+    # Summarize the Heat API calls made by the command with --timing
+    if getattr(instance, 'timing', False):
+        request_metrics = metrics.RequestMetrics()
+        client.http_client.add_request_hook(request_metrics)
+        atexit.register(request_metrics.print_summary, sys.stderr)
+    if profiler is not None:
+        profiler.attach(client)
+
     return client
 
 
+def _cli_option(instance, name):
+    cli_options = getattr(instance, '_cli_options', None)
+    config = getattr(cli_options, 'config', None)
+    return config.get(name) if isinstance(config, dict) else None
+
+
 def build_option_parser(parser):
     """Hook to add global options"""
     parser.add_argument(
@@ -71,4 +114,11 @@ def build_option_parser(parser):
         help='Orchestration API version, default=' +
              DEFAULT_ORCHESTRATION_API_VERSION +
              ' (Env: OS_ORCHESTRATION_API_VERSION)')
+    parser.add_argument(
+        '--os-orchestration-profile-file',
+        metavar='<file>',
+        default=utils.env('OS_ORCHESTRATION_PROFILE_FILE'),
+        help='Profile orchestration commands with cProfile, and write the '
+             'profile to <file> and a JSON report of where the time went '
+             'to <file>.json (Env: OS_ORCHESTRATION_PROFILE_FILE)')
     return parser
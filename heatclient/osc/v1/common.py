@@ -13,7 +13,9 @@
 #
 
 from cliff import columns
+from osc_lib import exceptions as exc
 
+from heatclient._i18n import _
 from heatclient.common import utils as heat_utils
 
 
@@ -40,3 +42,47 @@ class TextWrapColumn(columns.FormattableColumn):
 class NewlineListColumn(columns.FormattableColumn):
     def human_readable(self):
         return heat_utils.newline_list_formatter(self._value)
+
+
+class BulkCommandMixin:
+    """Fail a command acting on many items once its results are shown.
+
+    take_action sets failures to the number of items which failed and total
+    to the number of items. If any failed, the results are still shown and
+    a CommandError built from failure_message is then raised.
+    """
+
+    failure_message = _('Unable to process %(count)d of the %(total)d '
+                        'items.')
+    failures = 0
+    total = 0
+
+    def run(self, parsed_args):
+        self.failures = 0
+        self.total = 0
+        result = super().run(parsed_args)
+        if self.failures:
+            raise exc.CommandError(self.failure_message % {
+                'count': self.failures, 'total': self.total})
+        return result
+
+
+def run_bulk(func, templates, max_workers=heat_utils.DEFAULT_CONCURRENCY):
+    """Run func concurrently for many templates and summarize the results.
+
+    :param func: callable taking a template path
+    :param templates: list of template paths
+    :param max_workers: maximum number of templates processed at once
+    :returns: columns and data of a summary keyed by template path, and the
+        number of templates which failed
+    """
+    results = {}
+    failures = 0
+    for path, result, error in heat_utils.run_concurrently(
+            func, templates, max_workers):
+        if error is None:
+            results[path] = {'status': 'OK'}
+        else:
+            results[path] = {'status': 'FAILED', 'error': str(error)}
+            failures += 1
+    return list(templates), [results[p] for p in templates], failures
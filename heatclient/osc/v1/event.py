@@ -63,7 +63,7 @@ class ShowEvent(command.ShowOne):
         }
 
         try:
-            client.stacks.get(parsed_args.stack)
+            client.stacks.get(parsed_args.stack, lazy_outputs=True)
             client.resources.get(parsed_args.stack, parsed_args.resource)
             event = client.events.get(**fields)
         except exc.HTTPNotFound as ex:
@@ -207,10 +207,8 @@ class ListEvent(command.Lister):
                         marker=marker)
                     if events:
                         marker = getattr(events[-1], 'id', None)
-                        events_log = heat_utils.event_log_formatter(
-                            events, event_log_context)
-                        self.app.stdout.write(events_log)
-                        self.app.stdout.write('\n')
+                        heat_utils.write_event_log(
+                            events, self.app.stdout, event_log_context)
                     time.sleep(5)
                     # this loop never exits
             except (KeyboardInterrupt, EOFError):  # ctrl-c, ctrl-d
@@ -247,5 +245,5 @@ class LogFormatter(base.ListFormatter):
         pass
 
     def emit_list(self, column_names, data, stdout, parsed_args):
-        stdout.write(heat_utils.event_log_formatter(data))
-        stdout.write('\n')
+        if not heat_utils.write_event_log(data, stdout):
+            stdout.write('\n')
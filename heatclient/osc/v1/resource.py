@@ -23,6 +23,7 @@ from oslo_serialization import jsonutils
 from urllib import request
 
 from heatclient.common import format_utils
+from heatclient.common import resource_formatter
 from heatclient.common import utils as heat_utils
 from heatclient import exc as heat_exc
 
@@ -127,7 +128,7 @@ class ResourceList(command.Lister):
             msg = _('Stack not found: %s') % parsed_args.stack
             raise exc.CommandError(msg)
 
-        if parsed_args.formatter == 'dot':
+        if parsed_args.formatter in resource_formatter.GRAPH_FORMATS:
             return [], resources
 
         columns = ['physical_resource_id', 'resource_type', 'resource_status',
@@ -14,6 +14,7 @@
 """Orchestration v1 Software Deployment action implementations"""
 
 import logging
+import sys
 
 from osc_lib.command import command
 from osc_lib import exceptions as exc
@@ -25,6 +26,7 @@ from heatclient.common import deployment_utils
 from heatclient.common import format_utils
 from heatclient.common import utils as heat_utils
 from heatclient import exc as heat_exc
+from heatclient.osc.v1 import common
 
 
 class CreateDeployment(format_utils.YamlFormat):
@@ -41,52 +43,7 @@ class CreateDeployment(format_utils.YamlFormat):
                    'deployment. This is used to apply a sort order to the '
                    'list of configurations currently deployed to the server.')
         )
-        parser.add_argument(
-            '--input-value',
-            metavar='<key=value>',
-            action='append',
-            help=_('Input value to set on the deployment. This can be '
-                   'specified multiple times.')
-        )
-        parser.add_argument(
-            '--action',
-            metavar='<action>',
-            default='UPDATE',
-            help=_('Name of an action for this deployment. This can be a '
-                   'custom action, or one of CREATE, UPDATE, DELETE, SUSPEND, '
-                   'RESUME. Default is UPDATE')
-        )
-        parser.add_argument(
-            '--config',
-            metavar='<config>',
-            help=_('ID of the configuration to deploy')
-        )
-        parser.add_argument(
-            '--signal-transport',
-            metavar='<signal-transport>',
-            default='TEMP_URL_SIGNAL',
-            help=_('How the server should signal to heat with the deployment '
-                   'output values. TEMP_URL_SIGNAL will create a Swift '
-                   'TempURL to be signaled via HTTP PUT. ZAQAR_SIGNAL will '
-                   'create a dedicated zaqar queue to be signaled using the '
-                   'provided keystone credentials.NO_SIGNAL will result in '
-                   'the resource going to the COMPLETE state without waiting '
-                   'for any signal')
-        )
-        parser.add_argument(
-            '--container',
-            metavar='<container>',
-            help=_('Optional name of container to store TEMP_URL_SIGNAL '
-                   'objects in. If not specified a container will be created '
-                   'with a name derived from the DEPLOY_NAME')
-        )
-        parser.add_argument(
-            '--timeout',
-            metavar='<timeout>',
-            type=int,
-            default=60,
-            help=_('Deployment timeout in minutes')
-        )
+        _add_create_arguments(parser)
         parser.add_argument(
             '--server',
             metavar='<server>',
@@ -127,7 +84,180 @@ class CreateDeployment(format_utils.YamlFormat):
             status='IN_PROGRESS'
         )
 
-        return zip(*sorted(sd.to_dict().items()))
+        return zip(*sorted(sd.to_dict(read_only=True).items()))
+
+
+def _add_create_arguments(parser):
+    parser.add_argument(
+        '--input-value',
+        metavar='<key=value>',
+        action='append',
+        help=_('Input value to set on the deployment. This can be '
+               'specified multiple times.')
+    )
+    parser.add_argument(
+        '--action',
+        metavar='<action>',
+        default='UPDATE',
+        help=_('Name of an action for this deployment. This can be a '
+               'custom action, or one of CREATE, UPDATE, DELETE, SUSPEND, '
+               'RESUME. Default is UPDATE')
+    )
+    parser.add_argument(
+        '--config',
+        metavar='<config>',
+        help=_('ID of the configuration to deploy')
+    )
+    parser.add_argument(
+        '--signal-transport',
+        metavar='<signal-transport>',
+        default='TEMP_URL_SIGNAL',
+        help=_('How the server should signal to heat with the deployment '
+               'output values. TEMP_URL_SIGNAL will create a Swift '
+               'TempURL to be signaled via HTTP PUT. ZAQAR_SIGNAL will '
+               'create a dedicated zaqar queue to be signaled using the '
+               'provided keystone credentials.NO_SIGNAL will result in '
+               'the resource going to the COMPLETE state without waiting '
+               'for any signal')
+    )
+    parser.add_argument(
+        '--container',
+        metavar='<container>',
+        help=_('Optional name of container to store TEMP_URL_SIGNAL '
+               'objects in. If not specified a container will be created '
+               'with a name derived from the DEPLOY_NAME')
+    )
+    parser.add_argument(
+        '--timeout',
+        metavar='<timeout>',
+        type=int,
+        default=60,
+        help=_('Deployment timeout in minutes')
+    )
+
+
+class BulkCreateDeployment(common.BulkCommandMixin, command.Lister):
+    """Create a software deployment on each of many servers."""
+
+    log = logging.getLogger(__name__ + '.BulkCreateDeployment')
+    failure_message = _('Unable to create %(count)d of the %(total)d '
+                        'deployments.')
+
+    def get_parser(self, prog_name):
+        parser = super().get_parser(prog_name)
+        parser.add_argument(
+            'name',
+            metavar='<deployment-name>',
+            help=_('Name of the derived configs associated with these '
+                   'deployments. This is used to apply a sort order to the '
+                   'list of configurations currently deployed to a server.')
+        )
+        _add_create_arguments(parser)
+        parser.add_argument(
+            '--server',
+            metavar='<server>',
+            action='append',
+            default=[],
+            help=_('ID of a server being deployed to. This can be specified '
+                   'multiple times.')
+        )
+        parser.add_argument(
+            '--server-file',
+            metavar='<server-file>',
+            help=_('File containing the IDs of the servers being deployed '
+                   'to, one per line')
+        )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<concurrency>',
+            type=heat_utils.positive_int,
+            default=heat_utils.DEFAULT_CONCURRENCY,
+            help=_('Maximum number of deployments to create in parallel. '
+                   'Default is %d') % heat_utils.DEFAULT_CONCURRENCY
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)', parsed_args)
+
+        client = self.app.client_manager.orchestration
+
+        servers = list(parsed_args.server)
+        if parsed_args.server_file:
+            servers.extend(_read_id_file(parsed_args.server_file))
+        # keep the first occurrence of each server
+        servers = list(dict.fromkeys(servers))
+        if not servers:
+            raise exc.CommandError(
+                _('At least one of --server or --server-file is required.'))
+
+        config = {}
+        if parsed_args.config:
+            try:
+                config = client.software_configs.get(parsed_args.config)
+            except heat_exc.HTTPNotFound:
+                msg = (_('Software configuration not found: %s') %
+                       parsed_args.config)
+                raise exc.CommandError(msg)
+
+        # The derived configs only differ by their server and signal IDs, so
+        # the inputs are built once and copied for each server
+        derived_params = deployment_utils.build_derived_config_params(
+            parsed_args.action,
+            config,
+            parsed_args.name,
+            heat_utils.format_parameters(parsed_args.input_value, False),
+            None,
+            parsed_args.signal_transport
+        )
+        signal_id = deployment_utils.signal_id_factory(client, parsed_args)
+
+        def create(server_id):
+            params = deployment_utils.derive_server_config_params(
+                derived_params, server_id, signal_id())
+            derived_config = client.software_configs.create(**params)
+            try:
+                return client.software_deployments.create(
+                    config_id=derived_config.id,
+                    server_id=server_id,
+                    action=parsed_args.action,
+                    status='IN_PROGRESS'
+                )
+            except Exception:
+                # just try best to delete the orphaned config
+                try:
+                    client.software_configs.delete(
+                        config_id=derived_config.id)
+                except Exception:
+                    pass
+                raise
+
+        results = {}
+        self.total = len(servers)
+        for server_id, sd, error in heat_utils.run_concurrently(
+                create, servers, max_workers=parsed_args.concurrency):
+            if error is not None:
+                self.failures += 1
+                results[server_id] = (server_id, None, None, str(error))
+            else:
+                results[server_id] = (server_id, sd.id, sd.config_id,
+                                      sd.status)
+
+        columns = ['server_id', 'id', 'config_id', 'status']
+        return columns, [results[server_id] for server_id in servers]
+
+
+def _read_id_file(path):
+    """Read IDs from a file, one per line, ignoring blanks and comments."""
+    try:
+        with open(path) as f:
+            lines = f.read().splitlines()
+    except OSError as e:
+        raise exc.CommandError(
+            _('Error reading file %(path)s: %(error)s')
+            % {'path': path, 'error': e})
+    return [line.strip() for line in lines
+            if line.strip() and not line.strip().startswith('#')]
 
 
 class DeleteDeployment(command.Command):
@@ -140,43 +270,74 @@ class DeleteDeployment(command.Command):
         parser.add_argument(
             'deployment',
             metavar='<deployment>',
-            nargs='+',
+            nargs='*',
             help=_('ID of the deployment(s) to delete.')
         )
+        parser.add_argument(
+            '--from-file',
+            metavar='<file>',
+            help=_('File containing the IDs of deployments to delete, one '
+                   'per line')
+        )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<concurrency>',
+            type=heat_utils.positive_int,
+            default=heat_utils.DEFAULT_CONCURRENCY,
+            help=_('Maximum number of deployments to delete in parallel. '
+                   'Default is %d') % heat_utils.DEFAULT_CONCURRENCY
+        )
         return parser
 
     def take_action(self, parsed_args):
         self.log.debug("take_action(%s)", parsed_args)
         hc = self.app.client_manager.orchestration
-        failure_count = 0
 
-        for deploy_id in parsed_args.deployment:
-            try:
-                sd = hc.software_deployments.get(deployment_id=deploy_id)
-                hc.software_deployments.delete(
-                    deployment_id=deploy_id)
-            except Exception as e:
-                if isinstance(e, heat_exc.HTTPNotFound):
-                    print(_('Deployment with ID %s not found') % deploy_id)
-                else:
-                    print(_('Deployment with ID %s failed to delete')
-                          % deploy_id)
-                failure_count += 1
-                continue
+        deploy_ids = list(parsed_args.deployment)
+        if parsed_args.from_file:
+            deploy_ids.extend(_read_id_file(parsed_args.from_file))
+        deploy_ids = list(dict.fromkeys(deploy_ids))
+        if not deploy_ids:
+            raise exc.CommandError(
+                _('At least one deployment or --from-file is required.'))
+
+        def delete(deploy_id):
+            sd = hc.software_deployments.get(deployment_id=deploy_id)
+            hc.software_deployments.delete(deployment_id=deploy_id)
             # just try best to delete the corresponding config
+            config_id = getattr(sd, 'config_id', None)
             try:
-                config_id = getattr(sd, 'config_id')
                 hc.software_configs.delete(config_id=config_id)
             except Exception:
-                print(_('Failed to delete the correlative config'
-                        ' %(config_id)s of deployment %(deploy_id)s') %
-                      {'config_id': config_id, 'deploy_id': deploy_id})
+                return config_id
+
+        messages = {}
+        failure_count = 0
+        for deploy_id, config_id, error in heat_utils.run_concurrently(
+                delete, deploy_ids, max_workers=parsed_args.concurrency):
+            if isinstance(error, heat_exc.HTTPNotFound):
+                messages[deploy_id] = (_('Deployment with ID %s not found')
+                                       % deploy_id)
+                failure_count += 1
+            elif error is not None:
+                messages[deploy_id] = (_('Deployment with ID %s failed to '
+                                         'delete') % deploy_id)
+                failure_count += 1
+            elif config_id is not None:
+                messages[deploy_id] = (
+                    _('Failed to delete the correlative config'
+                      ' %(config_id)s of deployment %(deploy_id)s') %
+                    {'config_id': config_id, 'deploy_id': deploy_id})
+
+        for deploy_id in deploy_ids:
+            if deploy_id in messages:
+                print(messages[deploy_id])
 
         if failure_count:
             raise exc.CommandError(_('Unable to delete %(count)s of the '
                                      '%(total)s deployments.') %
                                    {'count': failure_count,
-                                   'total': len(parsed_args.deployment)})
+                                   'total': len(deploy_ids)})
 
 
 class ListDeployment(command.Lister):
@@ -278,14 +439,46 @@ class ShowMetadataDeployment(command.Command):
             metavar='<server>',
             help=_('ID of the server to fetch deployments for')
         )
+        parser.add_argument(
+            '--watch',
+            action='store_true',
+            help=_('Keep polling the metadata and print it again each time '
+                   'it changes')
+        )
+        parser.add_argument(
+            '--watch-interval',
+            metavar='<seconds>',
+            type=float,
+            default=heat_utils.WATCH_INTERVAL,
+            help=_('Initial seconds between polls with --watch. The interval '
+                   'backs off while the metadata is unchanged. Default is '
+                   '%d') % heat_utils.WATCH_INTERVAL
+        )
+        parser.add_argument(
+            '--watch-timeout',
+            metavar='<seconds>',
+            type=float,
+            help=_('Stop watching after this many seconds')
+        )
         return parser
 
     def take_action(self, parsed_args):
         self.log.debug("take_action(%s)", parsed_args)
         heat_client = self.app.client_manager.orchestration
-        md = heat_client.software_deployments.metadata(
-            server_id=parsed_args.server)
-        print(jsonutils.dumps(md, indent=2))
+        if not parsed_args.watch:
+            md = heat_client.software_deployments.metadata(
+                server_id=parsed_args.server)
+            print(jsonutils.dumps(md, indent=2))
+            return
+
+        max_interval = max(parsed_args.watch_interval,
+                           heat_utils.WATCH_MAX_INTERVAL)
+        for md in heat_client.software_deployments.watch_metadata(
+                parsed_args.server, interval=parsed_args.watch_interval,
+                max_interval=max_interval,
+                timeout=parsed_args.watch_timeout):
+            print(jsonutils.dumps(md, indent=2))
+            sys.stdout.flush()
 
 
 class ShowOutputDeployment(command.Command):
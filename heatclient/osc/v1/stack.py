@@ -16,29 +16,34 @@
 import logging
 import sys
 
-from openstackclient.identity import common as identity_common
 from osc_lib.command import command
 from osc_lib import exceptions as exc
 from osc_lib import utils
 from oslo_serialization import jsonutils
-from urllib import request
-import yaml
 
 from heatclient._i18n import _
-from heatclient.common import event_utils
 from heatclient.common import format_utils
-from heatclient.common import hook_utils
-from heatclient.common import http
-from heatclient.common import template_utils
+from heatclient.common import lazy
 from heatclient.common import utils as heat_utils
 from heatclient import exc as heat_exc
 from heatclient.osc.v1 import common
 
+# Only used by some of the commands, so imported on first use
+identity_common = lazy.import_module('openstackclient.identity.common')
+request = lazy.import_module('urllib.request')
+yaml = lazy.import_module('yaml')
+event_utils = lazy.import_module('heatclient.common.event_utils')
+hook_utils = lazy.import_module('heatclient.common.hook_utils')
+http = lazy.import_module('heatclient.common.http')
+template_utils = lazy.import_module('heatclient.common.template_utils')
 
-class CreateStack(command.ShowOne):
+
+class CreateStack(common.BulkCommandMixin, command.ShowOne):
     """Create a stack."""
 
     log = logging.getLogger(__name__ + '.CreateStack')
+    failure_message = _('Unable to preview %(count)d of the %(total)d '
+                        'templates.')
 
     def get_parser(self, prog_name):
         parser = super().get_parser(prog_name)
@@ -122,24 +127,34 @@ class CreateStack(command.ShowOne):
             metavar='<stack-name>',
             help=_('Name of the stack to create')
         )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<concurrency>',
+            type=heat_utils.positive_int,
+            default=heat_utils.DEFAULT_CONCURRENCY,
+            help=_('Maximum number of templates previewed in parallel with '
+                   '--dry-run and many templates. Default is %d')
+            % heat_utils.DEFAULT_CONCURRENCY
+        )
         parser.add_argument(
             '-t', '--template',
             metavar='<template>',
             required=True,
-            help=_('Path to the template')
+            action='append',
+            help=_('Path to the template. With --dry-run, this can be a '
+                   'directory or a glob pattern, and can be specified '
+                   'multiple times to preview many templates, in which case '
+                   'a summary of the result for each template is displayed')
         )
 
         return parser
 
-    def take_action(self, parsed_args):
-        self.log.debug('take_action(%s)', parsed_args)
-
-        client = self.app.client_manager.orchestration
-
+    def _fields(self, client, parsed_args, template_path, file_cache=None):
         tpl_files, template = template_utils.process_template_path(
-            parsed_args.template,
+            template_path,
             object_request=http.authenticated_fetcher(client),
-            fetch_child=parsed_args.files_container is None)
+            fetch_child=parsed_args.files_container is None,
+            file_cache=file_cache)
 
         env_files_list = []
         env_files, env = (
@@ -151,7 +166,7 @@ class CreateStack(command.ShowOne):
         parameters = heat_utils.format_all_parameters(
             parsed_args.parameter,
             parsed_args.parameter_file,
-            parsed_args.template)
+            template_path)
 
         if parsed_args.pre_create:
             template_utils.hooks_to_env(env, parsed_args.pre_create,
@@ -177,6 +192,32 @@ class CreateStack(command.ShowOne):
             fields['tags'] = parsed_args.tags
         if parsed_args.timeout:
             fields['timeout_mins'] = parsed_args.timeout
+        return fields
+
+    def take_action(self, parsed_args):
+        self.log.debug('take_action(%s)', parsed_args)
+
+        client = self.app.client_manager.orchestration
+
+        templates = parsed_args.template
+        if parsed_args.dry_run:
+            templates = template_utils.expand_template_paths(templates)
+        if templates != parsed_args.template or len(templates) > 1:
+            if not parsed_args.dry_run:
+                raise exc.CommandError(
+                    _('Only one template can be specified without '
+                      '--dry-run.'))
+            # Child files which several templates include are only
+            # fetched once
+            file_cache = {}
+            columns, data, self.failures = common.run_bulk(
+                lambda path: client.stacks.preview(**self._fields(
+                    client, parsed_args, path, file_cache=file_cache)),
+                templates, max_workers=parsed_args.concurrency)
+            self.total = len(templates)
+            return columns, data
+
+        fields = self._fields(client, parsed_args, templates[0])
 
         if parsed_args.dry_run:
             stack = client.stacks.preview(**fields)
@@ -192,7 +233,7 @@ class CreateStack(command.ShowOne):
             }
 
             columns = []
-            for key in stack.to_dict():
+            for key in stack.to_dict(read_only=True):
                 columns.append(key)
             columns.sort()
 
@@ -404,7 +445,7 @@ class UpdateStack(command.ShowOne):
         client.stacks.update(**fields)
 
         if parsed_args.wait:
-            stack = client.stacks.get(parsed_args.stack)
+            stack = client.stacks.get(parsed_args.stack, lazy_outputs=True)
             stack_status, msg = event_utils.poll_for_events(
                 client, stack.stack_name, action='UPDATE', marker=marker)
             if stack_status == 'UPDATE_FAILED':
@@ -1010,6 +1051,15 @@ class OutputShowStack(command.ShowOne):
             action='store_true',
             help=_('Display all stack outputs')
         )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<concurrency>',
+            type=heat_utils.positive_int,
+            help=_('With --all, fetch the outputs one by one using up to '
+                   '<concurrency> parallel requests instead of resolving '
+                   'every output in a single request. Errors are then '
+                   'reported for each output separately')
+        )
         return parser
 
     def take_action(self, parsed_args):
@@ -1025,6 +1075,22 @@ class OutputShowStack(command.ShowOne):
             msg = _('Cannot specify both <OUTPUT NAME> and --all.')
             raise exc.CommandError(msg)
 
+        if parsed_args.concurrency is not None and not parsed_args.all:
+            msg = _('--concurrency can only be specified with --all.')
+            raise exc.CommandError(msg)
+
+        if parsed_args.all and parsed_args.concurrency:
+            try:
+                outputs = _show_outputs_concurrently(
+                    client, parsed_args.stack, parsed_args.concurrency)
+            except heat_exc.HTTPNotFound:
+                # Either the stack does not exist or the API is too old to
+                # show single outputs, let the default path sort it out
+                outputs = None
+            if outputs is not None:
+                return ([o['output_key'] for o in outputs],
+                        [common.JsonColumn(o) for o in outputs])
+
         if parsed_args.all:
             try:
                 stack = client.stacks.get(parsed_args.stack)
@@ -1032,7 +1098,7 @@ class OutputShowStack(command.ShowOne):
                 msg = _('Stack not found: %s') % parsed_args.stack
                 raise exc.CommandError(msg)
 
-            outputs = stack.to_dict().get('outputs', [])
+            outputs = stack.to_dict(read_only=True).get('outputs', [])
             columns = []
             values = []
             for output in outputs:
@@ -1049,7 +1115,8 @@ class OutputShowStack(command.ShowOne):
                 'id': parsed_args.stack, 'out': parsed_args.output}
             try:
                 output = None
-                stack = client.stacks.get(parsed_args.stack).to_dict()
+                stack = client.stacks.get(parsed_args.stack).to_dict(
+                    read_only=True)
                 for o in stack.get('outputs', []):
                     if o['output_key'] == parsed_args.output:
                         output = o
@@ -1066,6 +1133,18 @@ class OutputShowStack(command.ShowOne):
         return self.dict2columns(output)
 
 
+def _show_outputs_concurrently(client, stack_id, concurrency):
+    """Fetch every output of a stack with one request per output.
+
+    Failures to fetch a single output are reported in its output_error
+    rather than failing the whole command.
+
+    :returns: list of outputs, in the order returned by the output list
+    """
+    stack = client.stacks.get(stack_id, resolve_outputs=False)
+    return stack.resolve_outputs(concurrency, ignore_errors=True)
+
+
 class OutputListStack(command.Lister):
     """List stack outputs."""
 
@@ -1090,7 +1169,7 @@ class OutputListStack(command.Lister):
         except heat_exc.HTTPNotFound:
             try:
                 outputs = client.stacks.get(
-                    parsed_args.stack).to_dict()['outputs']
+                    parsed_args.stack).to_dict(read_only=True)['outputs']
             except heat_exc.HTTPNotFound:
                 msg = _('Stack not found: %s') % parsed_args.stack
                 raise exc.CommandError(msg)
@@ -1194,7 +1273,7 @@ def _stack_action(stack, parsed_args, heat_client, action, action_name=None):
         raise exc.CommandError(msg)
 
     if parsed_args.wait:
-        s = heat_client.stacks.get(stack)
+        s = heat_client.stacks.get(stack, lazy_outputs=True)
         stack_status, msg = event_utils.poll_for_events(
             heat_client, s.stack_name, action=action_name, marker=marker)
         if action_name:
@@ -1204,7 +1283,7 @@ def _stack_action(stack, parsed_args, heat_client, action, action_name=None):
             if stack_status.endswith('_FAILED'):
                 raise exc.CommandError(msg)
 
-    return heat_client.stacks.get(stack)
+    return heat_client.stacks.get(stack, lazy_outputs=True)
 
 
 class SuspendStack(StackActionBase):
@@ -1311,7 +1390,8 @@ class CancelStack(StackActionBase):
             allowed_statuses = ['update_in_progress']
         for stack in parsed_args.stack:
             try:
-                data = heat_client.stacks.get(stack_id=stack)
+                data = heat_client.stacks.get(stack_id=stack,
+                                              lazy_outputs=True)
             except heat_exc.HTTPNotFound:
                 raise exc.CommandError('Stack not found: %s' % stack)
             status = getattr(data, 'stack_status').lower()
@@ -1401,10 +1481,11 @@ def _hook_poll(args, heat_client):
     return (columns, rows)
 
 
-class StackHookClear(command.Command):
+class StackHookClear(common.BulkCommandMixin, command.Lister):
     """Clear resource hooks on a given stack."""
 
     log = logging.getLogger(__name__ + '.StackHookClear')
+    failure_message = _('Unable to clear %(count)d of the %(total)d hooks.')
 
     def get_parser(self, prog_name):
         parser = super().get_parser(prog_name)
@@ -1438,15 +1519,31 @@ class StackHookClear(command.Command):
                    'wildcards to match multiple stacks or resources: '
                    '``nested_stack/an*/*_resource``')
         )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<concurrency>',
+            type=heat_utils.positive_int,
+            default=heat_utils.DEFAULT_CONCURRENCY,
+            help=_('Maximum number of hooks cleared in parallel, '
+                   'defaults to %d') % heat_utils.DEFAULT_CONCURRENCY
+        )
+        parser.add_argument(
+            '--rate-limit',
+            metavar='<requests>',
+            type=float,
+            help=_('Maximum number of hooks cleared per second')
+        )
         return parser
 
     def take_action(self, parsed_args):
         self.log.debug("take_action(%s)", parsed_args)
         heat_client = self.app.client_manager.orchestration
-        return _hook_clear(
+        columns, rows, self.failures = _hook_clear(
             parsed_args,
             heat_client
         )
+        self.total = len(rows)
+        return columns, rows
 
 
 def _hook_clear(args, heat_client):
@@ -1461,10 +1558,20 @@ def _hook_clear(args, heat_client):
         hook_type = hook_utils.get_hook_type_via_status(heat_client,
                                                         args.stack)
 
-    for hook_string in args.hook:
-        hook = [b for b in hook_string.split('/') if b]
-        resource_pattern = hook[-1]
-        stack_id = args.stack
-
-        hook_utils.clear_wildcard_hooks(heat_client, stack_id, hook[:-1],
-                                        hook_type, resource_pattern)
+    columns = ['Stack', 'Resource Name', 'Result']
+    rows = []
+    failures = 0
+    for stack_id, resource_name, error in hook_utils.clear_hooks(
+            heat_client, args.stack, args.hook, hook_type,
+            max_workers=args.concurrency, rate_limit=args.rate_limit):
+        if error is None:
+            result = _('%s hook cleared') % hook_type
+        elif isinstance(error, heat_exc.HTTPNotFound):
+            # as with a single hook, resources which are gone are skipped
+            result = _('Stack or resource not found')
+        else:
+            result = str(error)
+            failures += 1
+        rows.append((stack_id, resource_name, result))
+    rows.sort()
+    return columns, rows, failures
@@ -18,8 +18,13 @@ from osc_lib.command import command
 
 from heatclient._i18n import _
 from heatclient.common import format_utils
+from heatclient.common import utils
 from heatclient import exc
 
+# Heat caps the nested depth of resource listings at its configured
+# max_nested_stack_depth, so this lists the resources of every nested stack
+MAX_NESTED_DEPTH = 99
+
 
 class ListStackFailures(command.Command):
     """Show information about failed stack resources."""
@@ -53,35 +58,91 @@ class ListStackFailures(command.Command):
         failed nested stack resources. A failed nested stack resource is only
         added to the failed list if it contains no failed resources.
         """
-        s = self.heat_client.stacks.get(stack)
+        s = self.heat_client.stacks.get(stack, lazy_outputs=True)
         if s.status != 'FAILED':
             return []
-        resources = self.heat_client.resources.list(s.id)
+        nested = self._list_nested_failed_resources(s.id)
+        if nested is None:
+            nested = self._walk_failed_resources(s.id)
         failures = collections.OrderedDict()
-        self._append_failed_resources(failures, resources, [s.stack_name])
+        self._append_failed_resources(failures, nested, s.id, [s.stack_name])
         return failures
 
-    def _append_failed_resources(self, failures, resources, resource_path):
+    def _list_nested_failed_resources(self, stack_id):
+        """List the failed resources of every nested stack at once.
+
+        :returns: dict of failed resources lists keyed by the ID of the stack
+            they belong to, or None if the API can't provide them in a single
+            request
+        """
+        try:
+            resources = self.heat_client.resources.list(
+                stack_id, nested_depth=MAX_NESTED_DEPTH,
+                filters={'status': 'FAILED'})
+        except exc.HTTPException:
+            return None
+        nested = collections.defaultdict(list)
+        for rsc in resources:
+            parent_id = None
+            for link in getattr(rsc, 'links', None) or []:
+                if link.get('rel') == 'stack' and link.get('href'):
+                    parent_id = link['href'].rstrip('/').split('/')[-1]
+            if parent_id is None:
+                return None
+            nested[parent_id].append(rsc)
+        return nested
+
+    def _walk_failed_resources(self, stack_id):
+        """List the failed resources one nested stack level at a time.
+
+        The nested stacks of all failed sibling resources are listed
+        concurrently.
+
+        :returns: dict of resources lists keyed by the ID of the stack they
+            belong to
+        """
+        nested = {stack_id: self.heat_client.resources.list(stack_id)}
+        to_list = self._failed_nested_stack_ids(nested[stack_id])
+        while to_list:
+            next_to_list = []
+            for nested_id, resources, error in utils.run_concurrently(
+                    self.heat_client.resources.list, to_list):
+                if isinstance(error, exc.HTTPNotFound):
+                    # there is a failed resource but no stack
+                    continue
+                elif error is not None:
+                    raise error
+                nested[nested_id] = resources
+                next_to_list.extend(self._failed_nested_stack_ids(resources))
+            to_list = [i for i in next_to_list if i not in nested]
+        return nested
+
+    @staticmethod
+    def _is_failed(rsc):
+        return rsc.resource_status.endswith('FAILED')
+
+    @staticmethod
+    def _is_nested(rsc):
+        return 'nested' in [link['rel'] for link in rsc.links]
+
+    def _failed_nested_stack_ids(self, resources):
+        return [rsc.physical_resource_id for rsc in resources
+                if self._is_failed(rsc) and self._is_nested(rsc)]
+
+    def _append_failed_resources(self, failures, nested, stack_id,
+                                 resource_path):
         """Recursively build list of failed resources."""
         appended = False
-        for rsc in resources:
-            if not rsc.resource_status.endswith('FAILED'):
+        for rsc in nested.get(stack_id, []):
+            if not self._is_failed(rsc):
                 continue
-            # determine if this resources is a nested stack
-            links_rel = list([link['rel'] for link in rsc.links])
-            is_nested = 'nested' in links_rel
             nested_appended = False
             next_resource_path = list(resource_path)
             next_resource_path.append(rsc.resource_name)
-            if is_nested:
-                try:
-                    nested_resources = self.heat_client.resources.list(
-                        rsc.physical_resource_id)
-                    nested_appended = self._append_failed_resources(
-                        failures, nested_resources, next_resource_path)
-                except exc.HTTPNotFound:
-                    # there is a failed resource but no stack
-                    pass
+            if self._is_nested(rsc):
+                nested_appended = self._append_failed_resources(
+                    failures, nested, rsc.physical_resource_id,
+                    next_resource_path)
             if not nested_appended:
                 failures['.'.join(next_resource_path)] = rsc
             appended = True
@@ -90,21 +151,27 @@ class ListStackFailures(command.Command):
     def _build_software_deployments(self, resources):
         """Build a dict of software deployments from the supplied resources.
 
-        The key is the deployment ID.
+        The key is the deployment ID. Deployments are fetched concurrently.
         """
         df = {}
         if not resources:
             return df
-        for r in resources.values():
-            if r.resource_type not in ('OS::Heat::StructuredDeployment',
-                                       'OS::Heat::SoftwareDeployment'):
+        deployment_ids = [
+            r.physical_resource_id for r in resources.values()
+            if r.resource_type in ('OS::Heat::StructuredDeployment',
+                                   'OS::Heat::SoftwareDeployment')]
+
+        def get_deployment(deployment_id):
+            return self.heat_client.software_deployments.get(
+                deployment_id=deployment_id)
+
+        for deployment_id, sd, error in utils.run_concurrently(
+                get_deployment, deployment_ids):
+            if isinstance(error, exc.HTTPNotFound):
                 continue
-            try:
-                sd = self.heat_client.software_deployments.get(
-                    deployment_id=r.physical_resource_id)
-                df[r.physical_resource_id] = sd
-            except exc.HTTPNotFound:
-                pass
+            elif error is not None:
+                raise error
+            df[deployment_id] = sd
         return df
 
     def _print_failures(self, failures, deployment_failures, long=False):
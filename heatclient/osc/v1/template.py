@@ -22,8 +22,10 @@ from heatclient._i18n import _
 from heatclient.common import format_utils
 from heatclient.common import http
 from heatclient.common import template_utils
+from heatclient.common import template_validator
 from heatclient.common import utils as heat_utils
 from heatclient import exc
+from heatclient.osc.v1 import common
 
 
 class ListColumn(columns.FormattableColumn):
@@ -99,10 +101,12 @@ class FunctionList(command.Lister):
         )
 
 
-class Validate(format_utils.YamlFormat):
+class Validate(common.BulkCommandMixin, format_utils.YamlFormat):
     """Validate a template"""
 
     log = logging.getLogger(__name__ + ".Validate")
+    failure_message = _('Unable to validate %(count)d of the %(total)d '
+                        'templates.')
 
     def get_parser(self, prog_name):
         parser = super().get_parser(prog_name)
@@ -136,11 +140,31 @@ class Validate(format_utils.YamlFormat):
             metavar='<error1,error2,...>',
             help=_('List of heat errors to ignore')
         )
+        parser.add_argument(
+            '--local',
+            action='store_true',
+            help=_('Only run the client side checks of the template '
+                   'structure and references, without sending it to the '
+                   'server for validation')
+        )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<concurrency>',
+            type=heat_utils.positive_int,
+            default=heat_utils.DEFAULT_CONCURRENCY,
+            help=_('Maximum number of templates validated in parallel when '
+                   'validating many templates. Default is %d')
+            % heat_utils.DEFAULT_CONCURRENCY
+        )
         parser.add_argument(
             '-t', '--template',
             metavar='<template>',
             required=True,
-            help=_('Path to the template')
+            action='append',
+            help=_('Path to the template. This can be a directory or a glob '
+                   'pattern, and can be specified multiple times to validate '
+                   'many templates, in which case a summary of the result '
+                   'for each template is displayed')
         )
         return parser
 
@@ -148,14 +172,26 @@ class Validate(format_utils.YamlFormat):
         self.log.debug("take_action(%s)", parsed_args)
 
         heat_client = self.app.client_manager.orchestration
-        return _validate(heat_client, parsed_args)
+        templates = template_utils.expand_template_paths(parsed_args.template)
+        if templates == parsed_args.template and len(templates) == 1:
+            return _validate(heat_client, parsed_args, templates[0])
 
+        # Child files which several templates include are only fetched once
+        file_cache = {}
+        columns, data, self.failures = common.run_bulk(
+            lambda path: _validate(heat_client, parsed_args, path,
+                                   file_cache=file_cache),
+            templates, max_workers=parsed_args.concurrency)
+        self.total = len(templates)
+        return columns, data
 
-def _validate(heat_client, args):
+
+def _validate(heat_client, args, template_path, file_cache=None):
     tpl_files, template = template_utils.process_template_path(
-        args.template,
+        template_path,
         object_request=http.authenticated_fetcher(heat_client),
-        fetch_child=args.files_container is None)
+        fetch_child=args.files_container is None,
+        file_cache=file_cache)
 
     env_files_list = []
     env_files, env = template_utils.process_multiple_environments_and_files(
@@ -169,6 +205,26 @@ def _validate(heat_client, args):
         'environment': env,
     }
 
+    # Catch the errors which can be found locally without a round trip.
+    # Errors to ignore are identified by server error codes, so the
+    # server is left to decide in that case.
+    if args.local or not args.ignore_errors:
+        validator = template_validator.TemplateValidator.from_client(
+            heat_client)
+        errors = validator.validate(
+            template,
+            files=fields['files'] if args.files_container is None else None,
+            environment=env)
+        if errors:
+            raise exc.CommandError(
+                _('Template validation failed:\n%s') % '\n'.join(errors))
+        if args.local:
+            validation = {'Description': template.get(
+                'description', template.get('Description', '')),
+                'Parameters': template.get(
+                    'parameters', template.get('Parameters', {}))}
+            return list(validation.keys()), list(validation.values())
+
     if args.ignore_errors:
         fields['ignore_errors'] = args.ignore_errors
 
@@ -15,22 +15,42 @@ Command-line interface to the Heat API.
 """
 
 import argparse
+import contextlib
+import io
 import logging
+import shlex
 import sys
+import threading
 
-from keystoneauth1.identity import generic
-from keystoneauth1 import session as kssession
+from oslo_serialization import jsonutils
 from oslo_utils import encodeutils
 from oslo_utils import importutils
 
 import heatclient
 from heatclient._i18n import _
-from heatclient import client as heat_client
+from heatclient.common import lazy
 from heatclient.common import utils
 from heatclient import exc
 
 osprofiler_profiler = importutils.try_import("osprofiler.profiler")
 
+# Only needed once a command talks to the API, so imported on first use
+generic = lazy.import_module('keystoneauth1.identity.generic')
+kssession = lazy.import_module('keystoneauth1.session')
+catalog_cache = lazy.import_module('heatclient.common.catalog_cache')
+heat_client = lazy.import_module('heatclient.client')
+http = lazy.import_module('heatclient.common.http')
+profiling = lazy.import_module('heatclient.common.profiling')
+token_cache = lazy.import_module('heatclient.common.token_cache')
+
+LOG = logging.getLogger(__name__)
+
+# Subcommands which can't be run by the batch subcommand
+NON_BATCH_COMMANDS = ('batch', 'bash-completion', 'bash_completion', 'help')
+
+# Commands which need a keystone session, and so can't use a cached token
+SESSION_COMMANDS = ('deployment-create',)
+
 
 class HeatShell:
 
@@ -271,6 +291,32 @@ class HeatShell:
                             default=False, action="store_true",
                             help=_("Print more verbose output."))
 
+        parser.add_argument('--stream-tables',
+                            default=bool(
+                                utils.env('HEATCLIENT_STREAM_TABLES')),
+                            action='store_true',
+                            help=_('Write tables row by row as they are '
+                                   'formatted, sizing their columns from the '
+                                   'first rows, instead of rendering them '
+                                   'whole. Defaults to %(value)s.') % {
+                                'value': 'env[HEATCLIENT_STREAM_TABLES]'
+                            })
+
+        parser.add_argument('--token-cache',
+                            default=bool(utils.env('HEATCLIENT_TOKEN_CACHE')),
+                            action='store_true',
+                            help=_('Cache the token and the Heat API URL '
+                                   'obtained from keystone, encrypted, in '
+                                   'the heatclient cache directory, and '
+                                   'reuse them until the token expires. '
+                                   'Commands which need a keystone session, '
+                                   'such as deployment-create, always '
+                                   'authenticate. Requires the cryptography '
+                                   'library. '
+                                   'Defaults to %(value)s.') % {
+                                'value': 'env[HEATCLIENT_TOKEN_CACHE]'
+                            })
+
         parser.add_argument('--api-timeout',
                             help=_('Number of seconds to wait for an '
                                    'API response, '
@@ -325,6 +371,20 @@ class HeatShell:
 
         self._append_global_identity_args(parser)
 
+        parser.add_argument('--profile-file',
+                            metavar='<FILE>',
+                            default=utils.env('HEATCLIENT_PROFILE_FILE'),
+                            help=_('Profile the command with cProfile and '
+                                   'write the profile to <FILE>, and a JSON '
+                                   'report to <FILE>.json. The report '
+                                   'breaks the time of the command down '
+                                   'into template processing, HTTP '
+                                   'requests and formatting, and counts '
+                                   'the calls of each manager method and '
+                                   'API path. Defaults to %(value)s.') % {
+                                'value': 'env[HEATCLIENT_PROFILE_FILE]'
+                            })
+
         if osprofiler_profiler:
             parser.add_argument(
                 '--profile',
@@ -339,16 +399,23 @@ class HeatShell:
                        'even if osprofiler is enabled on server side.'))
         return parser
 
-    def get_subcommand_parser(self, version):
+    def get_subcommand_parser(self, version, command=None):
+        """Build the parser of the subcommands.
+
+        :param version: API version of the subcommands
+        :param command: name of the only subcommand to build the parser of,
+            or None to build them all
+        """
         parser = self.get_base_parser()
 
         self.subcommands = {}
         subparsers = parser.add_subparsers(metavar='<subcommand>')
         submodule = importutils.import_versioned_module('heatclient',
                                                         version, 'shell')
-        self._find_actions(subparsers, submodule)
-        self._find_actions(subparsers, self)
-        self._add_bash_completion_subparser(subparsers)
+        self._find_actions(subparsers, submodule, command)
+        self._find_actions(subparsers, self, command)
+        if command is None:
+            self._add_bash_completion_subparser(subparsers)
 
         return parser
 
@@ -361,10 +428,12 @@ class HeatShell:
         self.subcommands['bash_completion'] = subparser
         subparser.set_defaults(func=self.do_bash_completion)
 
-    def _find_actions(self, subparsers, actions_module):
+    def _find_actions(self, subparsers, actions_module, only=None):
         for attr in (a for a in dir(actions_module) if a.startswith('do_')):
             # I prefer to be hyphen-separated instead of underscores.
             command = attr[3:].replace('_', '-')
+            if only is not None and command != only:
+                continue
             callback = getattr(actions_module, attr)
             desc = callback.__doc__ or ''
             help = desc.strip().split('\n')[0]
@@ -383,6 +452,22 @@ class HeatShell:
                 subparser.add_argument(*args, **kwargs)
             subparser.set_defaults(func=callback)
 
+    def _find_command(self, version, args):
+        """Return the subcommand selected by args, if it needs no other."""
+        if not args or args[0].startswith('-'):
+            return None
+        command = args[0]
+        if '_' in command or command in ('help', 'bash-completion'):
+            # help describes every other subcommand, and underscores only
+            # match the bash_completion subcommand
+            return None
+        submodule = importutils.import_versioned_module('heatclient',
+                                                        version, 'shell')
+        attr = 'do_%s' % command.replace('-', '_')
+        if hasattr(submodule, attr) or hasattr(self, attr):
+            return command
+        return None
+
     def _setup_logging(self, debug):
         log_lvl = logging.DEBUG if debug else logging.WARNING
         logging.basicConfig(
@@ -424,10 +509,13 @@ class HeatShell:
         (options, args) = parser.parse_known_args(argv)
         self._setup_logging(options.debug)
         self._setup_verbose(options.verbose)
+        utils.STREAM_TABLES = options.stream_tables
 
-        # build available subcommands based on version
+        # build available subcommands based on version, only building the
+        # selected one when it is known, as the others won't be used
         api_version = options.heat_api_version
-        subcommand_parser = self.get_subcommand_parser(api_version)
+        command = self._find_command(api_version, args)
+        subcommand_parser = self.get_subcommand_parser(api_version, command)
         self.parser = subcommand_parser
 
         # Handle top-level --help/-h before attempting to parse
@@ -493,7 +581,15 @@ class HeatShell:
         }
 
         service_type = args.os_service_type or 'orchestration'
-        if args.os_no_client_auth:
+        endpoint_type = args.os_endpoint_type or 'publicURL'
+        self._token_cache = None
+        if command not in SESSION_COMMANDS:
+            self._token_cache = self._get_token_cache(args, service_type,
+                                                      endpoint_type)
+        cached_kwargs = self._cached_client_kwargs(args)
+        if cached_kwargs:
+            kwargs = cached_kwargs
+        elif args.os_no_client_auth:
             # Do not use session since no_client_auth means using heat to
             # to authenticate
             kwargs = {
@@ -508,7 +604,6 @@ class HeatShell:
             }
         else:
             keystone_session = self._get_keystone_session(**kwargs)
-            endpoint_type = args.os_endpoint_type or 'publicURL'
             if args.os_auth_token:
                 kwargs = {
                     'token': args.os_auth_token,
@@ -545,13 +640,19 @@ class HeatShell:
                 'endpoint_override': args.heat_url,
             }
 
-        client = heat_client.Client(api_version, **kwargs)
-
         profile = osprofiler_profiler and options.profile
         if profile:
             osprofiler_profiler.init(options.profile)
 
-        args.func(client, args)
+        if args.profile_file:
+            with profiling.CommandProfiler(args.profile_file,
+                                           command) as profiler:
+                client = heat_client.Client(api_version, **kwargs)
+                profiler.attach(client)
+                self._run_command(client, args, kwargs, cached_kwargs)
+        else:
+            client = heat_client.Client(api_version, **kwargs)
+            self._run_command(client, args, kwargs, cached_kwargs)
 
         if profile:
             trace_id = osprofiler_profiler.get().get_base_id()
@@ -559,6 +660,230 @@ class HeatShell:
             print(_("To display trace use next command:\n"
                   "osprofiler trace show --html %s ") % trace_id)
 
+    def _run_command(self, client, args, kwargs, cached_kwargs):
+        try:
+            args.func(client, args)
+        except exc.HTTPUnauthorized:
+            if cached_kwargs:
+                # authenticate again on the next run
+                self._token_cache[0].invalidate(self._token_cache[1])
+            raise
+        if not cached_kwargs:
+            self._store_token(client, kwargs, args)
+
+    def _get_token_cache(self, args, service_type, endpoint_type):
+        """Return the token cache, its key and secret, or None."""
+        if not args.token_cache or args.os_no_client_auth:
+            return None
+        if not token_cache.is_supported():
+            LOG.warning(_('The token cache requires the cryptography '
+                          'library, not caching the token.'))
+            return None
+        key = token_cache.TokenCache.cache_key(
+            auth_url=args.os_auth_url,
+            username=args.os_username,
+            user_id=args.os_user_id,
+            user_domain_id=args.os_user_domain_id,
+            user_domain_name=args.os_user_domain_name,
+            project_id=args.os_project_id or args.os_tenant_id,
+            project_name=args.os_project_name or args.os_tenant_name,
+            project_domain_id=args.os_project_domain_id,
+            project_domain_name=args.os_project_domain_name,
+            region_name=args.os_region_name,
+            service_type=service_type,
+            endpoint_type=endpoint_type,
+            heat_url=args.heat_url)
+        cache = token_cache.TokenCache(catalog_cache.default_cache_dir())
+        return cache, key, args.os_auth_token or args.os_password
+
+    def _cached_client_kwargs(self, args):
+        """Return client arguments using the cached token, if any.
+
+        The cached token and endpoint are used by a client without keystone
+        session, so that keystone isn't contacted at all.
+        """
+        if self._token_cache is None:
+            return None
+        cached = self._token_cache[0].get(*self._token_cache[1:])
+        if cached is None:
+            return None
+        LOG.debug('Using the cached token for %s', cached[1])
+        kwargs = {
+            'token': cached[0],
+            'endpoint': cached[1],
+            'region_name': args.os_region_name,
+            'username': args.os_username,
+            'password': args.os_password,
+            'include_pass': args.include_password,
+            'insecure': args.insecure,
+            'cert_file': args.os_cert,
+            'key_file': args.os_key,
+            'timeout': args.api_timeout,
+        }
+        if args.os_cacert:
+            kwargs['ca_file'] = args.os_cacert
+        return kwargs
+
+    def _store_token(self, client, kwargs, args):
+        if self._token_cache is None:
+            return
+        auth_ref = getattr(kwargs.get('auth'), 'auth_ref', None)
+        if auth_ref is None or auth_ref.expires is None:
+            # the command didn't authenticate
+            return
+        try:
+            endpoint = args.heat_url or client.http_client.get_endpoint()
+        except Exception as e:
+            LOG.debug('Unable to get the Heat API URL: %s', e)
+            return
+        if endpoint:
+            cache, key, secret = self._token_cache
+            cache.store(key, secret, auth_ref.auth_token, endpoint,
+                        auth_ref.expires.timestamp())
+
+    @utils.arg('file', metavar='<FILE>', nargs='?', default='-',
+               help=_('File to read the commands from, or "-" to read them '
+                      'from standard input, the default. Each line holds '
+                      'the arguments of a subcommand, e.g. "resource-show '
+                      'mystack server", or a JSON object with the '
+                      'subcommand, its arguments and an optional id to '
+                      'report with its result, e.g. {"command": '
+                      '"resource-show", "args": ["mystack", "server"]}. '
+                      'Empty lines and lines starting with # are ignored.'))
+    @utils.arg('--concurrency', metavar='<COUNT>', type=utils.positive_int,
+               default=1,
+               help=_('Maximum number of commands run at once, '
+                      'defaults to 1.'))
+    @utils.arg('--results', metavar='<FORMAT>', default='text',
+               choices=['text', 'json'],
+               help=_('Write the output of each command as it is (text), '
+                      'or as one JSON object per command with its status '
+                      'and output (json). Results are written in the order '
+                      'of the commands. Defaults to text.'))
+    def do_batch(self, hc, args):
+        """Run many subcommands with a single authenticated client."""
+        parser = self.get_subcommand_parser(args.heat_api_version)
+        if args.file == '-':
+            jobs = self._read_batch(parser, sys.stdin)
+        else:
+            with open(args.file) as f:
+                jobs = self._read_batch(parser, f)
+        http.share_connections(hc.http_client, args.concurrency)
+
+        stdout = sys.stdout
+        batch_stdout = _BatchStdout(stdout)
+
+        def run(job):
+            if job['error'] or job['args'] is None:
+                return
+            batch_stdout.local.buffer = io.StringIO()
+            try:
+                job['args'].func(hc, job['args'])
+            except SystemExit as e:
+                self._batch_exit(job, e, _('Command exited'))
+            except Exception as e:
+                job['error'] = str(e)
+            finally:
+                job['output'] = batch_stdout.local.buffer.getvalue()
+                del batch_stdout.local.buffer
+
+        # results are written in order, as soon as the commands before them
+        # have completed
+        done = set()
+        next_job = 0
+        sys.stdout = batch_stdout
+        try:
+            for job, _result, _error in utils.run_concurrently(
+                    run, jobs, max_workers=args.concurrency):
+                done.add(job['index'])
+                while next_job in done:
+                    self._write_batch_result(jobs[next_job], args.results,
+                                             stdout)
+                    next_job += 1
+        finally:
+            sys.stdout = stdout
+
+        failed = len([job for job in jobs if job['error']])
+        if failed:
+            raise exc.CommandError(_('%(failed)d of %(total)d commands '
+                                     'failed') % {'failed': failed,
+                                                  'total': len(jobs)})
+
+    def _read_batch(self, parser, lines):
+        jobs = []
+        for number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            job = {'index': len(jobs), 'line': number, 'id': None,
+                   'command': None, 'args': None, 'output': '',
+                   'error': None, 'exit_code': None}
+            jobs.append(job)
+            try:
+                if line.startswith('{'):
+                    data = jsonutils.loads(line)
+                    job['id'] = data.get('id')
+                    job['command'] = ([data['command']] +
+                                      [str(a) for a in data.get('args', [])])
+                else:
+                    job['command'] = shlex.split(line)
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                job['error'] = _('Invalid command: %s') % e
+                continue
+            if job['command'][0] in NON_BATCH_COMMANDS:
+                job['error'] = (_('%s can not be run in a batch')
+                                % job['command'][0])
+                continue
+            output = io.StringIO()
+            errors = io.StringIO()
+            try:
+                with contextlib.redirect_stdout(output), \
+                        contextlib.redirect_stderr(errors):
+                    job['args'] = parser.parse_args(job['command'])
+            except SystemExit as e:
+                # --help writes the help and exits successfully
+                job['output'] = output.getvalue()
+                lines = errors.getvalue().strip().splitlines()
+                self._batch_exit(job, e,
+                                 lines[-1] if lines else _('Invalid command'))
+        return jobs
+
+    @staticmethod
+    def _batch_exit(job, e, message):
+        """Record the exit of a batch command, a failure unless code is 0."""
+        code = e.code
+        if code is None:
+            code = 0
+        elif not isinstance(code, int):
+            message = str(code)
+            code = 1
+        if code:
+            job['error'] = message
+            job['exit_code'] = code
+
+    def _write_batch_result(self, job, results, stdout):
+        if results == 'json':
+            result = {'line': job['line'], 'command': job['command'],
+                      'status': 'FAILED' if job['error'] else 'OK',
+                      'output': job['output']}
+            if job['id'] is not None:
+                result['id'] = job['id']
+            if job['error']:
+                result['error'] = job['error']
+            if job['exit_code'] is not None:
+                result['exit_code'] = job['exit_code']
+            stdout.write(jsonutils.dumps(result))
+            stdout.write('\n')
+        else:
+            stdout.write(job['output'])
+            if job['exit_code'] is not None:
+                print(_('ERROR: line %(line)d: %(error)s (exit code '
+                        '%(exit_code)d)') % job, file=sys.stderr)
+            elif job['error']:
+                print(_('ERROR: line %(line)d: %(error)s') % job,
+                      file=sys.stderr)
+        stdout.flush()
+
     def do_bash_completion(self, args):
         """Prints all of the commands and options to stdout.
 
@@ -589,6 +914,30 @@ class HeatShell:
             self.parser.print_help()
 
 
+class _BatchStdout:
+    """Standard output capturing what each batch command writes.
+
+    Writes go to the buffer of the command run by the current thread, if
+    any, or to the wrapped stdout.
+    """
+
+    def __init__(self, stdout):
+        self.stdout = stdout
+        self.local = threading.local()
+
+    def _target(self):
+        return getattr(self.local, 'buffer', self.stdout)
+
+    def write(self, data):
+        return self._target().write(data)
+
+    def flush(self):
+        self._target().flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stdout, name)
+
+
 class HelpFormatter(argparse.HelpFormatter):
     def start_section(self, heading):
         # Title-case the headings
@@ -0,0 +1,710 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""In-process fake of the orchestration API, for benchmarks and load tests.
+
+:class:`FakeHeatAPI` is a WSGI application serving stacks, nested stacks,
+resources, events, outputs and software deployments from memory, with
+latency and errors which can be injected. :class:`FakeHeatServer` serves it
+on localhost with kept alive connections, e.g.::
+
+    api = FakeHeatAPI(latency=0.01, error_rate=0.01, seed=1)
+    api.populate(stacks=100, resources=10, nested_depth=1)
+    with FakeHeatServer(api) as server:
+        hc = heatclient.client.Client('1', endpoint=server.endpoint,
+                                      token='token')
+        hc.stacks.list()
+"""
+
+import collections
+import datetime
+import http.server
+import io
+import itertools
+import random
+import threading
+import time
+from urllib import parse
+import uuid
+
+from oslo_serialization import jsonutils
+
+TENANT_ID = 'f0c8a8a5a6a64d3c9dca3b1c1f8c4a3e'
+
+BASE_TIME = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+
+STATUS_REASONS = {
+    'CREATE_IN_PROGRESS': 'state changed',
+    'CREATE_COMPLETE': 'state changed',
+    'CREATE_FAILED': 'Resource CREATE failed: Error: resources.server: '
+                     'Quota exceeded',
+}
+
+RESOURCE_TYPES = ('OS::Nova::Server', 'OS::Neutron::Port',
+                  'OS::Cinder::Volume', 'OS::Heat::SoftwareDeployment',
+                  'OS::Heat::RandomString')
+
+NESTED_TYPE = 'OS::Heat::Stack'
+
+
+class FakeHeatAPI:
+    """WSGI application faking the orchestration API v1.
+
+    Requests may be sent with or without the /v1/<tenant_id> prefix.
+
+    :param latency: seconds each request is delayed by, or callable taking
+        the method and path of the request and returning them
+    :param error_rate: probability of a request failing with error_status,
+        between 0 and 1
+    :param error_status: status code of injected errors
+    :param seed: seed of the random choices, for reproducible runs
+    :param max_page_size: maximum number of stacks or events returned by a
+        list request, as with the limits of the API, or None
+    """
+
+    def __init__(self, latency=0, error_rate=0.0, error_status=503,
+                 seed=None, max_page_size=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.max_page_size = max_page_size
+        self.random = random.Random(seed)
+        self.stacks = collections.OrderedDict()
+        self.configs = collections.OrderedDict()
+        self.deployments = collections.OrderedDict()
+        # number of requests served, by method and first path segment
+        self.requests = collections.Counter()
+        self._lock = threading.RLock()
+        self._clock = itertools.count()
+        self._ids = itertools.count()
+
+    # Data
+
+    def _uuid(self):
+        return str(uuid.UUID(int=self.random.getrandbits(128)))
+
+    def _now(self):
+        seconds = next(self._clock)
+        return (BASE_TIME + datetime.timedelta(seconds=seconds)).strftime(
+            '%Y-%m-%dT%H:%M:%SZ')
+
+    def add_stack(self, name, resources=3, nested_depth=0, outputs=2,
+                  failed=False, parent=None):
+        """Add a stack which has been created.
+
+        :param name: stack name
+        :param resources: number of resources of the stack and of each of
+            its nested stacks, not counting the nested stack resources
+        :param nested_depth: levels of nested stacks below the stack, each
+            stack but the deepest having a nested_stack resource
+        :param outputs: number of outputs of the stack
+        :param failed: whether the creation of the last resource failed
+        :param parent: the parent stack, for nested stacks
+        :returns: the stack
+        """
+        with self._lock:
+            stack_id = self._uuid()
+            stack = {
+                'id': stack_id,
+                'stack_name': name,
+                'description': 'Stack %s' % name,
+                'creation_time': self._now(),
+                'updated_time': None,
+                'deletion_time': None,
+                'stack_status': 'CREATE_IN_PROGRESS',
+                'stack_status_reason': 'Stack CREATE started',
+                'stack_owner': 'admin',
+                'parent': parent['id'] if parent else None,
+                'parameters': {'OS::stack_name': name,
+                               'OS::stack_id': stack_id,
+                               'OS::project_id': TENANT_ID},
+                'template': {'heat_template_version': '2016-10-14',
+                             'resources': {}, 'outputs': {}},
+                'resources': collections.OrderedDict(),
+                'events': [],
+                'outputs': [],
+                'tags': None,
+            }
+            self.stacks[stack_id] = stack
+            self._add_event(stack, None, 'CREATE_IN_PROGRESS',
+                            'Stack CREATE started')
+            for index in range(resources):
+                rsrc_type = RESOURCE_TYPES[index % len(RESOURCE_TYPES)]
+                self._add_resource(stack, 'resource_%d' % index, rsrc_type,
+                                   failed and index == resources - 1)
+            if nested_depth:
+                rsrc = self._add_resource(stack, 'nested_stack', NESTED_TYPE)
+                nested = self.add_stack(
+                    f'{name}-nested_stack-{self._uuid()[:12]}',
+                    resources, nested_depth - 1, outputs=0,
+                    parent=stack)
+                rsrc['physical_resource_id'] = nested['id']
+                rsrc['nested'] = nested['id']
+            for index in range(outputs):
+                key = 'output_%d' % index
+                stack['outputs'].append({
+                    'output_key': key,
+                    'description': 'Output %d' % index,
+                    'output_value': '10.0.0.%d' % (index + 1)})
+                stack['template']['outputs'][key] = {
+                    'value': {'get_attr': ['resource_0', 'first_address']}}
+            if failed:
+                stack['stack_status'] = 'CREATE_FAILED'
+                stack['stack_status_reason'] = STATUS_REASONS['CREATE_FAILED']
+            else:
+                stack['stack_status'] = 'CREATE_COMPLETE'
+                stack['stack_status_reason'] = (
+                    'Stack CREATE completed successfully')
+            self._add_event(stack, None, stack['stack_status'],
+                            stack['stack_status_reason'])
+            return stack
+
+    def _add_resource(self, stack, name, rsrc_type, failed=False):
+        status = 'CREATE_FAILED' if failed else 'CREATE_COMPLETE'
+        rsrc = {
+            'resource_name': name,
+            'logical_resource_id': name,
+            'physical_resource_id': '' if failed else self._uuid(),
+            'resource_type': rsrc_type,
+            'resource_status': status,
+            'resource_status_reason': STATUS_REASONS[status],
+            'creation_time': self._now(),
+            'updated_time': self._now(),
+            'required_by': [],
+            'attributes': {'first_address': '10.0.0.1'},
+            'description': '',
+            'nested': None,
+        }
+        stack['resources'][name] = rsrc
+        stack['template']['resources'][name] = {'type': rsrc_type}
+        self._add_event(stack, name, 'CREATE_IN_PROGRESS',
+                        STATUS_REASONS['CREATE_IN_PROGRESS'])
+        self._add_event(stack, name, status, STATUS_REASONS[status])
+        return rsrc
+
+    def _add_event(self, stack, resource_name, status, reason):
+        if resource_name is None:
+            physical_id = stack['id']
+            resource_name = stack['stack_name']
+        else:
+            physical_id = stack['resources'][resource_name][
+                'physical_resource_id']
+        stack['events'].append({
+            'id': self._uuid(),
+            'event_time': self._now(),
+            'resource_name': resource_name,
+            'logical_resource_id': resource_name,
+            'physical_resource_id': physical_id,
+            'resource_status': status,
+            'resource_status_reason': reason,
+            'resource_properties': {},
+        })
+
+    def populate(self, stacks=10, resources=3, nested_depth=0, outputs=2,
+                 deployments=0, failed_rate=0.0):
+        """Add stacks, and software deployments on their servers.
+
+        :param stacks: number of top level stacks
+        :param failed_rate: probability of a stack having failed
+        :param deployments: number of software deployments per server
+        """
+        for index in range(stacks):
+            stack = self.add_stack(
+                'stack_%d' % index, resources, nested_depth, outputs,
+                failed=self.random.random() < failed_rate)
+            for rsrc in stack['resources'].values():
+                if rsrc['resource_type'] != 'OS::Nova::Server':
+                    continue
+                for _ in range(deployments):
+                    config = self.add_config('config_%d' % next(self._ids))
+                    self.add_deployment(config['id'],
+                                        rsrc['physical_resource_id'])
+
+    def add_config(self, name, config='#!/bin/sh\necho deployed\n',
+                   group='script'):
+        with self._lock:
+            sc = {'id': self._uuid(), 'name': name, 'group': group,
+                  'config': config, 'inputs': [], 'outputs': [],
+                  'options': {}, 'creation_time': self._now()}
+            self.configs[sc['id']] = sc
+            return sc
+
+    def add_deployment(self, config_id, server_id, status='COMPLETE',
+                       action='CREATE'):
+        with self._lock:
+            sd = {'id': self._uuid(), 'config_id': config_id,
+                  'server_id': server_id, 'action': action,
+                  'status': status, 'status_reason': 'Outputs received',
+                  'input_values': {}, 'output_values': {
+                      'deploy_stdout': 'deployed\n', 'deploy_stderr': '',
+                      'deploy_status_code': 0},
+                  'creation_time': self._now(), 'updated_time': None}
+            self.deployments[sd['id']] = sd
+            return sd
+
+    # WSGI
+
+    def __call__(self, environ, start_response):
+        method = environ['REQUEST_METHOD']
+        path = environ.get('PATH_INFO', '')
+        segments = [parse.unquote(s) for s in path.strip('/').split('/')
+                    if s]
+        if segments[:1] == ['v1']:
+            segments = segments[2:]
+        query = parse.parse_qs(environ.get('QUERY_STRING', ''))
+        base_url = '{}://{}/v1/{}'.format(
+            environ.get('wsgi.url_scheme', 'http'),
+            environ.get('HTTP_HOST', 'localhost'), TENANT_ID)
+        with self._lock:
+            self.requests[(method, segments[0] if segments else '')] += 1
+            inject_error = self.random.random() < self.error_rate
+
+        latency = self.latency
+        if callable(latency):
+            latency = latency(method, path)
+        if latency:
+            time.sleep(latency)
+
+        if inject_error:
+            status, headers, body = self._error(
+                self.error_status, 'Injected error', 'InjectedError')
+        else:
+            length = int(environ.get('CONTENT_LENGTH') or 0)
+            data = environ['wsgi.input'].read(length) if length else b''
+            try:
+                body = jsonutils.loads(data) if data else None
+            except ValueError:
+                body = None
+            with self._lock:
+                status, headers, body = self._route(
+                    method, segments, query, body, base_url)
+
+        if body is None:
+            content = b''
+        else:
+            content = jsonutils.dump_as_bytes(body)
+            headers = [('Content-Type', 'application/json')] + headers
+        headers.append(('Content-Length', str(len(content))))
+        start_response('%d %s' % (status, http.HTTPStatus(status).phrase),
+                       headers)
+        return [content]
+
+    def _error(self, status, message, error_type):
+        title = http.HTTPStatus(status).phrase
+        return status, [], {
+            'code': status, 'title': title,
+            'explanation': message,
+            'error': {'message': message, 'type': error_type,
+                      'traceback': None}}
+
+    def _not_found(self, what):
+        return self._error(404, 'The %s could not be found.' % what,
+                           'EntityNotFound')
+
+    def _route(self, method, segments, query, body, base_url):
+        if not segments:
+            return self._not_found('path')
+        collection = segments[0]
+        if collection == 'stacks':
+            return self._route_stacks(method, segments[1:], query, body,
+                                      base_url)
+        if collection == 'software_deployments':
+            return self._route_deployments(method, segments[1:], query,
+                                           body)
+        if collection == 'software_configs':
+            return self._route_configs(method, segments[1:], body)
+        if collection == 'build_info' and method == 'GET':
+            return 200, [], {'api': {'revision': 'fake'},
+                             'engine': {'revision': 'fake'}}
+        return self._not_found('path /%s' % '/'.join(segments))
+
+    # Stacks
+
+    def _find_stack(self, name_or_id):
+        if name_or_id in self.stacks:
+            return self.stacks[name_or_id]
+        for stack in self.stacks.values():
+            if stack['stack_name'] == name_or_id:
+                return stack
+
+    def _stack_url(self, base_url, stack):
+        return '{}/stacks/{}/{}'.format(base_url, stack['stack_name'],
+                                        stack['id'])
+
+    def _route_stacks(self, method, segments, query, body, base_url):
+        if not segments:
+            if method == 'GET':
+                return self._list_stacks(query, base_url)
+            if method == 'POST':
+                return self._create_stack(body, base_url)
+            return self._error(405, 'Method not allowed',
+                               'HTTPMethodNotAllowed')
+        stack = self._find_stack(segments[0])
+        if stack is None:
+            return self._not_found('Stack (%s)' % segments[0])
+        if len(segments) == 1 or stack['id'] != segments[1]:
+            # stacks:lookup, redirecting to the stack and any sub path
+            location = '/'.join([self._stack_url(base_url, stack)] +
+                                [parse.quote(s) for s in segments[1:]])
+            if query:
+                location += '?' + parse.urlencode(query, doseq=True)
+            return 302, [('Location', location)], None
+        segments = segments[2:]
+        if not segments:
+            if method == 'GET':
+                return 200, [], {'stack': self._stack_detail(
+                    stack, base_url, query)}
+            if method == 'DELETE':
+                self._delete_stack(stack)
+                return 204, [], None
+        elif segments[0] == 'resources':
+            return self._route_resources(stack, segments[1:], query,
+                                         base_url)
+        elif segments[0] == 'events' and len(segments) == 1:
+            return 200, [], {'events': self._list_events(
+                stack, None, query, base_url)}
+        elif segments[0] == 'outputs':
+            return self._route_outputs(stack, segments[1:])
+        elif segments[0] == 'template' and len(segments) == 1:
+            return 200, [], stack['template']
+        return self._not_found('path')
+
+    def _stack_summary(self, stack, base_url):
+        summary = {k: v for k, v in stack.items()
+                   if k not in ('parent', 'parameters', 'template',
+                                'resources', 'events', 'outputs')}
+        summary['links'] = [{'href': self._stack_url(base_url, stack),
+                             'rel': 'self'}]
+        if stack['parent']:
+            summary['parent'] = stack['parent']
+        return summary
+
+    def _stack_detail(self, stack, base_url, query):
+        detail = self._stack_summary(stack, base_url)
+        detail['parameters'] = stack['parameters']
+        detail['timeout_mins'] = None
+        detail['disable_rollback'] = True
+        detail['capabilities'] = []
+        detail['notification_topics'] = []
+        if query.get('resolve_outputs', ['true'])[0].lower() != 'false':
+            detail['outputs'] = stack['outputs']
+        return detail
+
+    def _paginate(self, items, query, key='id'):
+        marker = query.get('marker', [None])[0]
+        if marker is not None:
+            ids = [item[key] for item in items]
+            if marker not in ids:
+                return None
+            items = items[ids.index(marker) + 1:]
+        limit = query.get('limit', [None])[0]
+        limits = [int(limit)] if limit else []
+        if self.max_page_size:
+            limits.append(self.max_page_size)
+        if limits:
+            items = items[:min(limits)]
+        return items
+
+    def _list_stacks(self, query, base_url):
+        stacks = list(self.stacks.values())
+        if query.get('show_nested', ['false'])[0].lower() != 'true':
+            stacks = [s for s in stacks if not s['parent']]
+        for key in ('stack_name', 'stack_status', 'id'):
+            if key in query:
+                stacks = [s for s in stacks if s[key] in query[key]]
+        if query.get('sort_dir', ['desc'])[0] == 'desc':
+            stacks.reverse()
+        stacks = self._paginate(stacks, query)
+        if stacks is None:
+            return self._not_found('marker')
+        return 200, [], {'stacks': [self._stack_summary(s, base_url)
+                                    for s in stacks]}
+
+    def _create_stack(self, body, base_url):
+        body = body or {}
+        name = body.get('stack_name')
+        if not name:
+            return self._error(400, 'The stack name is missing',
+                               'HTTPBadRequest')
+        if self._find_stack(name) is not None:
+            return self._error(409, 'The Stack (%s) already exists.' % name,
+                               'StackExists')
+        template = body.get('template') or {}
+        resources = template.get('resources') or {}
+        stack = self.add_stack(name, resources=0, outputs=0)
+        for rsrc_name, rsrc in resources.items():
+            self._add_resource(stack, rsrc_name,
+                               (rsrc or {}).get('type', 'OS::Heat::None'))
+        stack['template'] = template
+        for key, output in (template.get('outputs') or {}).items():
+            stack['outputs'].append({
+                'output_key': key,
+                'description': (output or {}).get('description', ''),
+                'output_value': None})
+        return 201, [('Location', self._stack_url(base_url, stack))], {
+            'stack': {'id': stack['id'], 'links': [{
+                'href': self._stack_url(base_url, stack), 'rel': 'self'}]}}
+
+    def _delete_stack(self, stack):
+        for rsrc in stack['resources'].values():
+            nested = self.stacks.get(rsrc['nested'])
+            if nested is not None:
+                self._delete_stack(nested)
+        del self.stacks[stack['id']]
+
+    # Resources and events
+
+    def _nested_resources(self, stack, depth, parent_name):
+        resources = [(stack, rsrc, parent_name)
+                     for rsrc in stack['resources'].values()]
+        if depth > 0:
+            for rsrc in stack['resources'].values():
+                nested = self.stacks.get(rsrc['nested'])
+                if nested is not None:
+                    resources.extend(self._nested_resources(
+                        nested, depth - 1, rsrc['resource_name']))
+        return resources
+
+    def _resource_info(self, stack, rsrc, base_url, parent_name=None):
+        info = {k: v for k, v in rsrc.items() if k != 'nested'}
+        stack_url = self._stack_url(base_url, stack)
+        info['links'] = [
+            {'href': '{}/resources/{}'.format(stack_url,
+                                              rsrc['resource_name']),
+             'rel': 'self'},
+            {'href': stack_url, 'rel': 'stack'}]
+        nested = self.stacks.get(rsrc['nested'])
+        if nested is not None:
+            info['links'].append({'href': self._stack_url(base_url, nested),
+                                  'rel': 'nested'})
+        if parent_name is not None:
+            info['parent_resource'] = parent_name
+        return info
+
+    def _route_resources(self, stack, segments, query, base_url):
+        if not segments:
+            depth = int(query.get('nested_depth', ['0'])[0])
+            return 200, [], {'resources': [
+                self._resource_info(s, r, base_url, parent)
+                for s, r, parent in self._nested_resources(stack, depth,
+                                                           None)]}
+        rsrc = stack['resources'].get(segments[0])
+        if rsrc is None:
+            return self._not_found('Resource (%s)' % segments[0])
+        if len(segments) == 1:
+            return 200, [], {'resource': self._resource_info(
+                stack, rsrc, base_url)}
+        if segments[1] == 'events':
+            events = self._list_events(stack, rsrc['resource_name'], query,
+                                       base_url)
+            if len(segments) == 2:
+                return 200, [], {'events': events}
+            for event in events:
+                if event['id'] == segments[2]:
+                    return 200, [], {'event': event}
+            return self._not_found('Event (%s)' % segments[2])
+        if segments[1] == 'metadata':
+            return 200, [], {'metadata': {}}
+        return self._not_found('path')
+
+    def _event_info(self, stack, event, base_url, root):
+        info = dict(event)
+        stack_url = self._stack_url(base_url, stack)
+        info['links'] = [
+            {'href': '{}/resources/{}/events/{}'.format(
+                stack_url, event['resource_name'], event['id']),
+             'rel': 'self'},
+            {'href': '{}/resources/{}'.format(stack_url,
+                                              event['resource_name']),
+             'rel': 'resource'},
+            {'href': stack_url, 'rel': 'stack'}]
+        if root is not None:
+            info['links'].append({'href': self._stack_url(base_url, root),
+                                  'rel': 'root_stack'})
+        return info
+
+    def _list_events(self, stack, resource_name, query, base_url):
+        depth = int(query.get('nested_depth', ['0'])[0])
+        root = stack if depth else None
+        stacks = [stack]
+        if depth:
+            stacks.extend(self.stacks[r['nested']]
+                          for _s, r, _p in self._nested_resources(
+                              stack, depth - 1, None)
+                          if r['nested'] in self.stacks)
+        events = [self._event_info(s, e, base_url, root)
+                  for s in stacks for e in s['events']]
+        events.sort(key=lambda e: e['event_time'])
+        if resource_name is not None:
+            events = [e for e in events
+                      if e['resource_name'] == resource_name]
+        for key in ('resource_status', 'resource_action', 'resource_name'):
+            if key in query:
+                events = [e for e in events if e.get(key) in query[key]]
+        if query.get('sort_dir', ['asc'])[0] == 'desc':
+            events.reverse()
+        return self._paginate(events, query) or []
+
+    def _route_outputs(self, stack, segments):
+        if not segments:
+            return 200, [], {'outputs': [
+                {'output_key': o['output_key'],
+                 'description': o['description']} for o in stack['outputs']]}
+        for output in stack['outputs']:
+            if output['output_key'] == segments[0]:
+                return 200, [], {'output': output}
+        return self._not_found('Output (%s)' % segments[0])
+
+    # Software configs and deployments
+
+    def _route_configs(self, method, segments, body):
+        if not segments and method == 'POST':
+            body = body or {}
+            sc = self.add_config(body.get('name', ''),
+                                 body.get('config', ''),
+                                 body.get('group', 'Heat::Ungrouped'))
+            return 200, [], {'software_config': sc}
+        if not segments and method == 'GET':
+            return 200, [], {'software_configs': list(self.configs.values())}
+        sc = self.configs.get(segments[0]) if segments else None
+        if sc is None:
+            return self._not_found('Software Config')
+        if method == 'DELETE':
+            del self.configs[sc['id']]
+            return 204, [], None
+        return 200, [], {'software_config': sc}
+
+    def _route_deployments(self, method, segments, query, body):
+        if not segments:
+            if method == 'POST':
+                body = body or {}
+                sd = self.add_deployment(body.get('config_id'),
+                                         body.get('server_id'),
+                                         body.get('status', 'IN_PROGRESS'),
+                                         body.get('action', 'CREATE'))
+                return 200, [], {'software_deployment': sd}
+            deployments = list(self.deployments.values())
+            if 'server_id' in query:
+                deployments = [d for d in deployments
+                               if d['server_id'] in query['server_id']]
+            return 200, [], {'software_deployments': deployments}
+        if segments[0] == 'metadata' and len(segments) == 2:
+            return 200, [], {'metadata': [
+                dict(self.configs.get(d['config_id']) or {},
+                     deployment_id=d['id'])
+                for d in self.deployments.values()
+                if d['server_id'] == segments[1]]}
+        sd = self.deployments.get(segments[0])
+        if sd is None:
+            return self._not_found('Software Deployment')
+        if method == 'PUT':
+            sd.update({k: v for k, v in (body or {}).items()
+                       if k in sd and k != 'id'})
+            sd['updated_time'] = self._now()
+        elif method == 'DELETE':
+            del self.deployments[sd['id']]
+            return 204, [], None
+        return 200, [], {'software_deployment': sd}
+
+
+class _WSGIRequestHandler(http.server.BaseHTTPRequestHandler):
+    """Request handler calling a WSGI application."""
+
+    protocol_version = 'HTTP/1.1'
+    # the headers and body are written separately
+    disable_nagle_algorithm = True
+
+    def _handle(self):
+        path, _sep, query = self.path.partition('?')
+        environ = {
+            'REQUEST_METHOD': self.command,
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'CONTENT_LENGTH': self.headers.get('Content-Length', ''),
+            'CONTENT_TYPE': self.headers.get('Content-Type', ''),
+            'HTTP_HOST': self.headers.get('Host', '%s:%d' % (
+                self.server.server_address[:2])),
+            'SERVER_NAME': self.server.server_address[0],
+            'SERVER_PORT': str(self.server.server_address[1]),
+            'SERVER_PROTOCOL': self.request_version,
+            'wsgi.input': self.rfile,
+            'wsgi.errors': io.StringIO(),
+            'wsgi.url_scheme': 'http',
+            'wsgi.version': (1, 0),
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        for key, value in self.headers.items():
+            environ.setdefault('HTTP_%s' % key.upper().replace('-', '_'),
+                               value)
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = status
+            response['headers'] = headers
+
+        body = b''.join(self.server.app(environ, start_response))
+        code, _sep, reason = response['status'].partition(' ')
+        self.send_response(int(code), reason)
+        for name, value in response['headers']:
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeHeatServer:
+    """Serve a WSGI application on localhost from a background thread.
+
+    :param app: WSGI application, defaults to a new :class:`FakeHeatAPI`
+    :param port: port to listen on, defaults to any free port
+    """
+
+    def __init__(self, app=None, port=0):
+        self.app = app if app is not None else FakeHeatAPI()
+        self._server = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', port), _WSGIRequestHandler)
+        self._server.daemon_threads = True
+        self._server.app = self.app
+        self._thread = None
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:%d' % self._server.server_address[1]
+
+    @property
+    def endpoint(self):
+        """Orchestration endpoint URL, including the tenant id."""
+        return f'{self.url}/v1/{TENANT_ID}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,58 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import sys
+from unittest import mock
+
+import testtools
+
+from heatclient.common import metrics
+from heatclient.osc import plugin
+
+
+class TestMakeClient(testtools.TestCase):
+
+    def _instance(self, timing):
+        instance = mock.Mock(session=None, auth_plugin_name='token_endpoint',
+                             timing=timing, region_name='RegionOne',
+                             interface='public')
+        instance._api_version = {plugin.API_NAME: '1'}
+        instance.auth.url = 'http://heat'
+        instance.auth.token = 'token'
+        return instance
+
+    @mock.patch('atexit.register')
+    def test_make_client(self, mock_register):
+        client = plugin.make_client(self._instance(timing=False))
+        self.assertEqual((), client.http_client.request_hooks)
+        mock_register.assert_not_called()
+
+    @mock.patch('atexit.register')
+    @mock.patch('heatclient.common.profiling.CommandProfiler')
+    def test_make_client_profile(self, mock_profiler, mock_register):
+        instance = self._instance(timing=False)
+        instance._cli_options.config = {
+            'orchestration_profile_file': '/tmp/profile'}
+        with mock.patch.object(sys, 'argv', ['openstack', 'stack', 'list']):
+            client = plugin.make_client(instance)
+        mock_profiler.assert_called_once_with('/tmp/profile', 'stack list')
+        profiler = mock_profiler.return_value
+        profiler.start.assert_called_once_with()
+        profiler.attach.assert_called_once_with(client)
+        mock_register.assert_called_once_with(profiler.stop)
+
+    @mock.patch('atexit.register')
+    def test_make_client_timing(self, mock_register):
+        client = plugin.make_client(self._instance(timing=True))
+        hook, = client.http_client.request_hooks
+        self.assertIsInstance(hook, metrics.RequestMetrics)
+        mock_register.assert_called_once_with(hook.print_summary, sys.stderr)
@@ -136,6 +136,14 @@ class TestStackResourceList(TestResource):
         self.assertEqual(self.columns, columns)
         self.assertEqual(tuple(self.data), list(data)[0])
 
+    def test_resource_list_graph_formats(self):
+        for fmt in ('dot', 'dot-stream', 'jsonl', 'graphml'):
+            parsed_args = self.check_parser(self.cmd,
+                                            ['my_stack', '-f', fmt], [])
+            columns, data = self.cmd.take_action(parsed_args)
+            self.assertEqual([], columns)
+            self.assertEqual(self.resource_client.list.return_value, data)
+
     def test_resource_list_not_found(self):
         arglist = ['bad_stack']
         self.resource_client.list.side_effect = heat_exc.HTTPNotFound
@@ -12,8 +12,10 @@
 #
 
 import copy
+import io
 from unittest import mock
 
+import fixtures
 from osc_lib import exceptions as exc
 
 from heatclient import exc as heat_exc
@@ -217,6 +219,98 @@ class TestDeploymentCreate(TestDeployment):
         self.sd_client.create.assert_called_with(**deploy)
 
 
+class TestDeploymentBulkCreate(TestDeployment):
+
+    def setUp(self):
+        super().setUp()
+        self.cmd = software_deployment.BulkCreateDeployment(self.app, None)
+
+        def create_config(**params):
+            inputs = {i['name']: i['value'] for i in params['inputs']}
+            return software_configs.SoftwareConfig(
+                None, {'id': 'config-%s' % inputs['deploy_server_id']})
+
+        def create_deployment(config_id, server_id, action, status):
+            if server_id == 'bad':
+                raise heat_exc.HTTPBadRequest('no server')
+            return software_deployments.SoftwareDeployment(
+                None, {'id': 'sd-%s' % server_id, 'config_id': config_id,
+                       'server_id': server_id, 'status': status})
+
+        self.config_client.create.side_effect = create_config
+        self.sd_client.create.side_effect = create_deployment
+
+    @mock.patch('heatclient.common.deployment_utils.signal_id_factory')
+    def test_deployment_bulk_create(self, mock_build):
+        signal_ids = iter(['signal-1', 'signal-2', 'signal-3'])
+        mock_build.return_value = lambda: next(signal_ids)
+        server_file = self.useFixture(fixtures.TempDir()).path + '/servers'
+        with open(server_file, 'w') as f:
+            f.write('# servers\n3\n\n 1 \n')
+        arglist = ['my_deploy', '--server', '1', '--server', '2',
+                   '--server-file', server_file, '--concurrency', '2']
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        mock_build.assert_called_once_with(self.mock_client, parsed_args)
+        self.assertEqual(3, self.config_client.create.call_count)
+        # each server gets its own signal
+        self.assertEqual(
+            {'signal-1', 'signal-2', 'signal-3'},
+            {{i['name']: i['value']
+              for i in call[1]['inputs']}['deploy_signal_id']
+             for call in self.config_client.create.call_args_list})
+        self.sd_client.create.assert_any_call(
+            config_id='config-2', server_id='2', action='UPDATE',
+            status='IN_PROGRESS')
+        self.assertEqual(['server_id', 'id', 'config_id', 'status'], columns)
+        self.assertEqual([
+            ('1', 'sd-1', 'config-1', 'IN_PROGRESS'),
+            ('2', 'sd-2', 'config-2', 'IN_PROGRESS'),
+            ('3', 'sd-3', 'config-3', 'IN_PROGRESS'),
+        ], data)
+
+    def test_deployment_bulk_create_failure(self):
+        arglist = ['my_deploy', '--server', '1', '--server', 'bad',
+                   '--signal-transport', 'NO_SIGNAL']
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.config_client.delete.assert_called_once_with(
+            config_id='config-bad')
+        self.assertEqual(('1', 'sd-1', 'config-1', 'IN_PROGRESS'), data[0])
+        self.assertEqual('bad', data[1][0])
+        self.assertIsNone(data[1][1])
+        self.assertIn('no server', data[1][3])
+
+    def test_deployment_bulk_create_failure_exit_code(self):
+        arglist = ['my_deploy', '--server', '1', '--server', 'bad',
+                   '--signal-transport', 'NO_SIGNAL']
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+
+        error = self.assertRaises(exc.CommandError, self.cmd.run,
+                                  parsed_args)
+
+        self.assertEqual('Unable to create 1 of the 2 deployments.',
+                         str(error))
+        self.assertIn('sd-1', self.fake_stdout.make_string())
+
+    def test_deployment_bulk_create_no_server(self):
+        parsed_args = self.check_parser(self.cmd, ['my_deploy'], [])
+
+        self.assertRaises(exc.CommandError, self.cmd.take_action, parsed_args)
+
+    def test_deployment_bulk_create_config_not_found(self):
+        arglist = ['my_deploy', '--server', '1', '--config', 'bad_id']
+        self.config_client.get.side_effect = heat_exc.HTTPNotFound
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+
+        self.assertRaises(exc.CommandError, self.cmd.take_action, parsed_args)
+        self.sd_client.create.assert_not_called()
+
+
 class TestDeploymentDelete(TestDeployment):
 
     def setUp(self):
@@ -252,6 +346,57 @@ class TestDeploymentDelete(TestDeployment):
         self.config_client.delete.side_effect = heat_exc.HTTPNotFound()
         self.assertIsNone(self.cmd.take_action(parsed_args))
 
+    def test_deployment_delete_from_file(self):
+        id_file = self.useFixture(fixtures.TempDir()).path + '/ids'
+        with open(id_file, 'w') as f:
+            f.write('sd1\n# stale\nsd2\n\nsd3\n')
+        arglist = ['sd1', '--from-file', id_file, '--concurrency', '2']
+        self.sd_client.get.side_effect = (
+            lambda deployment_id: software_deployments.SoftwareDeployment(
+                None, {'id': deployment_id,
+                       'config_id': 'c-%s' % deployment_id}))
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+        self.cmd.take_action(parsed_args)
+        self.assertEqual(
+            ['sd1', 'sd2', 'sd3'],
+            sorted(c[1]['deployment_id']
+                   for c in self.sd_client.delete.call_args_list))
+        self.config_client.delete.assert_has_calls(
+            [mock.call(config_id='c-sd1'), mock.call(config_id='c-sd2'),
+             mock.call(config_id='c-sd3')], any_order=True)
+
+    def test_deployment_delete_invalid_concurrency(self):
+        parser = self.cmd.get_parser('check_parser')
+        for concurrency in ('0', '-1'):
+            self.assertRaises(SystemExit, parser.parse_args,
+                              ['sd1', '--concurrency', concurrency])
+
+    @mock.patch('sys.stdout', new_callable=io.StringIO)
+    def test_deployment_delete_partial_failure(self, mock_stdout):
+        arglist = ['sd1', 'sd2', 'sd3']
+
+        def delete(deployment_id):
+            if deployment_id == 'sd2':
+                raise heat_exc.HTTPNotFound()
+            if deployment_id == 'sd3':
+                raise heat_exc.HTTPBadRequest()
+
+        self.sd_client.delete.side_effect = delete
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+        error = self.assertRaises(
+            exc.CommandError, self.cmd.take_action, parsed_args)
+        self.assertIn("Unable to delete 2 of the 3 deployments.", str(error))
+        self.assertEqual(3, self.sd_client.delete.call_count)
+        self.assertEqual(1, self.config_client.delete.call_count)
+        self.assertEqual('Deployment with ID sd2 not found\n'
+                         'Deployment with ID sd3 failed to delete\n',
+                         mock_stdout.getvalue())
+
+    def test_deployment_delete_no_deployment(self):
+        parsed_args = self.check_parser(self.cmd, [], [])
+        self.assertRaises(exc.CommandError, self.cmd.take_action, parsed_args)
+        self.sd_client.delete.assert_not_called()
+
 
 class TestDeploymentList(TestDeployment):
 
@@ -389,6 +534,19 @@ class TestDeploymentMetadataShow(TestDeployment):
         self.sd_client.metadata.assert_called_with(
             server_id='ec14c864-096e-4e27-bb8a-2c2b4dc6f3f5')
 
+    @mock.patch('sys.stdout')
+    def test_deployment_show_metadata_watch(self, mock_stdout):
+        arglist = ['ec14c864-096e-4e27-bb8a-2c2b4dc6f3f5', '--watch',
+                   '--watch-interval', '2', '--watch-timeout', '30']
+        self.sd_client.watch_metadata.return_value = iter([{}, {'a': 1}])
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+        self.cmd.take_action(parsed_args)
+        self.sd_client.watch_metadata.assert_called_once_with(
+            'ec14c864-096e-4e27-bb8a-2c2b4dc6f3f5', interval=2.0,
+            max_interval=60, timeout=30.0)
+        self.sd_client.metadata.assert_not_called()
+        self.assertEqual(2, mock_stdout.flush.call_count)
+
 
 class TestDeploymentOutputShow(TestDeployment):
 
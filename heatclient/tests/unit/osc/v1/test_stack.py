@@ -189,6 +189,40 @@ class TestStackCreate(TestStack):
         self.stack_client.preview.assert_called_with(**self.defaults)
         self.stack_client.create.assert_not_called()
 
+    def test_stack_create_dry_run_many(self):
+        arglist = ['my_stack', '-t', self.template_path,
+                   '-t', 'heatclient/tests/test_templates/param*.yaml',
+                   '--dry-run', '--concurrency', '2']
+
+        def preview(**fields):
+            if 'parameters' in fields['template']:
+                raise heat_exc.HTTPBadRequest('missing p1')
+
+        self.stack_client.preview.side_effect = preview
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(2, self.stack_client.preview.call_count)
+        self.stack_client.preview.assert_any_call(**self.defaults)
+        self.stack_client.create.assert_not_called()
+        self.assertEqual(
+            [self.template_path,
+             'heatclient/tests/test_templates/parameters.yaml'], columns)
+        self.assertEqual({'status': 'OK'}, data[0])
+        self.assertEqual('FAILED', data[1]['status'])
+        self.assertIn('missing p1', data[1]['error'])
+        self.assertEqual(1, self.cmd.failures)
+
+    def test_stack_create_many_no_dry_run(self):
+        arglist = ['my_stack', '-t', self.template_path,
+                   '-t', self.template_path]
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+
+        self.assertRaises(exc.CommandError, self.cmd.take_action,
+                          parsed_args)
+        self.stack_client.create.assert_not_called()
+
 
 class TestStackUpdate(TestStack):
 
@@ -980,6 +1014,65 @@ class TestStackOutputShow(TestStack):
         self.stack_client.get.assert_called_with('my_stack')
         self.assertEqual(['output1', 'output2'], columns)
 
+    def test_stack_output_show_all_concurrency(self):
+        arglist = ['my_stack', '--all', '--concurrency', '4']
+        self.stack_client.get.return_value = stacks.Stack(
+            self.stack_client, {'id': '1234', 'stack_name': 'my_stack'})
+        self.stack_client.output_list.return_value = {
+            'outputs': [{'output_key': 'output1'},
+                        {'output_key': 'output2'},
+                        {'output_key': 'output3'}]}
+
+        def output_show(stack_id, key):
+            if key == 'output3':
+                raise heat_exc.HTTPNotFound()
+            return {'output': self.outputs[int(key[-1]) - 1]}
+
+        self.stack_client.output_show.side_effect = output_show
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+
+        columns, outputs = self.cmd.take_action(parsed_args)
+
+        self.stack_client.get.assert_called_once_with(
+            'my_stack', resolve_outputs=False)
+        self.stack_client.output_list.assert_called_once_with(
+            'my_stack/1234')
+        self.stack_client.output_show.assert_any_call(
+            'my_stack/1234', 'output1')
+        self.assertEqual(3, self.stack_client.output_show.call_count)
+        self.assertEqual(['output1', 'output2', 'output3'], columns)
+        self.assertEqual(self.outputs[0], outputs[0]._value)
+        self.assertEqual('error', outputs[1]._value['output_error'])
+        self.assertEqual('output3', outputs[2]._value['output_key'])
+        self.assertIn('output_error', outputs[2]._value)
+
+    def test_stack_output_show_all_concurrency_old_api(self):
+        arglist = ['my_stack', '--all', '--concurrency', '4']
+        self.stack_client.get.return_value = stacks.Stack(
+            self.stack_client, dict(self.response, id='1234'))
+        self.stack_client.output_list.side_effect = heat_exc.HTTPNotFound
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+
+        columns, outputs = self.cmd.take_action(parsed_args)
+
+        self.stack_client.get.assert_called_with('my_stack')
+        self.assertEqual(['output1', 'output2'], columns)
+
+    def test_stack_output_show_all_concurrency_invalid(self):
+        parser = self.cmd.get_parser('check_parser')
+        for concurrency in ('0', '-1', 'many'):
+            arglist = ['my_stack', '--all', '--concurrency', concurrency]
+            self.assertRaises(SystemExit, parser.parse_args, arglist)
+
+    def test_stack_output_show_concurrency_without_all(self):
+        arglist = ['my_stack', 'output1', '--concurrency', '4']
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+
+        error = self.assertRaises(exc.CommandError,
+                                  self.cmd.take_action, parsed_args)
+        self.assertEqual('--concurrency can only be specified with --all.',
+                         str(error))
+
     def test_stack_output_show_output(self):
         arglist = ['my_stack', 'output1']
         self.stack_client.output_show.return_value = {
@@ -1147,7 +1240,8 @@ class _TestStackCheckBase:
         parsed_args = self.check_parser(self.cmd, arglist, [])
         columns, rows = self.cmd.take_action(parsed_args)
         self.action.assert_called_once_with('my_stack')
-        self.mock_client.stacks.get.assert_called_with('my_stack')
+        self.mock_client.stacks.get.assert_called_with(
+            'my_stack', lazy_outputs=True)
         self.assertEqual(get_call_count,
                          self.mock_client.stacks.get.call_count)
         self.assertEqual(self.columns, columns)
@@ -1161,7 +1255,8 @@ class _TestStackCheckBase:
         self.assertEqual(get_call_count,
                          self.mock_client.stacks.get.call_count)
         self.action.assert_called_with('my_stack2')
-        self.mock_client.stacks.get.assert_called_with('my_stack2')
+        self.mock_client.stacks.get.assert_called_with(
+            'my_stack2', lazy_outputs=True)
         self.assertEqual(self.columns, columns)
         self.assertEqual(2, len(rows))
 
@@ -1176,7 +1271,8 @@ class _TestStackCheckBase:
         parsed_args = self.check_parser(self.cmd, arglist, [])
         columns, rows = self.cmd.take_action(parsed_args)
         self.action.assert_called_with('my_stack')
-        self.mock_client.stacks.get.assert_called_with('my_stack')
+        self.mock_client.stacks.get.assert_called_with(
+            'my_stack', lazy_outputs=True)
         self.assertEqual(self.columns, columns)
         self.assertEqual(1, len(rows))
 
@@ -1287,7 +1383,8 @@ class TestStackCancel(_TestStackCheckBase, TestStack):
         parsed_args = self.check_parser(self.cmd, arglist, [])
         columns, rows = self.cmd.take_action(parsed_args)
         self.action.assert_called_once_with('my_stack')
-        self.mock_client.stacks.get.assert_called_with('my_stack')
+        self.mock_client.stacks.get.assert_called_with(
+            'my_stack', lazy_outputs=True)
         self.assertEqual(call_count,
                          self.mock_client.stacks.get.call_count)
         self.assertEqual(self.columns, columns)
@@ -1494,6 +1591,123 @@ class TestStackHookClear(TestStack):
             resource_name='resource',
             stack_id='my_stack')
 
+    def _nested_resource(self, name, stack, nested=None, parent=None):
+        href = 'http://heat/v1/t/stacks/%s' % stack
+        info = {'resource_name': name,
+                'links': [{'rel': 'stack', 'href': href}]}
+        if nested:
+            info['links'].append({
+                'rel': 'nested',
+                'href': 'http://heat/v1/t/stacks/%s' % nested})
+        if parent:
+            info['parent_resource'] = parent
+        return resources.Resource(None, info, loaded=True)
+
+    def test_hook_clear_nested_wildcard(self):
+        self.mock_client.resources.list.return_value = [
+            self._nested_resource('group', 'my_stack/1234', 'group/g1'),
+            self._nested_resource('other', 'my_stack/1234', 'other/o1'),
+            self._nested_resource('0', 'group/g1', 'node0/n0', 'group'),
+            self._nested_resource('1', 'group/g1', 'node1/n1', 'group'),
+            self._nested_resource('0', 'other/o1', 'node2/n2', 'other'),
+            self._nested_resource('server', 'node0/n0', parent='0'),
+            self._nested_resource('config', 'node0/n0', parent='0'),
+            self._nested_resource('server', 'node1/n1', parent='1'),
+            self._nested_resource('server', 'node2/n2', parent='0'),
+        ]
+
+        def signal(stack_id, resource_name, data):
+            if stack_id == 'node1/n1':
+                raise heat_exc.HTTPNotFound()
+
+        self.mock_client.resources.signal.side_effect = signal
+        arglist = ['my_stack', 'group/*/serv*', '--pre-update',
+                   '--concurrency', '2', '--rate-limit', '1000']
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+        columns, rows = self.cmd.take_action(parsed_args)
+
+        self.mock_client.resources.list.assert_called_once_with(
+            'my_stack', nested_depth=2)
+        self.mock_client.resources.get.assert_not_called()
+        self.mock_client.resources.signal.assert_has_calls([
+            mock.call(data={'unset_hook': 'pre-update'},
+                      resource_name='server', stack_id='node0/n0'),
+            mock.call(data={'unset_hook': 'pre-update'},
+                      resource_name='server', stack_id='node1/n1'),
+        ], any_order=True)
+        self.assertEqual(2, self.mock_client.resources.signal.call_count)
+        self.assertEqual(['Stack', 'Resource Name', 'Result'], columns)
+        self.assertEqual([
+            ('node0/n0', 'server', 'pre-update hook cleared'),
+            ('node1/n1', 'server', 'Stack or resource not found'),
+        ], rows)
+
+    def test_hook_clear_nested_stack(self):
+        # Every resource of a nested stack has a parent resource, the
+        # resources of the stack itself included
+        self.mock_client.resources.list.return_value = [
+            self._nested_resource('0', 'group/g1', 'node0/n0', 'group'),
+            self._nested_resource('1', 'group/g1', 'node1/n1', 'group'),
+            self._nested_resource('server', 'node0/n0', parent='0'),
+            self._nested_resource('server', 'node1/n1', parent='1'),
+        ]
+        arglist = ['g1', '*/server', '--pre-update']
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+        columns, rows = self.cmd.take_action(parsed_args)
+
+        self.mock_client.resources.list.assert_called_once_with(
+            'g1', nested_depth=1)
+        self.assertEqual([
+            ('node0/n0', 'server', 'pre-update hook cleared'),
+            ('node1/n1', 'server', 'pre-update hook cleared'),
+        ], rows)
+
+    def test_hook_clear_failed(self):
+        self.mock_client.resources.list.return_value = [
+            self._nested_resource('server', 'my_stack/1234'),
+            self._nested_resource('volume', 'my_stack/1234'),
+            self._nested_resource('port', 'my_stack/1234'),
+        ]
+
+        def signal(stack_id, resource_name, data):
+            if resource_name == 'volume':
+                raise heat_exc.HTTPInternalServerError()
+            if resource_name == 'port':
+                raise heat_exc.HTTPNotFound()
+
+        self.mock_client.resources.signal.side_effect = signal
+        arglist = ['my_stack', '*', '--pre-update']
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+        error = self.assertRaises(exc.CommandError, self.cmd.run,
+                                  parsed_args)
+
+        self.assertEqual('Unable to clear 1 of the 3 hooks.', str(error))
+        output = self.fake_stdout.make_string()
+        self.assertIn('pre-update hook cleared', output)
+        self.assertIn('Stack or resource not found', output)
+
+    def test_hook_clear_nested_fallback(self):
+        # Without links the nested listing can't be used, so resources are
+        # looked up one stack at a time
+        self.mock_client.resources.list.side_effect = [
+            [resources.Resource(None, {'resource_name': 'group'}),
+             resources.Resource(None, {'resource_name': '0',
+                                       'parent_resource': 'group'})],
+            [resources.Resource(None, {'resource_name': 'group'})],
+            [resources.Resource(None, {'resource_name': 'server'})],
+        ]
+        self.mock_client.resources.get.return_value = resources.Resource(
+            None, {'physical_resource_id': 'g1'})
+        arglist = ['my_stack', 'group/server', '--pre-update']
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+        columns, rows = self.cmd.take_action(parsed_args)
+
+        self.mock_client.resources.signal.assert_called_once_with(
+            data={'unset_hook': 'pre-update'},
+            resource_name='server',
+            stack_id='g1')
+        self.assertEqual([('g1', 'server', 'pre-update hook cleared')], rows)
+
 
 class TestEnvironmentStackShow(TestStack):
 
@@ -89,6 +89,72 @@ class ListStackFailuresTest(orchestration_fakes.TestOrchestrationv1):
         self.software_deployments_client.get.return_value = (
             self.failed_deployment)
 
+    def _mock_resource_lists(self, lists):
+        # The single nested listing is not supported, so the nested stacks
+        # are walked one level at a time
+        def list_resources(stack_id, **kwargs):
+            if kwargs:
+                raise exc.HTTPBadRequest()
+            result = lists[stack_id]
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+        self.resource_client.list.side_effect = list_resources
+
+    def _link(self, stack_id):
+        return {'rel': 'stack',
+                'href': 'http://heat/v1/t/stacks/stack-{}/{}'.format(
+                    stack_id, stack_id)}
+
+    def test_build_failed_resources_nested_depth(self):
+        self.failed_template_resource.links = [{'rel': 'nested'},
+                                               self._link('123')]
+        self.other_failed_template_resource.links = [{'rel': 'nested'},
+                                                     self._link('123')]
+        self.failed_resource.links = [self._link('aaaa')]
+        self.failed_deployment_resource.links = [self._link('123')]
+        # A failed resource in a nested stack which is not failed in the
+        # parent stack is not reported
+        orphan = mock.MagicMock(
+            resource_status='CREATE_FAILED', resource_name='orphan',
+            links=[self._link('ffff')])
+        self.resource_client.list.return_value = [
+            self.failed_template_resource,
+            self.failed_resource,
+            orphan,
+            self.other_failed_template_resource,
+            self.failed_deployment_resource,
+        ]
+        failures = self.cmd._build_failed_resources('stack')
+        self.resource_client.list.assert_called_once_with(
+            '123', nested_depth=stack_failures.MAX_NESTED_DEPTH,
+            filters={'status': 'FAILED'})
+        expected = collections.OrderedDict()
+        expected['stack.my_templateresource.my_server'] = self.failed_resource
+        expected['stack.my_othertemplateresource'] = (
+            self.other_failed_template_resource)
+        expected['stack.my_deployment'] = self.failed_deployment_resource
+        self.assertEqual(expected, failures)
+
+    def test_build_failed_resources_deep(self):
+        lists = {'123': [self.failed_template_resource]}
+        parent = 'aaaa'
+        for i in range(5):
+            nested = 'n%d' % i
+            lists[parent] = [mock.MagicMock(
+                physical_resource_id=nested,
+                resource_status='UPDATE_FAILED',
+                links=[{'rel': 'nested'}],
+                resource_name='level%d' % i)]
+            parent = nested
+        lists[parent] = [self.working_resource, self.failed_resource]
+        self._mock_resource_lists(lists)
+        failures = self.cmd._build_failed_resources('stack')
+        self.assertEqual(
+            ['stack.my_templateresource.level0.level1.level2.level3.level4.'
+             'my_server'], list(failures))
+
     def test_build_failed_none(self):
         self.stack = mock.MagicMock(id='123', status='COMPLETE',
                                     stack_name='stack')
@@ -97,15 +163,13 @@ class ListStackFailuresTest(orchestration_fakes.TestOrchestrationv1):
         self.assertEqual(expected, failures)
 
     def test_build_failed_resources(self):
-        self.resource_client.list.side_effect = [[
-            # resource-list stack
-            self.failed_template_resource,
-            self.other_failed_template_resource,
-            self.working_resource,
-        ], [  # resource-list aaaa
-            self.failed_resource
-        ], [  # resource-list dddd
-        ]]
+        self._mock_resource_lists({
+            '123': [self.failed_template_resource,
+                    self.other_failed_template_resource,
+                    self.working_resource],
+            'aaaa': [self.failed_resource],
+            'dddd': [],
+        })
         failures = self.cmd._build_failed_resources('stack')
         expected = collections.OrderedDict()
         expected['stack.my_templateresource.my_server'] = self.failed_resource
@@ -114,13 +178,13 @@ class ListStackFailuresTest(orchestration_fakes.TestOrchestrationv1):
         self.assertEqual(expected, failures)
 
     def test_build_failed_resources_not_found(self):
-        self.resource_client.list.side_effect = [[
-            # resource-list stack
-            self.failed_template_resource,
-            self.other_failed_template_resource,
-            self.working_resource,
-        ], exc.HTTPNotFound(), [  # resource-list dddd
-        ]]
+        self._mock_resource_lists({
+            '123': [self.failed_template_resource,
+                    self.other_failed_template_resource,
+                    self.working_resource],
+            'aaaa': exc.HTTPNotFound(),
+            'dddd': [],
+        })
 
         failures = self.cmd._build_failed_resources('stack')
         expected = collections.OrderedDict()
@@ -155,16 +219,14 @@ class ListStackFailuresTest(orchestration_fakes.TestOrchestrationv1):
         self.assertEqual({}, deployments)
 
     def test_list_stack_failures(self):
-        self.resource_client.list.side_effect = [[
-            # resource-list stack
-            self.failed_template_resource,
-            self.other_failed_template_resource,
-            self.working_resource,
-            self.failed_deployment_resource
-        ], [  # resource-list aaaa
-            self.failed_resource
-        ], [  # resource-list dddd
-        ]]
+        self._mock_resource_lists({
+            '123': [self.failed_template_resource,
+                    self.other_failed_template_resource,
+                    self.working_resource,
+                    self.failed_deployment_resource],
+            'aaaa': [self.failed_resource],
+            'dddd': [],
+        })
 
         arglist = ['stack']
         parsed_args = self.check_parser(self.cmd, arglist, [])
@@ -208,16 +270,14 @@ stack.my_deployment:
 ''')
 
     def test_list_stack_failures_long(self):
-        self.resource_client.list.side_effect = [[
-            # resource-list stack
-            self.failed_template_resource,
-            self.other_failed_template_resource,
-            self.working_resource,
-            self.failed_deployment_resource
-        ], [  # resource-list aaaa
-            self.failed_resource
-        ], [  # resource-list dddd
-        ]]
+        self._mock_resource_lists({
+            '123': [self.failed_template_resource,
+                    self.other_failed_template_resource,
+                    self.working_resource,
+                    self.failed_deployment_resource],
+            'aaaa': [self.failed_resource],
+            'dddd': [],
+        })
 
         arglist = ['--long', 'stack']
         parsed_args = self.check_parser(self.cmd, arglist, [])
@@ -12,8 +12,12 @@
 #
 #   Copyright 2015 IBM Corp.
 
+import os
 from unittest import mock
 
+import fixtures
+from osc_lib import exceptions as osc_exc
+
 from heatclient import exc
 from heatclient.osc.v1 import template
 from heatclient.tests.unit.osc.v1 import fakes
@@ -182,3 +186,61 @@ class TestTemplateValidate(TestTemplate):
         self.stack_client.validate.assert_called_once_with(**args)
         self.assertEqual([], columns)
         self.assertEqual([], data)
+
+    def test_validate_local(self):
+        arglist = ['-t', 'heatclient/tests/test_templates/parameters.yaml',
+                   '--local']
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+        columns, data = self.cmd.take_action(parsed_args)
+        self.stack_client.validate.assert_not_called()
+        self.assertEqual(['Description', 'Parameters'], columns)
+        self.assertIn('p1', data[1])
+
+    def test_validate_local_error(self):
+        template_path = self.useFixture(
+            fixtures.TempDir()).path + '/bad.yaml'
+        with open(template_path, 'w') as f:
+            f.write('heat_template_version: 2016-10-14\n'
+                    'resources:\n'
+                    '  test:\n'
+                    '    type: OS::Heat::None\n'
+                    '    properties:\n'
+                    '      value: {get_param: missing}\n')
+        parsed_args = self.check_parser(self.cmd, ['-t', template_path], [])
+        error = self.assertRaises(exc.CommandError, self.cmd.take_action,
+                                  parsed_args)
+        self.assertIn('The Parameter (missing) was not defined', str(error))
+        self.stack_client.validate.assert_not_called()
+
+        # the server decides which errors to ignore
+        arglist = ['-t', template_path, '--ignore-errors', 'err1']
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+        self.cmd.take_action(parsed_args)
+        self.assertEqual(1, self.stack_client.validate.call_count)
+
+    def test_validate_many(self):
+        path = self.useFixture(fixtures.TempDir()).path
+        with open(os.path.join(path, 'good.yaml'), 'w') as f:
+            f.write('heat_template_version: 2013-05-23\n')
+        with open(os.path.join(path, 'bad.yaml'), 'w') as f:
+            f.write('heat_template_version: 2013-05-23\n'
+                    'outputs:\n'
+                    '  out:\n'
+                    '    value: {get_resource: missing}\n')
+        arglist = ['-t', path, '-t', self.template_path]
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual([os.path.join(path, 'bad.yaml'),
+                          os.path.join(path, 'good.yaml'),
+                          self.template_path], columns)
+        self.assertEqual('FAILED', data[0]['status'])
+        self.assertIn('"missing" is not in the template', data[0]['error'])
+        self.assertEqual([{'status': 'OK'}] * 2, data[1:])
+        self.assertEqual(2, self.stack_client.validate.call_count)
+        self.assertEqual(1, self.cmd.failures)
+
+        error = self.assertRaises(osc_exc.CommandError, self.cmd.run,
+                                  parsed_args)
+        self.assertEqual('Unable to validate 1 of the 3 templates.',
+                         str(error))
@@ -0,0 +1,189 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import threading
+from unittest import mock
+
+import fixtures
+import testtools
+
+from heatclient.common import catalog_cache
+
+
+class CatalogCacheTest(testtools.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.cache_dir = self.useFixture(fixtures.TempDir()).path
+        self.useFixture(fixtures.MockPatch('atexit.register'))
+        self.useFixture(fixtures.MockPatchObject(
+            catalog_cache, '_build_infos', {}))
+        self.build_info = {'api': {'revision': '1'}}
+        self.build_info_calls = 0
+
+    def _build_info(self):
+        self.build_info_calls += 1
+        return self.build_info
+
+    def _cache(self, **kwargs):
+        kwargs.setdefault('build_info', self._build_info)
+        return catalog_cache.CatalogCache(
+            'resource_types', 'http://heat/v1/tenant',
+            cache_dir=self.cache_dir, **kwargs)
+
+    def test_memory(self):
+        loader = mock.Mock(return_value=['OS::Heat::None'])
+        cache = catalog_cache.CatalogCache('resource_types', None)
+        self.assertEqual(['OS::Heat::None'], cache.get('/types', loader))
+        self.assertEqual(['OS::Heat::None'], cache.get('/types', loader))
+        loader.assert_called_once_with()
+        cache.flush()
+
+    def test_persisted_per_endpoint(self):
+        cache = self._cache()
+        cache.get('/types', lambda: ['OS::Heat::None'])
+        cache.flush()
+        self.assertEqual(1, len(os.listdir(self.cache_dir)))
+
+        loader = mock.Mock()
+        self.assertEqual(['OS::Heat::None'],
+                         self._cache().get('/types', loader))
+        loader.assert_not_called()
+
+        other = catalog_cache.CatalogCache(
+            'resource_types', 'http://other/v1/tenant',
+            cache_dir=self.cache_dir)
+        self.assertEqual([], other.get('/types', lambda: []))
+
+    def test_build_info_change(self):
+        now = self.useFixture(fixtures.MockPatch('time.time')).mock
+        now.return_value = 100
+        cache = self._cache(ttl=10)
+        cache.get('/types', lambda: ['OS::Heat::None'])
+        cache.flush()
+
+        # the build info is only checked once the cache is older than the
+        # TTL, by a new process
+        catalog_cache._build_infos.clear()
+        self.build_info = {'api': {'revision': '2'}}
+        self.assertEqual(['OS::Heat::None'],
+                         self._cache(ttl=10).get('/types', mock.Mock()))
+        now.return_value = 200
+        self.assertEqual(['OS::Heat::Value'],
+                         self._cache(ttl=10).get('/types',
+                                                 lambda: ['OS::Heat::Value']))
+
+    def test_build_info_checked_once(self):
+        now = self.useFixture(fixtures.MockPatch('time.time')).mock
+        now.return_value = 100
+        cache = self._cache(ttl=10)
+        cache.get('/types', lambda: ['OS::Heat::None'])
+        cache.flush()
+        self.assertEqual(1, self.build_info_calls)
+        catalog_cache._build_infos.clear()
+
+        now.return_value = 200
+        for name in ('resource_types', 'template_versions'):
+            cache = catalog_cache.CatalogCache(
+                name, 'http://heat/v1/tenant', cache_dir=self.cache_dir,
+                ttl=10, build_info=self._build_info)
+            cache.get('/types', lambda: ['OS::Heat::None'])
+        self.assertEqual(2, self.build_info_calls)
+
+    def test_memory_cache_skips_build_info(self):
+        cache = catalog_cache.CatalogCache('resource_types', None,
+                                           build_info=self._build_info)
+        cache.get('/types', lambda: ['OS::Heat::None'])
+        self.assertEqual(0, self.build_info_calls)
+
+    def test_values_are_copies(self):
+        cache = self._cache()
+        value = cache.get('/types', lambda: {'types': ['OS::Heat::None']})
+        value['types'].append('OS::Heat::Value')
+        cached = cache.get('/types', mock.Mock())
+        self.assertEqual({'types': ['OS::Heat::None']}, cached)
+        cached['types'].clear()
+        self.assertEqual({'types': ['OS::Heat::None']},
+                         cache.get('/types', mock.Mock()))
+
+    def test_version_change(self):
+        cache = self._cache()
+        cache.get('/types', lambda: ['OS::Heat::None'])
+        cache.flush()
+
+        self.useFixture(fixtures.MockPatchObject(
+            catalog_cache, 'CACHE_VERSION', 0))
+        self.assertEqual([], self._cache().get('/types', lambda: []))
+
+    def test_expired_refreshes_in_background(self):
+        cache = self._cache(ttl=10)
+        now = self.useFixture(fixtures.MockPatch('time.time')).mock
+        now.return_value = 100
+        cache.get('/types', lambda: ['old'])
+
+        now.return_value = 200
+        with mock.patch('threading.Thread') as thread:
+            self.assertEqual(['old'], cache.get('/types', lambda: ['new']))
+            self.assertEqual(['old'], cache.get('/types', lambda: ['new']))
+        # a single refresh is started for the expired entry
+        thread.assert_called_once_with(target=mock.ANY, args=mock.ANY,
+                                       daemon=True)
+        kwargs = thread.call_args[1]
+        kwargs['target'](*kwargs['args'])
+        self.assertEqual(['new'], cache.get('/types', lambda: ['newer']))
+
+    def test_flush_waits_for_refresh(self):
+        cache = self._cache(ttl=10)
+        now = self.useFixture(fixtures.MockPatch('time.time')).mock
+        now.return_value = 100
+        cache.get('/types', lambda: ['old'])
+        cache.flush()
+
+        now.return_value = 200
+        refreshing = threading.Event()
+
+        def loader():
+            refreshing.wait()
+            return ['new']
+
+        self.assertEqual(['old'], cache.get('/types', loader))
+        threading.Timer(0.05, refreshing.set).start()
+        cache.flush()
+        self.assertEqual(['new'],
+                         self._cache(ttl=1000).get('/types', mock.Mock()))
+
+    def test_invalidate(self):
+        cache = self._cache()
+        cache.get('/types', lambda: ['OS::Heat::None'])
+        cache.flush()
+        cache.invalidate()
+        self.assertEqual([], cache.get('/types', lambda: []))
+        self.assertEqual([], self._cache().get('/types', lambda: []))
+
+    def test_build_info_error(self):
+        def build_info():
+            raise Exception('forbidden')
+
+        cache = self._cache(build_info=build_info)
+        self.assertEqual(['a'], cache.get('/types', lambda: ['a']))
+
+    def test_client_endpoint(self):
+        session_client = mock.Mock()
+        session_client.get_endpoint.return_value = 'http://heat/v1'
+        self.assertEqual('http://heat/v1',
+                         catalog_cache.client_endpoint(session_client))
+        http_client = mock.Mock(spec=['endpoint'])
+        http_client.endpoint = 'http://heat/v1/t'
+        self.assertEqual('http://heat/v1/t',
+                         catalog_cache.client_endpoint(http_client))
+        self.assertIsNone(catalog_cache.client_endpoint(mock.Mock()))
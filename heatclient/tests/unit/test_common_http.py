@@ -16,7 +16,9 @@ from unittest import mock
 
 import io
 from keystoneauth1 import adapter
+from keystoneauth1 import session
 from oslo_serialization import jsonutils
+from requests_mock.contrib import fixture as rm_fixture
 import testtools
 
 from heatclient.common import http
@@ -490,6 +492,46 @@ class HttpClientTest(testtools.TestCase):
                 "-k -d 'text' http://foo/bar"
             )
 
+    def test_debug_logging_skipped(self, mock_request):
+        mock_request.return_value = fakes.FakeHTTPResponse(
+            200, 'OK', {'content-type': 'application/json'}, '{}')
+        client = http.HTTPClient('http://somewhere', token='token')
+        with mock.patch.object(http.LOG, 'isEnabledFor', return_value=False), \
+                mock.patch.object(client, 'log_curl_request') as log_req, \
+                mock.patch.object(client, 'log_http_response') as log_resp, \
+                mock.patch.object(http.encodeutils, 'safe_decode') as decode:
+            client.raw_request('GET', '')
+        log_req.assert_not_called()
+        log_resp.assert_not_called()
+        # the body of successful responses isn't decoded
+        decode.assert_not_called()
+
+        with mock.patch.object(http.LOG, 'isEnabledFor', return_value=True), \
+                mock.patch.object(client, 'log_curl_request') as log_req, \
+                mock.patch.object(client, 'log_http_response') as log_resp:
+            client.json_request('GET', '')
+        log_req.assert_called_once_with('GET', '', mock.ANY)
+        log_resp.assert_called_once_with(mock_request.return_value)
+
+    def test_http_request_headers_copied(self, mock_request):
+        mock_request.return_value = fakes.FakeHTTPResponse(
+            200, 'OK', {'content-type': 'application/json'}, '{}')
+        client = http.HTTPClient('http://somewhere', token='token')
+        headers = {'X-Custom': 'value'}
+        client.raw_request('GET', '', headers=headers)
+        self.assertEqual({'X-Custom': 'value',
+                          'Content-Type': 'application/octet-stream'},
+                         headers)
+        self.assertEqual('token',
+                         mock_request.call_args[1]['headers']['X-Auth-Token'])
+
+    def test_http_500_auth_failure(self, mock_request):
+        mock_request.return_value = fakes.FakeHTTPResponse(
+            500, 'ERROR', {'content-type': 'text/plain'},
+            'Keystone error (HTTP 401)')
+        client = http.HTTPClient('http://somewhere', token='token')
+        self.assertRaises(exc.HTTPUnauthorized, client.raw_request, 'GET', '')
+
     def test_http_request_socket_error(self, mock_request):
         headers = {'User-Agent': 'python-heatclient'}
         mock_request.side_effect = [socket.error]
@@ -558,12 +600,36 @@ class HttpClientTest(testtools.TestCase):
         mock_log.assert_called_once_with(
             "curl -g -i -X GET -H 'Key: foo㊎' http://somewhere")
 
+    def test_share_connections(self, mock_request):
+        client = http.HTTPClient('http://somewhere')
+        self.assertIsNone(client.requests_session)
+        http.share_connections(client, pool_size=4)
+        session = client.requests_session
+        self.assertIsNotNone(session)
+        for transport in session.adapters.values():
+            self.assertEqual(4, transport.poolmanager.connection_pool_kw[
+                'maxsize'])
+
+        with mock.patch.object(session, 'request') as session_request:
+            session_request.return_value = fakes.FakeHTTPResponse(
+                200, 'OK', {'content-type': 'application/json'}, '{}')
+            client.json_request('GET', '')
+        session_request.assert_called_once_with(
+            'GET', 'http://somewhere', allow_redirects=False,
+            headers=mock.ANY)
+        mock_request.assert_not_called()
+
+        # the session is kept when sharing again
+        http.share_connections(client)
+        self.assertIs(session, client.requests_session)
+
 
 class SessionClientTest(testtools.TestCase):
     def setUp(self):
         super().setUp()
-        self.request = mock.patch.object(adapter.LegacyJsonAdapter,
-                                         'request').start()
+        patcher = mock.patch.object(adapter.LegacyJsonAdapter, 'request')
+        self.request = patcher.start()
+        self.addCleanup(patcher.stop)
 
     def test_session_simple_request(self):
         resp = fakes.FakeHTTPResponse(
@@ -800,3 +866,68 @@ class SessionClientTest(testtools.TestCase):
     def test_credentials_headers(self):
         client = http.SessionClient(mock.ANY)
         self.assertEqual({}, client.credentials_headers())
+
+
+class RequestHooksTest(testtools.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.requests = self.useFixture(rm_fixture.Fixture())
+        self.requests.get('http://heat/stacks/s',
+                          status_code=302,
+                          headers={'location': 'http://heat/stacks/s/1'})
+        self.requests.get('http://heat/stacks/s/1',
+                          headers={'Content-Type': 'application/json'},
+                          json={'stack': {'id': '1'}})
+        self.requests.post('http://heat/stacks', status_code=400,
+                           headers={'Content-Type': 'application/json'},
+                           json={'error': {'message': 'Bad template'}})
+        self.records = []
+
+    def _check_records(self):
+        get, post = self.records
+        self.assertEqual(('GET', '/stacks/s', '/stacks/{stack_name}', 200,
+                          0, len(b'{"stack": {"id": "1"}}'), 1, 0),
+                         (get.method, get.url, get.url_template, get.status,
+                          get.request_bytes, get.response_bytes,
+                          get.redirects, get.retries))
+        self.assertGreater(get.latency, 0)
+        self.assertEqual(('POST', '/stacks', 400, len(b'{"x": 1}')),
+                         (post.method, post.url_template, post.status,
+                          post.request_bytes))
+
+    def test_http_client(self):
+        client = http.HTTPClient('http://heat')
+        client.add_request_hook(self.records.append)
+        client.get('/stacks/s')
+        self.assertRaises(exc.HTTPBadRequest, client.post, '/stacks',
+                          data={'x': 1})
+        self._check_records()
+
+        client.remove_request_hook(self.records.append)
+        client.get('/stacks/s')
+        self.assertEqual(2, len(self.records))
+
+    def test_session_client(self):
+        client = http.SessionClient(session.Session(),
+                                    endpoint_override='http://heat')
+        client.add_request_hook(self.records.append)
+        client.get('/stacks/s', redirect=True)
+        self.assertRaises(exc.HTTPBadRequest, client.post, '/stacks',
+                          data={'x': 1})
+        self._check_records()
+
+    def test_hook_errors_ignored(self):
+        client = http.HTTPClient('http://heat')
+        client.add_request_hook(mock.Mock(side_effect=ValueError))
+        client.add_request_hook(self.records.append)
+        client.get('/stacks/s')
+        self.assertEqual(1, len(self.records))
+
+    @mock.patch('heatclient.common.http.requests.request')
+    def test_no_hooks(self, mock_request):
+        mock_request.return_value = fakes.FakeHTTPResponse(
+            200, 'OK', {'content-type': 'application/json'}, '{}')
+        client = http.HTTPClient('http://heat')
+        client.get('/stacks/s')
+        self.assertNotIn('hooks', mock_request.call_args[1])
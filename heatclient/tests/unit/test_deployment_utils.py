@@ -17,6 +17,7 @@ import swiftclient.client
 import testscenarios
 import testtools
 from testtools import matchers
+import threading
 import time
 
 from heatclient.common import deployment_utils
@@ -333,6 +334,19 @@ class TempURLSignalTest(testtools.TestCase):
             'a Swift TempURL.'),
             str(e))
 
+    def test_build_signal_id_no_session(self):
+        # clients using a cached token have no session
+        hc = mock.MagicMock()
+        hc.http_client = mock.Mock(spec=['endpoint'])
+        args = mock.MagicMock()
+        args.os_no_client_auth = False
+        args.signal_transport = 'TEMP_URL_SIGNAL'
+        e = self.assertRaises(exc.CommandError,
+                              deployment_utils.build_signal_id, hc, args)
+        self.assertIn('A keystone session is required', str(e))
+        self.assertRaises(exc.CommandError,
+                          deployment_utils.signal_id_factory, hc, args)
+
     @mock.patch.object(deployment_utils, 'create_temp_url')
     @mock.patch.object(deployment_utils, 'create_swift_client')
     def test_build_signal_id(self, csc, ctu):
@@ -358,3 +372,78 @@ class TempURLSignalTest(testtools.TestCase):
         self.assertEqual(
             mock.call(csc.return_value, 'foo', 60),
             ctu.call_args)
+
+    def test_signal_id_factory_no_signal(self):
+        hc = mock.MagicMock()
+        args = mock.MagicMock()
+        args.signal_transport = 'NO_SIGNAL'
+        signal_id = deployment_utils.signal_id_factory(hc, args)
+        self.assertIsNone(signal_id())
+
+    def test_signal_id_factory_no_client_auth(self):
+        hc = mock.MagicMock()
+        args = mock.MagicMock()
+        args.os_no_client_auth = True
+        args.signal_transport = 'TEMP_URL_SIGNAL'
+        self.assertRaises(exc.CommandError,
+                          deployment_utils.signal_id_factory, hc, args)
+
+    @mock.patch.object(deployment_utils, 'create_swift_client')
+    def test_signal_id_factory(self, csc):
+        hc = mock.MagicMock()
+        args = mock.MagicMock()
+        args.name = 'foo'
+        args.timeout = 60
+        args.container = 'bar'
+        args.os_no_client_auth = False
+        args.signal_transport = 'TEMP_URL_SIGNAL'
+        swift_clients = []
+
+        def create_swift_client(auth, session, args):
+            swift_client = mock.MagicMock()
+            swift_client.url = 'http://fake-host.com:8080/v1/AUTH_demo'
+            swift_client.head_account.return_value = {
+                'x-account-meta-temp-url-key': '123456'}
+            swift_clients.append(swift_client)
+            return swift_client
+
+        csc.side_effect = create_swift_client
+        signal_id = deployment_utils.signal_id_factory(hc, args)
+        urls = [signal_id(), signal_id()]
+        worker = threading.Thread(target=lambda: urls.append(signal_id()))
+        worker.start()
+        worker.join()
+
+        for url in urls:
+            self.assertTrue(url.startswith(
+                'http://fake-host.com:8080/v1/AUTH_demo/bar/'))
+        self.assertEqual(3, len(set(urls)))
+        # the container and key are set up once, and each thread uses its
+        # own connection to store the signal objects
+        self.assertEqual(2, len(swift_clients))
+        swift_clients[0].put_container.assert_called_once_with('bar')
+        swift_clients[0].head_account.assert_called_once_with()
+        self.assertEqual(2, swift_clients[0].put_object.call_count)
+        swift_clients[1].put_container.assert_not_called()
+        swift_clients[1].head_account.assert_not_called()
+        self.assertEqual(1, swift_clients[1].put_object.call_count)
+
+
+class DeriveServerConfigTest(testtools.TestCase):
+
+    def test_derive_server_config_params(self):
+        params = deployment_utils.build_derived_config_params(
+            'UPDATE', {}, 's1', {'foo': 'bar'}, None, 'TEMP_URL_SIGNAL')
+        derived = deployment_utils.derive_server_config_params(
+            params, '1234', 'signal')
+        inputs = {i['name']: i['value'] for i in derived['inputs']}
+        self.assertEqual('1234', inputs['deploy_server_id'])
+        self.assertEqual('signal', inputs['deploy_signal_id'])
+        self.assertEqual('bar', inputs['foo'])
+        # the shared params are left untouched
+        inputs = {i['name']: i['value'] for i in params['inputs']}
+        self.assertIsNone(inputs['deploy_server_id'])
+        self.assertIsNone(inputs['deploy_signal_id'])
+        self.assertEqual(
+            params, deployment_utils.build_derived_config_params(
+                'UPDATE', {}, 's1', {'foo': 'bar'}, None, 'TEMP_URL_SIGNAL'))
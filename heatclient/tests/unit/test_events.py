@@ -36,7 +36,7 @@ class EventManagerTest(testtools.TestCase):
             manager._list.assert_called_once_with(
                 '/stacks/teststack/abcd1234/'
                 'resources/testresource/events',
-                "events")
+                "events", compact=False)
             mock_re.assert_called_once_with(stack_id)
 
     def test_list_event_with_unicode_resource_name(self):
@@ -53,7 +53,7 @@ class EventManagerTest(testtools.TestCase):
             manager._list.assert_called_once_with(
                 '/stacks/teststack/abcd1234/'
                 'resources/%E5%B7%A5%E4%BD%9C/'
-                'events', "events")
+                'events', "events", compact=False)
             mock_re.assert_called_once_with(stack_id)
 
     def test_list_event_with_none_resource_name(self):
@@ -63,7 +63,8 @@ class EventManagerTest(testtools.TestCase):
         manager.list(stack_id)
         # Make sure url is correct.
         manager._list.assert_called_once_with('/stacks/teststack/'
-                                              'events', "events")
+                                              'events', "events",
+                                              compact=False)
 
     def test_list_event_with_kwargs(self):
         stack_id = 'teststack',
@@ -0,0 +1,145 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import time
+
+import testtools
+
+from heatclient.common import event_utils
+from heatclient.common import utils
+from heatclient import exc
+from heatclient.tests import fake_heat_api
+from heatclient.v1 import client as v1client
+
+
+class FakeHeatAPITest(testtools.TestCase):
+
+    def start(self, api):
+        server = fake_heat_api.FakeHeatServer(api).start()
+        self.addCleanup(server.stop)
+        return v1client.Client(endpoint=server.endpoint, token='token')
+
+    def setUp(self):
+        super().setUp()
+        self.api = fake_heat_api.FakeHeatAPI(seed=1, max_page_size=4)
+        self.api.populate(stacks=6, resources=3, nested_depth=2,
+                          deployments=1)
+        self.hc = self.start(self.api)
+
+    def test_stack_list_pagination(self):
+        self.assertEqual(4, len(list(self.hc.stacks.list())))
+        stacks = list(self.hc.stacks.list(limit=100))
+        self.assertEqual(['stack_%d' % i for i in range(5, -1, -1)],
+                         [s.stack_name for s in stacks])
+        self.assertEqual(18, len(list(self.hc.stacks.list(
+            limit=100, show_nested=True))))
+
+    def test_stack_lookup(self):
+        stack = self.hc.stacks.get('stack_2')
+        self.assertEqual('CREATE_COMPLETE', stack.stack_status)
+        self.assertEqual(['output_0', 'output_1'],
+                         [o['output_key'] for o in stack.outputs])
+        self.assertEqual(stack.id, self.hc.stacks.get(stack.id).id)
+        self.assertEqual({'output_key': 'output_1',
+                          'description': 'Output 1',
+                          'output_value': '10.0.0.2'},
+                         self.hc.stacks.output_show('stack_2',
+                                                    'output_1')['output'])
+        self.assertRaises(exc.HTTPNotFound, self.hc.stacks.get, 'missing')
+
+    def test_nested_resources(self):
+        resources = self.hc.resources.list('stack_2')
+        self.assertEqual(['resource_0', 'resource_1', 'resource_2',
+                          'nested_stack'],
+                         [r.resource_name for r in resources])
+        nested = self.hc.resources.list('stack_2', nested_depth=2)
+        self.assertEqual(11, len(nested))
+        nested_id = utils.resource_nested_identifier(resources[-1])
+        self.assertEqual(4, len(self.hc.resources.list(nested_id)))
+
+    def test_events_paging(self):
+        events = event_utils.get_events(self.hc, 'stack_2', {})
+        self.assertEqual(4, len(events))
+        marker = events[-1].id
+        more = event_utils.get_events(self.hc, 'stack_2', {}, marker=marker)
+        self.assertNotIn(marker, [e.id for e in more])
+        nested = event_utils.get_events(self.hc, 'stack_2', {},
+                                        nested_depth=2, limit=3)
+        self.assertEqual(3, len(nested))
+        self.assertIn('root_stack', [link['rel']
+                                     for link in nested[0].links])
+        self.assertEqual(2, len(event_utils.get_events(
+            self.hc, 'stack_2', {'resource_name': 'resource_1'})))
+
+    def test_create_delete_stack(self):
+        self.hc.stacks.create(stack_name='new', template={
+            'heat_template_version': '2016-10-14',
+            'resources': {'random': {'type': 'OS::Heat::RandomString'}}})
+        self.assertEqual(['random'], [
+            r.resource_name for r in self.hc.resources.list('new')])
+        self.assertRaises(exc.HTTPConflict, self.hc.stacks.create,
+                          stack_name='new', template={})
+        self.hc.stacks.delete('new')
+        self.assertRaises(exc.HTTPNotFound, self.hc.stacks.get, 'new')
+
+    def test_software_deployments(self):
+        deployments = self.hc.software_deployments.list()
+        self.assertEqual(6, len(deployments))
+        server_id = deployments[0].server_id
+        metadata = self.hc.software_deployments.metadata(server_id)
+        self.assertEqual([deployments[0].id],
+                         [m['deployment_id'] for m in metadata])
+        sd = self.hc.software_deployments.update(
+            deployments[0].id, status='FAILED')
+        self.assertEqual('FAILED', sd.status)
+        self.hc.software_deployments.delete(deployments[0].id)
+        self.assertEqual(5, len(self.hc.software_deployments.list()))
+
+    def test_request_counts(self):
+        self.hc.stacks.get('stack_0')
+        self.assertEqual(2, self.api.requests[('GET', 'stacks')])
+
+    def test_seeded(self):
+        other = fake_heat_api.FakeHeatAPI(seed=1)
+        other.populate(stacks=6, resources=3, nested_depth=2, deployments=1)
+        self.assertEqual(list(self.api.stacks), list(other.stacks))
+
+
+class FakeHeatAPIInjectionTest(testtools.TestCase):
+
+    def start(self, api):
+        api.populate(stacks=1)
+        server = fake_heat_api.FakeHeatServer(api).start()
+        self.addCleanup(server.stop)
+        return v1client.Client(endpoint=server.endpoint, token='token')
+
+    def test_errors(self):
+        hc = self.start(fake_heat_api.FakeHeatAPI(error_rate=1.0,
+                                                  error_status=500))
+        e = self.assertRaises(exc.HTTPInternalServerError, hc.stacks.get,
+                              'stack_0')
+        self.assertEqual('Injected error', e.error['error']['message'])
+
+    def test_latency(self):
+        paths = []
+
+        def latency(method, path):
+            paths.append((method, path))
+            return 0.05
+
+        hc = self.start(fake_heat_api.FakeHeatAPI(latency=latency))
+        start = time.perf_counter()
+        hc.stacks.get('stack_0')
+        self.assertGreaterEqual(time.perf_counter() - start, 0.1)
+        self.assertEqual(2, len(paths))
+        self.assertEqual(('GET', '/v1/%s/stacks/stack_0' %
+                          fake_heat_api.TENANT_ID), paths[0])
@@ -0,0 +1,106 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import subprocess
+import sys
+import textwrap
+from unittest import mock
+
+import testtools
+
+from heatclient.common import lazy
+
+# Modules which only some commands need, and which are costly to import
+DEFERRED_MODULES = (
+    'heatclient.common.deployment_utils',
+    'heatclient.common.event_utils',
+    'heatclient.common.http',
+    'heatclient.common.template_utils',
+    'heatclient.v1.client',
+    'keystoneauth1.identity',
+    'openstackclient.identity.common',
+    'oslo_utils.strutils',
+    'prettytable',
+    'swiftclient',
+    'yaml',
+)
+
+
+class ColdStartTest(testtools.TestCase):
+
+    def _check(self, code, preload=(), allowed=()):
+        """Run code in a new interpreter, after importing preload.
+
+        The interpreter fails if code imports any deferred module other
+        than the allowed ones.
+        """
+        script = textwrap.dedent('''
+            import sys
+            for name in %(preload)r:
+                __import__(name)
+            before = set(sys.modules)
+            %(code)s
+            imported = sorted(m for m in %(deferred)r
+                              if m in sys.modules and m not in before and
+                              m not in %(allowed)r)
+            if imported:
+                sys.exit('Deferred modules imported: %%s' %%
+                         ', '.join(imported))
+        ''') % {'preload': preload, 'code': code, 'allowed': allowed,
+                'deferred': DEFERRED_MODULES}
+        proc = subprocess.run([sys.executable, '-c', script],
+                              capture_output=True)
+        self.assertEqual(0, proc.returncode, proc.stderr.decode())
+
+    def test_osc_stack_commands(self):
+        # the openstack command imports these before loading any plugin
+        preload = ('osc_lib.command.command', 'osc_lib.utils',
+                   'oslo_serialization.jsonutils')
+        self._check('import heatclient.osc.plugin\n'
+                    'import heatclient.osc.v1.stack', preload)
+
+    def test_heat_shell_command(self):
+        self._check('import heatclient.shell\n'
+                    'shell = heatclient.shell.HeatShell()\n'
+                    'shell.get_subcommand_parser("1", "stack-list")\n'
+                    'assert list(shell.subcommands) == ["stack-list"]',
+                    allowed=('oslo_utils.strutils',))
+
+
+class LazyModuleTest(testtools.TestCase):
+
+    def test_import_module(self):
+        module = lazy.import_module('heatclient.tests.unit.fakes')
+        self.assertIsInstance(module, lazy.LazyModule)
+        from heatclient.tests.unit import fakes
+        self.assertIs(fakes.FakeRaw, module.FakeRaw)
+
+        # patches of the module are seen through the proxy
+        with mock.patch.object(fakes, 'FakeRaw') as patched:
+            self.assertIs(patched, module.FakeRaw)
+
+    def test_import_module_deferred(self):
+        out = subprocess.check_output([sys.executable, '-c', textwrap.dedent(
+            '''
+            import sys
+            from heatclient.common import lazy
+            mod = lazy.import_module('heatclient.common.template_format')
+            print(mod.__name__ in sys.modules)
+            mod.parse
+            print(mod.__name__ in sys.modules)
+            ''')])
+        self.assertEqual(['False', 'True'], out.decode().split())
+
+    def test_import_module_missing(self):
+        self.assertRaises(ImportError, lazy.import_module, 'no_such_module.x')
+        module = lazy.import_module('heatclient.no_such_module')
+        self.assertRaises(ImportError, getattr, module, 'attr')
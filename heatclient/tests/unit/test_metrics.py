@@ -0,0 +1,127 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import io
+from unittest import mock
+
+import testtools
+
+from heatclient.common import metrics
+
+
+class UrlTemplateTest(testtools.TestCase):
+
+    def test_url_template(self):
+        for url, template in [
+            ('/stacks?limit=10', '/stacks'),
+            ('http://heat:8004/v1/tenant/stacks/mystack/0123/resources/'
+             'server/events/abcd',
+             '/stacks/{stack_name}/{stack_id}/resources/{resource_name}/'
+             'events/{event_id}'),
+            ('/stacks/mystack', '/stacks/{stack_name}'),
+            ('/stacks/mystack/outputs/out', '/stacks/{stack_name}/outputs/'
+                                            '{output_key}'),
+            ('/stacks/preview', '/stacks/preview'),
+            ('/stacks/s/1/snapshots/2/restore',
+             '/stacks/{stack_name}/{stack_id}/snapshots/{snapshot_id}/'
+             'restore'),
+            ('/resource_types/OS::Nova::Server/template',
+             '/resource_types/{type_name}/template'),
+            ('/software_deployments/metadata/server',
+             '/software_deployments/metadata/{server_id}'),
+            ('/template_versions/heat_template_version.2016-10-14/functions',
+             '/template_versions/{template_version}/functions'),
+            ('/unknown/path', '/unknown/path'),
+        ]:
+            self.assertEqual(template, metrics.url_template(url))
+
+
+class MakeRecordTest(testtools.TestCase):
+
+    def _response(self, status, body=b'', request_body=None):
+        return mock.Mock(status_code=status, content=body,
+                         request=mock.Mock(body=request_body))
+
+    def test_make_record(self):
+        responses = [self._response(302, b'', '{"a": 1}'),
+                     self._response(503, b'busy', '{"a": 1}'),
+                     self._response(200, b'{"ok": true}', '{"a": 1}')]
+        record = metrics.make_record('POST', '/stacks/s/actions',
+                                     responses, 0.5)
+        self.assertEqual(metrics.RequestRecord(
+            'POST', '/stacks/s/actions', '/stacks/{stack_name}/actions',
+            200, 24, 16, 0.5, 1, 1), record)
+
+    def test_make_record_without_response(self):
+        record = metrics.make_record('PUT', '/stacks/s/1', [], 0.1,
+                                     data='{"é": 1}')
+        self.assertIsNone(record.status)
+        self.assertEqual(9, record.request_bytes)
+        self.assertEqual((0, 0, 0), (record.response_bytes,
+                                     record.redirects, record.retries))
+
+
+class LatencyHistogramTest(testtools.TestCase):
+
+    def test_percentiles(self):
+        histogram = metrics.LatencyHistogram()
+        self.assertEqual(0.0, histogram.percentile(50))
+        for latency in [0.003] * 50 + [0.07] * 40 + [0.2] * 9 + [3.2]:
+            histogram.add(latency)
+        self.assertEqual(100, histogram.count)
+        self.assertEqual(0.005, histogram.percentile(50))
+        self.assertEqual(0.1, histogram.percentile(90))
+        self.assertEqual(0.25, histogram.percentile(99))
+        self.assertEqual(3.2, histogram.percentile(100))
+        self.assertAlmostEqual(0.0795, histogram.mean)
+
+    def test_overflow(self):
+        histogram = metrics.LatencyHistogram(buckets=(1.0, float('inf')))
+        histogram.add(120.0)
+        self.assertEqual(120.0, histogram.percentile(50))
+
+
+class RequestMetricsTest(testtools.TestCase):
+
+    def _record(self, method, url, status, latency):
+        return metrics.RequestRecord(method, url, metrics.url_template(url),
+                                     status, 10, 100, latency, 0, 0)
+
+    def test_summary(self):
+        request_metrics = metrics.RequestMetrics()
+        request_metrics(self._record('GET', '/stacks/a/1', 200, 0.1))
+        request_metrics(self._record('GET', '/stacks/b/2', 404, 0.3))
+        request_metrics(self._record('GET', '/stacks', 200, 0.2))
+        request_metrics(self._record('POST', '/stacks', None, 0.05))
+
+        rows = [[round(v, 6) if isinstance(v, float) else v for v in row]
+                for row in request_metrics.summary()]
+        self.assertEqual([
+            ['GET', '/stacks/{stack_name}/{stack_id}', 2, 1, 0.4, 0.2, 0.1,
+             0.3, 0.3, 0.3, 20, 200, 0, 0],
+            ['GET', '/stacks', 1, 0, 0.2, 0.2, 0.2, 0.2, 0.2, 0.2, 10, 100,
+             0, 0],
+            ['POST', '/stacks', 1, 1, 0.05, 0.05, 0.05, 0.05, 0.05, 0.05, 10,
+             100, 0, 0],
+        ], rows)
+
+        out = io.StringIO()
+        request_metrics.print_summary(out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(7, len(lines))
+        self.assertIn('| GET    | /stacks/{stack_name}/{stack_id} | 2     | 1'
+                      '      | 0.400 |', lines[3])
+
+    def test_print_summary_empty(self):
+        out = io.StringIO()
+        metrics.RequestMetrics().print_summary(out)
+        self.assertEqual('', out.getvalue())
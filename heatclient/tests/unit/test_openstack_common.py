@@ -13,10 +13,21 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import copy
+import json
+import operator
+import pickle
+import tracemalloc
+from unittest import mock
+
+import fixtures
+from oslo_serialization import jsonutils
 import testtools
 
 from heatclient.common import base
+from heatclient import exc
 from heatclient.v1 import events
+from heatclient.v1 import resources
 from heatclient.v1 import stacks
 
 
@@ -67,9 +78,266 @@ class BaseTest(testtools.TestCase):
         self.assertFalse(r1.is_same_obj(r2))
         self.assertFalse(r2.is_same_obj(r1))
 
+    def test_to_dict_view(self):
+        info = {'id': 1, 'outputs': [{'output_key': 'a'}]}
+        r = base.Resource(None, info)
+        d = r.to_dict(read_only=True)
+        self.assertEqual(info, d)
+        self.assertIs(info['outputs'], d['outputs'])
+        self.assertRaises(TypeError, operator.setitem, d, 'id', 2)
+        # the view reflects details loaded later on
+        r._add_details({'name': 'hello'})
+        self.assertEqual('hello', d['name'])
+
+    def test_to_dict(self):
+        info = {'id': 1, 'outputs': [{'output_key': 'a'}]}
+        r = base.Resource(None, info)
+        d = r.to_dict()
+        self.assertIsInstance(d, dict)
+        self.assertEqual(info, d)
+        self.assertEqual(jsonutils.dumps(info), json.dumps(d))
+        d['outputs'].append({'output_key': 'b'})
+        d['id'] = 2
+        self.assertEqual([{'output_key': 'a'}], r.outputs)
+        self.assertEqual(1, r.to_dict()['id'])
+
     def test_is_diff_object_with_no_id(self):
         # Two resources with no ID: is different object
         r1 = base.Resource(None, {'name': 'joe', 'age': 12})
         r2 = base.Resource(None, {'name': 'joe', 'age': 12})
         self.assertFalse(r1.is_same_obj(r2))
         self.assertFalse(r2.is_same_obj(r1))
+
+
+class FakeManager(base.BaseManager):
+    resource_class = base.Resource
+
+    def __init__(self):
+        super().__init__(client=None)
+        self.calls = []
+
+    def get(self, id):
+        self.calls.append(id)
+        if id == 'missing':
+            raise exc.HTTPNotFound()
+        return base.Resource(self, {'id': id, 'status': 'OK-%s' % id})
+
+
+class PrefetchTest(testtools.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.manager = FakeManager()
+        self.manager.client = type('Client', (), {'last_request_id': None})
+
+    def test_prefetch(self):
+        objs = [base.Resource(self.manager, {'id': i}) for i in range(20)]
+        objs.append(base.Resource(self.manager, {'id': 'x'}, loaded=True))
+        self.assertEqual(objs, self.manager.prefetch(objs, max_workers=4))
+        self.assertEqual(list(range(20)), sorted(self.manager.calls))
+        self.assertEqual('OK-3', objs[3].status)
+        self.assertTrue(all(o.is_loaded() for o in objs))
+        # everything is loaded, so no further request is needed
+        self.assertEqual(20, len(self.manager.calls))
+
+    def test_prefetch_fields(self):
+        objs = [base.Resource(self.manager, {'id': 1}),
+                base.Resource(self.manager, {'id': 2, 'status': 'OK'})]
+        self.manager.prefetch(objs, fields=['status'])
+        self.assertEqual([1], self.manager.calls)
+        self.assertFalse(objs[1].is_loaded())
+
+    def test_prefetch_error(self):
+        objs = [base.Resource(self.manager, {'id': 1}),
+                base.Resource(self.manager, {'id': 'missing'})]
+        self.assertRaises(exc.HTTPNotFound, self.manager.prefetch, objs)
+        self.assertEqual('OK-1', objs[0].status)
+
+    def test_strict_loading(self):
+        self.manager.strict_loading = True
+        obj = base.Resource(self.manager, {'id': 1})
+        self.assertEqual(1, obj.id)
+        self.assertRaises(exc.LazyLoadError, getattr, obj, 'status')
+        self.assertEqual([], self.manager.calls)
+
+        self.manager.prefetch([obj])
+        self.assertEqual('OK-1', obj.status)
+        self.assertRaises(AttributeError, getattr, obj, 'missing')
+
+    def test_lazy_loading(self):
+        obj = base.Resource(self.manager, {'id': 1})
+        self.assertEqual('OK-1', obj.status)
+        self.assertEqual([1], self.manager.calls)
+
+
+class FakeResponse:
+
+    def __init__(self, body=None, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = {'content-type': 'application/json'}
+        self.headers.update(headers or {})
+        self.body = body
+        self.content = b""
+
+    def json(self):
+        return self.body
+
+
+class WatchTest(testtools.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.manager = FakeManager()
+        self.manager.client = mock.Mock()
+        self.sleep = self.useFixture(
+            fixtures.MockPatch('time.sleep')).mock
+
+    def _watch(self, responses, **kwargs):
+        responses = list(responses)
+
+        def get(url, headers):
+            if not responses:
+                raise exc.CommunicationError()
+            return responses.pop(0)
+
+        self.manager.client.get.side_effect = get
+        watched = []
+        try:
+            for data in self.manager._watch('/metadata', 'metadata',
+                                            **kwargs):
+                watched.append(data)
+        except exc.CommunicationError:
+            pass
+        return watched
+
+    def test_watch_changes(self):
+        watched = self._watch([
+            FakeResponse({'metadata': {'a': 1, 'b': 2}}),
+            FakeResponse({'metadata': {'b': 2, 'a': 1}}),
+            FakeResponse({'metadata': {'a': 1, 'b': 3}}),
+            FakeResponse({'metadata': {'a': 1, 'b': 3}}),
+        ], interval=2, max_interval=3)
+        self.assertEqual([{'a': 1, 'b': 2}, {'a': 1, 'b': 3}], watched)
+        self.assertEqual(
+            [mock.call('/metadata', headers={})] * 4,
+            self.manager.client.get.call_args_list[:4])
+        # the delay is reset on changes, backs off up to max_interval while
+        # unchanged and is jittered down to half its value
+        delays = [c[0][0] for c in self.sleep.call_args_list]
+        for delay, (low, high) in zip(delays, [(1, 2), (1.5, 3),
+                                               (1, 2), (1.5, 3)]):
+            self.assertTrue(low <= delay <= high, delays)
+
+    def test_watch_conditional(self):
+        headers = {'ETag': '"v1"', 'Last-Modified': 'yesterday'}
+        watched = self._watch([
+            FakeResponse({'metadata': {'a': 1}}, headers=headers),
+            FakeResponse(status_code=304),
+            FakeResponse({'metadata': {'a': 2}}),
+            FakeResponse({'metadata': {'a': 2}}),
+        ])
+        self.assertEqual([{'a': 1}, {'a': 2}], watched)
+        self.assertEqual([
+            mock.call('/metadata', headers={}),
+            mock.call('/metadata', headers={'If-None-Match': '"v1"',
+                                            'If-Modified-Since': 'yesterday'}),
+            mock.call('/metadata', headers={'If-None-Match': '"v1"',
+                                            'If-Modified-Since': 'yesterday'}),
+            mock.call('/metadata', headers={}),
+        ], self.manager.client.get.call_args_list[:4])
+
+    def test_watch_timeout(self):
+        self.useFixture(fixtures.MockPatch(
+            'time.monotonic', side_effect=[0, 1, 1, 10]))
+        self.manager.client.get.return_value = FakeResponse(
+            {'metadata': {'a': 1}})
+        watched = list(self.manager._watch('/metadata', 'metadata',
+                                           interval=10, timeout=5))
+        self.assertEqual([{'a': 1}], watched)
+        self.assertEqual(2, self.manager.client.get.call_count)
+        self.assertTrue(4 <= self.sleep.call_args[0][0] <= 5)
+
+
+class ResourceRecordTest(testtools.TestCase):
+
+    def test_attribute_access(self):
+        r = base.ResourceRecord(None, {'id': 1, 'name': 'hello'})
+        self.assertEqual(1, r.id)
+        self.assertEqual('hello', r.name)
+        self.assertEqual('hello', getattr(r, 'name', ''))
+        self.assertEqual('', getattr(r, 'missing', ''))
+        self.assertRaises(AttributeError, getattr, r, 'missing')
+        self.assertTrue(r.is_loaded())
+        self.assertEqual(1, base.getid(r))
+
+    def test_read_only(self):
+        r = base.ResourceRecord(None, {'id': 1})
+        self.assertRaises(AttributeError, setattr, r, 'id', 2)
+        self.assertRaises(AttributeError, setattr, r, 'name', 'x')
+        self.assertRaises(AttributeError, delattr, r, 'id')
+
+    def test_to_dict(self):
+        info = {'id': 1, 'links': [{'rel': 'self'}]}
+        r = base.ResourceRecord(None, info)
+        d = r.to_dict(read_only=True)
+        self.assertEqual(info, d)
+        self.assertRaises(TypeError, operator.setitem, d, 'id', 2)
+        d = r.to_dict()
+        d['links'].append({'rel': 'stack'})
+        self.assertEqual([{'rel': 'self'}], r.links)
+
+    def test_shared_field_index(self):
+        r1 = base.ResourceRecord(None, {'id': 1, 'name': 'a'})
+        r2 = base.ResourceRecord(None, {'id': 2, 'name': 'b'})
+        self.assertIs(r1._fields, r2._fields)
+
+        class SubRecord(base.ResourceRecord):
+            __slots__ = ()
+
+        r3 = SubRecord(None, {'id': 3, 'name': 'c'})
+        self.assertIs(r1._fields, r3._fields)
+        self.assertEqual(3, r3.id)
+
+    def test_field_index_bounded(self):
+        base._field_index.cache_clear()
+        for i in range(base.FIELD_INDEX_CACHE_SIZE + 10):
+            base.ResourceRecord(None, {'field_%d' % i: i})
+        self.assertEqual(base.FIELD_INDEX_CACHE_SIZE,
+                         base._field_index.cache_info().currsize)
+
+    def test_equality_and_copy(self):
+        r1 = base.ResourceRecord(None, {'id': 1, 'name': 'hello'})
+        r2 = base.ResourceRecord(None, {'id': 1, 'name': 'hello'})
+        self.assertEqual(r1, r2)
+        self.assertEqual(r1, copy.deepcopy(r1))
+        self.assertEqual(r1, pickle.loads(pickle.dumps(r1)))
+        self.assertNotEqual(
+            r1, resources.ResourceRecord(None, {'id': 1, 'name': 'hello'}))
+
+    def test_repr(self):
+        r = base.ResourceRecord(None, {'name': 'hello', 'id': 1})
+        self.assertEqual('<ResourceRecord id=1, name=hello>', repr(r))
+
+    def _measure(self, cls, body):
+        tracemalloc.start()
+        try:
+            before = tracemalloc.get_traced_memory()[0]
+            objs = [cls(None, info, loaded=True)
+                    for info in jsonutils.loads(body)]
+            used = tracemalloc.get_traced_memory()[0] - before
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(2000, len(objs))
+        return used
+
+    def test_memory_footprint(self):
+        keys = ['id', 'resource_name', 'resource_status', 'resource_type',
+                'physical_resource_id', 'logical_resource_id',
+                'resource_status_reason', 'updated_time', 'creation_time',
+                'links', 'required_by']
+        body = jsonutils.dumps([{k: '%s-%d' % (k, i) for k in keys}
+                                for i in range(2000)])
+        resources = self._measure(base.Resource, body)
+        records = self._measure(base.ResourceRecord, body)
+        # The decoded response dicts are only kept alive by Resource objects
+        self.assertLess(records * 4, resources * 3)
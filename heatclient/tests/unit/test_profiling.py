@@ -0,0 +1,106 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import pstats
+import sys
+from unittest import mock
+
+import fixtures
+from oslo_serialization import jsonutils
+import testtools
+
+from heatclient.common import metrics
+from heatclient.common import profiling
+from heatclient.common import template_format
+from heatclient.common import utils
+from heatclient.v1 import stacks
+
+
+class CommandProfilerTest(testtools.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'profile')
+
+    def _command(self):
+        http_client = mock.Mock()
+        http_client.get.return_value = mock.Mock(
+            headers={'content-type': 'application/json'},
+            json=mock.Mock(return_value={'stack': {'id': '1'}}))
+        manager = stacks.StackManager(http_client)
+        manager.get('mystack/1')
+        manager.get('mystack/1')
+        template_format.parse('heat_template_version: 2016-10-14\n')
+        self.useFixture(fixtures.MonkeyPatch('sys.stdout', mock.Mock()))
+        utils.print_dict({'id': '1'})
+
+    def test_profile(self):
+        client = mock.Mock()
+        with profiling.CommandProfiler(self.path, 'stack-show') as profiler:
+            profiler.attach(client)
+            self._command()
+        client.http_client.add_request_hook.assert_called_once_with(
+            profiler.request_metrics)
+
+        # the dump can be loaded by pstats
+        self.assertIsInstance(pstats.Stats(self.path), pstats.Stats)
+        with open(profiling.report_path(self.path)) as f:
+            report = jsonutils.loads(f.read())
+        self.assertEqual('stack-show', report['command'])
+        self.assertGreater(report['wall_time'], 0)
+        self.assertEqual(2, report['manager_calls']['StackManager.get'])
+        phases = report['phases']
+        self.assertEqual({name for name, _funcs in profiling.PHASES},
+                         set(phases))
+        self.assertGreater(phases['yaml parsing'], 0)
+        self.assertGreater(phases['formatting'], 0)
+        self.assertEqual(0, phases['template processing'])
+        self.assertEqual([], report['api_calls'])
+
+    def test_api_calls(self):
+        profiler = profiling.CommandProfiler(self.path)
+        profiler.request_metrics(metrics.RequestRecord(
+            'GET', '/stacks/s', '/stacks/{stack_name}', 200, 0, 10, 0.1, 1,
+            0))
+        profiler.start()
+        profiler.stop()
+        call, = profiler.report()['api_calls']
+        self.assertEqual({'Method': 'GET', 'URL': '/stacks/{stack_name}',
+                          'Count': 1, 'Redirects': 1},
+                         {k: call[k] for k in ('Method', 'URL',
+                                               'Count', 'Redirects')})
+
+    def test_stop_write_error(self):
+        profiler = profiling.CommandProfiler(
+            os.path.join(self.path, 'missing', 'profile'))
+        profiler.start()
+        with mock.patch.object(profiling.LOG, 'warning') as warning:
+            profiler.stop()
+        warning.assert_called_once()
+        self.assertIsNone(sys.getprofile())
+        # stopping again does nothing
+        profiler.stop()
+
+    def test_phase_times_nested(self):
+        parse = ('/x/heatclient/common/template_format.py', 53, 'parse')
+        env_parse = ('/x/heatclient/common/environment_format.py', 30,
+                     'parse')
+        other = ('/x/other.py', 1, 'parse')
+        stats = {
+            parse: (2, 2, 0.1, 0.5, {env_parse: (1, 1, 0.05, 0.2)}),
+            env_parse: (1, 1, 0.3, 0.4, {}),
+            other: (1, 1, 1.0, 1.0, {}),
+        }
+        self.assertAlmostEqual(0.7, profiling.phase_times(stats)[
+            'yaml parsing'])
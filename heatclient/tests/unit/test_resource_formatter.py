@@ -11,8 +11,11 @@
 #   under the License.
 #
 
+import hashlib
 import json
 import os
+from unittest import mock
+from xml.etree import ElementTree
 
 import io
 
@@ -99,3 +102,96 @@ OS::Heat::RandomString" ];
         formatter.emit_list(None, self.resources, out, None)
 
         self.assertEqual(self.data, out.getvalue())
+
+    def test_resource_list_hashes_urls_once(self):
+        urls = {link['href'] for r in self.resources for link in r.links}
+        with mock.patch('hashlib.sha256', wraps=hashlib.sha256) as sha256:
+            self.test_resource_list()
+        self.assertEqual(len(urls), sha256.call_count)
+
+    def _emit(self, formatter):
+        out = io.StringIO()
+        # resources are consumed as they arrive
+        formatter.emit_list(None, iter(self.resources), out, None)
+        return out.getvalue()
+
+    def test_resource_list_dot_stream(self):
+        data = self._emit(resource_formatter.ResourceDotStreamFormatter())
+        self.assertTrue(data.startswith('digraph G {\n'))
+        self.assertTrue(data.endswith('\n}\n'))
+        self.assertIn('  r2 [label="rg1\nOS::Heat::ResourceGroup" ];\n',
+                      data)
+        self.assertIn('  subgraph cluster_s1 {\n    label="rg1";\n  }\n',
+                      data)
+        self.assertIn('  subgraph cluster_s1 {\n'
+                      '    r4 [label="1\nOS::Heat::ResourceGroup" ];\n'
+                      '  }\n', data)
+        self.assertIn('  r2 -> r4 [\n    color=dimgray lhead=cluster_s1 '
+                      'arrowhead=none\n  ];\n', data)
+        self.assertIn('  r12 -> r11;\n', data)
+
+    def test_resource_list_jsonl(self):
+        lines = [json.loads(line) for line in self._emit(
+            resource_formatter.ResourceJsonLinesFormatter()).splitlines()]
+        nodes = [line for line in lines if line['kind'] == 'node']
+        self.assertEqual(len(self.resources), len(nodes))
+        self.assertEqual({'kind': 'node', 'id': 'r2', 'stack': 's0',
+                          'name': 'rg1',
+                          'resource_type': 'OS::Heat::ResourceGroup',
+                          'status': 'CREATE_COMPLETE',
+                          'nested_stack': 's1'}, nodes[0])
+        self.assertEqual(
+            [('nested', 'r2', 'r4'), ('nested', 'r4', 'r5'),
+             ('nested', 'r8', 'r9'), ('required_by', 'r12', 'r11')],
+            [(line['kind'], line['source'], line['target'])
+             for line in lines if line['kind'] != 'node'])
+
+    def test_resource_list_graphml(self):
+        ns = {'g': 'http://graphml.graphdrawing.org/xmlns'}
+        graph = ElementTree.fromstring(self._emit(
+            resource_formatter.ResourceGraphMLFormatter())).find('g:graph',
+                                                                 ns)
+        nodes = graph.findall('g:node', ns)
+        self.assertEqual(len(self.resources), len(nodes))
+        self.assertEqual(
+            {'name': 'random1', 'resource_type': 'OS::Heat::RandomString',
+             'status': 'CREATE_FAILED', 'stack': 's0'},
+            {d.get('key'): d.text for d in nodes[-1]})
+        self.assertEqual(
+            [('r2', 'r4'), ('r4', 'r5'), ('r8', 'r9'), ('r12', 'r11')],
+            [(e.get('source'), e.get('target'))
+             for e in graph.findall('g:edge', ns)])
+
+    def test_resource_graph_writer_pending_edge(self):
+        def res(name, required_by):
+            return v1_resources.Resource(None, {
+                'resource_name': name, 'required_by': required_by,
+                'resource_type': 'OS::Heat::None',
+                'resource_status': 'CREATE_COMPLETE',
+                'links': [{'rel': 'stack', 'href': 'http://heat/stacks/s'}]})
+
+        out = io.StringIO()
+        resource_formatter.ResourceJsonLinesWriter(out).write(
+            [res('a', ['b', 'missing']), res('b', [])])
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        # the edge is written once the resource it points to arrives
+        self.assertEqual(['a', 'b', 'required_by'],
+                         [line.get('name', line['kind']) for line in lines])
+
+    def test_resource_graph_writer_abstract(self):
+        self.assertRaises(TypeError, resource_formatter.ResourceGraphWriter,
+                          io.StringIO())
+
+    def test_resource_list_dot_escapes_labels(self):
+        res = v1_resources.Resource(None, {
+            'resource_name': 'my "quoted" \\name',
+            'resource_type': 'OS::Heat::None',
+            'resource_status': 'CREATE_COMPLETE', 'required_by': [],
+            'links': [{'rel': 'self', 'href': 'http://heat/stacks/s/r'},
+                      {'rel': 'stack', 'href': 'http://heat/stacks/s'}]})
+        label = 'label="my \\"quoted\\" \\\\name\nOS::Heat::None"'
+        for formatter in (resource_formatter.ResourceDotFormatter(),
+                          resource_formatter.ResourceDotStreamFormatter()):
+            out = io.StringIO()
+            formatter.emit_list(None, [res], out, None)
+            self.assertIn(label, out.getvalue())
@@ -113,3 +113,45 @@ class ResourceTypeManagerTest(testtools.TestCase):
         manager = self._base_test(expect, key)
         mock_utils.return_value = None
         manager.generate_template(resource_type, template_type)
+
+    def test_cached(self):
+        client = mock.Mock()
+        client.get_endpoint.return_value = 'http://heat/v1/tenant'
+        responses = {
+            '/resource_types': {'resource_types': ['OS::Heat::None']},
+            '/resource_types/OS%3A%3AHeat%3A%3ANone': {
+                'resource_type': 'OS::Heat::None'},
+            '/resource_types/OS%3A%3AHeat%3A%3ANone/template'
+            '?template_type=hot': {'heat_template_version': '2016-10-14'},
+        }
+
+        def get(url, **kwargs):
+            resp = mock.Mock(headers={'content-type': 'application/json'})
+            resp.json.return_value = responses[url]
+            return resp
+
+        client.get.side_effect = get
+        manager = resource_types.ResourceTypeManager(client)
+        manager.enable_cache()
+
+        for i in range(2):
+            self.assertEqual(['OS::Heat::None'],
+                             [t.resource_type for t in manager.list()])
+            self.assertEqual({'resource_type': 'OS::Heat::None'},
+                             manager.get('OS::Heat::None'))
+            self.assertEqual(
+                {'heat_template_version': '2016-10-14'},
+                manager.generate_template('OS::Heat::None', 'hot'))
+        # the description flag is part of the cache key
+        manager.get('OS::Heat::None', with_description=True)
+
+        # the cache is in memory only, so the build info isn't needed
+        self.assertEqual([
+            mock.call('/resource_types'),
+            mock.call('/resource_types/OS%3A%3AHeat%3A%3ANone',
+                      params={'with_description': False}),
+            mock.call('/resource_types/OS%3A%3AHeat%3A%3ANone/template'
+                      '?template_type=hot'),
+            mock.call('/resource_types/OS%3A%3AHeat%3A%3ANone',
+                      params={'with_description': True}),
+        ], client.get.call_args_list)
@@ -146,6 +146,26 @@ class ResourceManagerTest(testtools.TestCase):
             }, True)
         )
 
+    def test_list_compact(self):
+        class FakeResponse:
+            def json(self):
+                return {'resources': [{
+                    'resource_name': 'foobar',
+                    'links': [{
+                        'href': 'http://heat.example.com:8004/foo/12',
+                        'rel': 'stack'}]}]}
+
+        class FakeClient:
+            def get(self, *args, **kwargs):
+                assert args[0] == '/stacks/teststack/resources'
+                return FakeResponse()
+
+        manager = resources.ResourceManager(FakeClient())
+        result = manager.list('teststack', compact=True)
+        self.assertIsInstance(result[0], resources.ResourceRecord)
+        self.assertEqual('foobar', result[0].resource_name)
+        self.assertEqual('foo', result[0].stack_name)
+
     def test_metadata(self):
         fields = {'stack_id': 'teststack',
                   'resource_name': 'testresource'}
@@ -156,6 +176,25 @@ class ResourceManagerTest(testtools.TestCase):
 
         self._base_test('metadata', fields, expect, key)
 
+    @mock.patch('time.sleep')
+    def test_watch_metadata(self, mock_sleep):
+        client = mock.Mock()
+        client.get.return_value = mock.Mock(status_code=200, headers={})
+        manager = resources.ResourceManager(client)
+
+        with mock.patch.object(manager, '_resolve_stack_id') as mock_rslv, \
+                mock.patch.object(utils, 'get_response_body') as mock_resp:
+            mock_resp.return_value = {'metadata': {'foo': 'bar'}}
+            mock_rslv.return_value = 'teststack/abcd1234'
+
+            watcher = manager.watch_metadata('teststack', 'testresource')
+            self.assertEqual({'foo': 'bar'}, next(watcher))
+
+            mock_rslv.assert_called_once_with('teststack')
+            client.get.assert_called_once_with(
+                '/stacks/teststack/abcd1234/resources/testresource/metadata',
+                headers={})
+
     def test_generate_template(self):
         fields = {'resource_name': 'testresource'}
         expect = ('GET', '/resource_types/testresource/template')
@@ -31,7 +31,9 @@ from urllib import request
 import yaml
 
 from heatclient._i18n import _
+from heatclient.common import deployment_utils
 from heatclient.common import http
+from heatclient.common import token_cache
 from heatclient.common import utils
 from heatclient import exc
 import heatclient.shell
@@ -602,6 +604,218 @@ class ShellTestNoMox(ShellTestNoMoxBase):
         for r in required:
             self.assertRegex(list_text, r)
 
+    def test_profile_file(self):
+        self.register_keystone_auth_fixture()
+        self.requests.get(
+            'http://heat.example.com/build_info',
+            headers={'Content-Type': 'application/json'},
+            json={'api': {'revision': '1.0'}, 'engine': {'revision': '2.0'}})
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            'profile')
+
+        self.assertIn('2.0', self.shell('--profile-file %s build-info'
+                                        % path))
+        self.assertTrue(os.path.exists(path))
+        with open(path + '.json') as f:
+            report = jsonutils.loads(f.read())
+        self.assertEqual('build-info', report['command'])
+        self.assertEqual({'BuildInfoManager.build_info': 1},
+                         report['manager_calls'])
+        self.assertEqual([('GET', '/build_info', 1)],
+                         [(c['Method'], c['URL'], c['Count'])
+                          for c in report['api_calls']])
+        self.assertGreater(report['phases']['http requests'], 0)
+        self.assertGreater(report['phases']['formatting'], 0)
+
+    def _batch_file(self, content):
+        path = self.useFixture(fixtures.TempDir()).path
+        batch_file = os.path.join(path, 'commands')
+        with open(batch_file, 'w') as f:
+            f.write(content)
+        return batch_file
+
+    def _mock_batch_requests(self):
+        self.register_keystone_auth_fixture()
+        for name in ('one', 'two', 'three'):
+            self.requests.get(
+                'http://heat.example.com/stacks/%s/1/outputs/out' % name,
+                headers={'Content-Type': 'application/json'},
+                json={'output': {'output_key': 'out',
+                                 'output_value': name.upper()}})
+
+    def test_batch(self):
+        self._mock_batch_requests()
+        batch_file = self._batch_file(
+            '# outputs of the stacks\n'
+            'output-show one/1 out\n'
+            '\n'
+            '{"command": "output-show", "args": ["two/1", "out"]}\n'
+            'output-show three/1 out\n')
+
+        out = self.shell('batch --concurrency 3 %s' % batch_file)
+        self.assertEqual('ONE\nTWO\nTHREE\n', out)
+
+    def test_batch_stdin(self):
+        self._mock_batch_requests()
+        self.useFixture(fixtures.MonkeyPatch(
+            'sys.stdin', io.StringIO('output-show one/1 out\n')))
+
+        self.assertEqual('ONE\n', self.shell('batch'))
+
+    def test_batch_json_results(self):
+        self._mock_batch_requests()
+        batch_file = self._batch_file(
+            '{"command": "output-show", "args": ["one/1", "out"], "id": 1}\n'
+            'output-show\n'
+            'batch other\n'
+            'output-show three/1 out\n')
+        _shell = heatclient.shell.HeatShell()
+        self.useFixture(fixtures.MonkeyPatch('sys.stdout', io.StringIO()))
+        self.useFixture(fixtures.MonkeyPatch('sys.stderr', io.StringIO()))
+
+        e = self.assertRaises(
+            exc.CommandError, _shell.main,
+            ['batch', '--results', 'json', '--concurrency', '2',
+             batch_file])
+        self.assertEqual('2 of 4 commands failed', str(e))
+        results = [jsonutils.loads(line)
+                   for line in sys.stdout.getvalue().splitlines()]
+        self.assertEqual([
+            {'line': 1, 'id': 1, 'command': ['output-show', 'one/1', 'out'],
+             'status': 'OK', 'output': 'ONE\n'},
+            {'line': 2, 'command': ['output-show'],
+             'status': 'FAILED', 'output': '',
+             'error': 'heat output-show: error: the following arguments '
+                      'are required: <NAME or ID>', 'exit_code': 2},
+            {'line': 3, 'command': ['batch', 'other'], 'status': 'FAILED',
+             'output': '', 'error': 'batch can not be run in a batch'},
+            {'line': 4, 'command': ['output-show', 'three/1', 'out'],
+             'status': 'OK', 'output': 'THREE\n'},
+        ], results)
+
+    def test_batch_errors(self):
+        self._mock_batch_requests()
+        for path in ('missing/1', 'missing/1/outputs/out'):
+            self.requests.get(
+                'http://heat.example.com/stacks/%s' % path,
+                status_code=404, headers={'Content-Type': 'application/json'},
+                json={'error': {'message': 'The Stack (missing) could not '
+                                           'be found.'}})
+        batch_file = self._batch_file('output-show missing/1 out\n'
+                                      'output-show one/1 out\n')
+        self.useFixture(fixtures.MonkeyPatch('sys.stderr', io.StringIO()))
+
+        self.shell_error('batch %s' % batch_file, '1 of 2 commands failed',
+                         exception=exc.CommandError)
+        self.assertEqual('ERROR: line 1: Stack missing/1 or output out not '
+                         'found.\n', sys.stderr.getvalue())
+
+    def test_batch_help(self):
+        self._mock_batch_requests()
+        batch_file = self._batch_file('output-show --help\n'
+                                      'output-show one/1 out\n')
+
+        out = self.shell('batch --concurrency 2 %s' % batch_file)
+        self.assertTrue(out.startswith('usage: heat output-show'))
+        self.assertTrue(out.endswith('\nONE\n'))
+
+    def test_batch_system_exit(self):
+        self._mock_batch_requests()
+        self.useFixture(fixtures.MockPatch(
+            'heatclient.v1.stacks.StackManager.output_show',
+            side_effect=SystemExit(3)))
+        batch_file = self._batch_file('output-show one/1 out\n')
+        self.useFixture(fixtures.MonkeyPatch('sys.stderr', io.StringIO()))
+
+        self.shell_error('batch %s' % batch_file, '1 of 1 commands failed',
+                         exception=exc.CommandError)
+        self.assertEqual('ERROR: line 1: Command exited (exit code 3)\n',
+                         sys.stderr.getvalue())
+
+
+class ShellTestTokenCache(ShellTestNoMoxBase):
+
+    def setUp(self):
+        super().setUp()
+        if not token_cache.is_supported():
+            self.skipTest('cryptography is not installed')
+        self.useFixture(fixtures.EnvironmentVariable(
+            'XDG_CACHE_HOME', self.useFixture(fixtures.TempDir()).path))
+        self.register_keystone_auth_fixture()
+
+    def _set_fake_env(self):
+        self.set_fake_env(FAKE_ENV_KEYSTONE_V2)
+
+    def _auth_requests(self):
+        return len([r for r in self.requests.request_history
+                    if r.method == 'POST' and 'token' in r.path])
+
+    def test_token_cache(self):
+        build_info = self.requests.get(
+            'http://heat.example.com/build_info',
+            headers={'Content-Type': 'application/json'},
+            json={'api': {'revision': '1.0'}, 'engine': {'revision': '2.0'}})
+
+        out = self.shell('--token-cache build-info')
+        self.assertIn('2.0', out)
+        self.assertEqual(1, self._auth_requests())
+
+        # the cached token and endpoint are used without authenticating
+        self.assertEqual(out, self.shell('--token-cache build-info'))
+        self.assertEqual(1, self._auth_requests())
+        self.assertEqual(self.tokenid,
+                         build_info.last_request.headers['X-Auth-Token'])
+
+        # a rejected token is dropped from the cache
+        self.requests.get('http://heat.example.com/build_info',
+                          status_code=401)
+        self.shell_error('--token-cache build-info', 'Authentication failed',
+                         exception=exc.HTTPUnauthorized)
+        self.assertEqual(1, self._auth_requests())
+        self.shell_error('--token-cache build-info', 'ERROR',
+                         exception=exc.HTTPUnauthorized)
+        # keystoneauth authenticates once more when a request is rejected
+        self.assertEqual(3, self._auth_requests())
+
+    def test_token_cache_session_commands(self):
+        self.requests.get(
+            'http://heat.example.com/build_info',
+            headers={'Content-Type': 'application/json'},
+            json={'api': {'revision': '1.0'}, 'engine': {'revision': '2.0'}})
+        self.requests.post(
+            'http://heat.example.com/software_configs',
+            headers={'Content-Type': 'application/json'},
+            json={'software_config': {'id': 'c1'}})
+        self.requests.post(
+            'http://heat.example.com/software_deployments',
+            headers={'Content-Type': 'application/json'},
+            json={'software_deployment': {'id': 'd1'}})
+        create_swift_client = self.useFixture(fixtures.MockPatchObject(
+            deployment_utils, 'create_swift_client')).mock
+        self.useFixture(fixtures.MockPatchObject(
+            deployment_utils, 'create_temp_url',
+            return_value='http://swift/signal'))
+
+        self.shell('--token-cache build-info')
+        self.assertEqual(1, self._auth_requests())
+
+        # creating the TempURL signal needs a keystone session, so the
+        # cached token isn't used
+        self.shell('--token-cache deployment-create -s server1 deploy')
+        self.assertEqual(2, self._auth_requests())
+        auth, session, args = create_swift_client.call_args[0]
+        self.assertIsNotNone(session)
+
+    def test_token_cache_disabled(self):
+        self.requests.get(
+            'http://heat.example.com/build_info',
+            headers={'Content-Type': 'application/json'},
+            json={'api': {'revision': '1.0'}, 'engine': {'revision': '2.0'}})
+
+        self.shell('build-info')
+        self.shell('build-info')
+        self.assertEqual(2, self._auth_requests())
+
 
 class ShellTestNoMoxV3(ShellTestNoMox):
 
@@ -717,6 +931,15 @@ class ShellTestCommon(ShellBase):
             self.assertEqual(output1, output2)
             self.assertRegex(output1, '^usage: heat %s' % command)
 
+    def test_find_command(self):
+        _shell = heatclient.shell.HeatShell()
+        self.assertEqual('stack-list',
+                         _shell._find_command('1', ['stack-list', '-s']))
+        for args in ([], ['--help'], ['help', 'stack-list'],
+                     ['bash-completion'], ['bash_completion'],
+                     ['stack_list'], ['no-such-command']):
+            self.assertIsNone(_shell._find_command('1', args))
+
     def test_debug_switch_raises_error(self):
         self.register_keystone_auth_fixture()
         self.mock_request_error('/stacks?', 'GET', exc.Unauthorized("FAIL"))
@@ -2973,7 +3196,8 @@ class ShellTestHookFunctions(ShellBase):
             "stack_status": f'{action}_{status}',
             "creation_time": "2014-01-06T16:14:00Z",
         }}
-        self.mock_request_get('/stacks/teststack/1', resp_dict)
+        self.mock_request_get('/stacks/teststack/1', resp_dict,
+                              params={'resolve_outputs': False})
 
     def _stub_responses(self, stack_id, nested_id, action='CREATE'):
         action_reason = 'Stack %s started' % action
@@ -3175,6 +3399,28 @@ class ShellTestResources(ShellBase):
 --------------+
 ''', resource_list_text)
 
+    def test_resource_list_stream_tables(self):
+        self.register_keystone_auth_fixture()
+        self.useFixture(fixtures.MockPatchObject(
+            utils, 'STREAM_TABLES', False))
+        resp_dict = {"resources": [{
+            "resource_name": "aResource",
+            "physical_resource_id": "43b68bae-ed5d-4aed-a99f-0b3d39c2418a",
+            "resource_type": "OS::Nova::Server",
+            "resource_status": "CREATE_COMPLETE",
+            "updated_time": "2014-01-06T16:14:26Z"}]}
+        stack_id = 'teststack/1'
+        self.mock_request_get('/stacks/%s/resources' % stack_id, resp_dict)
+        self.mock_request_get('/stacks/%s/resources' % stack_id, resp_dict)
+
+        expected = self.shell(f'resource-list {stack_id}')
+        self.assertFalse(utils.STREAM_TABLES)
+        with mock.patch('prettytable.PrettyTable') as pt:
+            streamed = self.shell(f'--stream-tables resource-list {stack_id}')
+        self.assertTrue(utils.STREAM_TABLES)
+        pt.assert_not_called()
+        self.assertEqual(expected, streamed)
+
     def _test_resource_list_more_args(self, query_args, cmd_args,
                                       response_args):
         self.register_keystone_auth_fixture()
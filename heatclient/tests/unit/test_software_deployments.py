@@ -80,6 +80,19 @@ class SoftwareDeploymentManagerTest(testtools.TestCase):
             '/software_deployments/metadata/%s' % server_id,
             call_args[0][0])
 
+    @mock.patch('time.sleep')
+    @mock.patch.object(utils, 'get_response_body')
+    def test_watch_metadata(self, mock_utils, mock_sleep):
+        server_id = 'fc01f89f-e151-4dc5-9c28-543c0d20ed6a'
+        metadata = {'group1': [{'foo': 'bar'}]}
+        self.manager.client.get.return_value = mock.Mock(
+            status_code=200, headers={})
+        mock_utils.return_value = {'metadata': metadata}
+        watcher = self.manager.watch_metadata(server_id, interval=1)
+        self.assertEqual(metadata, next(watcher))
+        self.manager.client.get.assert_called_once_with(
+            '/software_deployments/metadata/%s' % server_id, headers={})
+
     @mock.patch.object(utils, 'get_response_body')
     def test_get(self, mock_utils):
         deployment_id = 'bca6871d-86c0-4aff-b792-58a1f6947b57'
@@ -16,6 +16,7 @@ import testscenarios
 from testscenarios import scenarios as scnrs
 import testtools
 
+from heatclient import exc
 from heatclient.v1 import stacks
 
 load_tests = testscenarios.load_tests_apply_scenarios
@@ -165,6 +166,79 @@ class StackOperationsTest(testtools.TestCase):
         manager.files.assert_called_once_with('files_stack/files1')
 
 
+class StackLazyOutputsTest(testtools.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = mock.MagicMock()
+        self.manager = stacks.StackManager(self.client)
+        resp = mock.MagicMock()
+        resp.headers = {'content-type': 'application/json'}
+        resp.json.return_value = {'stack': {
+            'id': 'abcd1234',
+            'stack_name': 'the_stack',
+            'stack_status': 'CREATE_COMPLETE'}}
+        self.client.get.return_value = resp
+        self.manager.output_list = mock.MagicMock(return_value={
+            'outputs': [{'output_key': 'a'}, {'output_key': 'b'}]})
+        self.manager.output_show = mock.MagicMock(
+            side_effect=lambda stack_id, key: {
+                'output': {'output_key': key, 'output_value': key * 2}})
+
+    def test_get_lazy_outputs(self):
+        stack = self.manager.get('the_stack', lazy_outputs=True)
+        self.client.get.assert_called_once_with(
+            '/stacks/the_stack', params={'resolve_outputs': False})
+        self.assertEqual('COMPLETE', stack.status)
+        self.manager.output_list.assert_not_called()
+
+        self.assertEqual([{'output_key': 'a', 'output_value': 'aa'},
+                          {'output_key': 'b', 'output_value': 'bb'}],
+                         stack.outputs)
+        self.manager.output_list.assert_called_once_with(
+            'the_stack/abcd1234')
+        self.assertEqual(2, self.manager.output_show.call_count)
+        self.assertEqual(stack.outputs, stack.to_dict()['outputs'])
+
+        # outputs are only resolved once
+        stack.outputs
+        self.assertEqual(1, self.manager.output_list.call_count)
+
+    def test_get_lazy_outputs_no_resolve(self):
+        stack = self.manager.get('the_stack', resolve_outputs=False,
+                                 lazy_outputs=True)
+        self.assertRaises(AttributeError, getattr, stack, 'outputs')
+        self.manager.output_list.assert_not_called()
+
+    def test_get_lazy_outputs_strict(self):
+        self.manager.strict_loading = True
+        stack = self.manager.get('the_stack', lazy_outputs=True)
+        self.assertRaises(exc.LazyLoadError, getattr, stack, 'outputs')
+        self.assertEqual(2, len(stack.resolve_outputs()))
+
+    def test_get_lazy_outputs_error(self):
+        self.manager.output_show.side_effect = exc.HTTPNotFound()
+        stack = self.manager.get('the_stack', lazy_outputs=True)
+        self.assertRaises(exc.HTTPNotFound, getattr, stack, 'outputs')
+        # a later access retries the resolution
+        self.manager.output_show.side_effect = None
+        self.manager.output_show.return_value = {'output': {}}
+        self.assertEqual([{}, {}], stack.outputs)
+
+    def test_resolve_outputs_ignore_errors(self):
+        def output_show(stack_id, key):
+            if key == 'b':
+                raise exc.HTTPNotFound()
+            return {'output': {'output_key': key}}
+
+        self.manager.output_show.side_effect = output_show
+        stack = self.manager.get('the_stack', lazy_outputs=True)
+        outputs = stack.resolve_outputs(ignore_errors=True)
+        self.assertEqual({'output_key': 'a'}, outputs[0])
+        self.assertEqual('b', outputs[1]['output_key'])
+        self.assertIn('output_error', outputs[1])
+
+
 class StackManagerNoPaginationTest(testtools.TestCase):
 
     scenarios = [
@@ -11,11 +11,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import io
 import json
+import os
 import tempfile
 from unittest import mock
 
-import io
+import fixtures
 from oslo_serialization import base64
 import testtools
 from testtools import matchers
@@ -769,6 +771,83 @@ ABOkDAABQSwUGAAAAAAEAAQBOAAAARwAAAAAA\n'''
         self.check_non_utf8_content(filename=filename, content=content)
 
 
+class TestExpandTemplatePaths(testtools.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.path = self.useFixture(fixtures.TempDir()).path
+        for name in ('b.yaml', 'a.template', 'env.txt', 'c.json'):
+            with open(os.path.join(self.path, name), 'w') as f:
+                f.write('{}')
+        os.mkdir(os.path.join(self.path, 'nested.yaml'))
+
+    def test_expand_directory(self):
+        self.assertEqual(
+            [os.path.join(self.path, n)
+             for n in ('a.template', 'b.yaml', 'c.json')],
+            template_utils.expand_template_paths([self.path]))
+
+    def test_expand_glob(self):
+        a = os.path.join(self.path, 'a.template')
+        b = os.path.join(self.path, 'b.yaml')
+        self.assertEqual(
+            [b, a],
+            template_utils.expand_template_paths(
+                [os.path.join(self.path, 'b*'), a,
+                 os.path.join(self.path, '[ab].*')]))
+
+    def test_expand_no_match(self):
+        self.assertRaises(exc.CommandError,
+                          template_utils.expand_template_paths,
+                          [os.path.join(self.path, '*.yml')])
+
+    def test_expand_passthrough(self):
+        self.assertEqual(
+            ['http://no.where/a.yaml', 'missing.yaml'],
+            template_utils.expand_template_paths(
+                ['http://no.where/a.yaml', 'missing.yaml']))
+
+
+class TestTemplateFileCache(testtools.TestCase):
+
+    @mock.patch('urllib.request.urlopen')
+    def test_process_template_path_file_cache(self, mock_url):
+        contents = {
+            'http://no.where/a.yaml': b"""heat_template_version: 2013-05-23
+resources:
+  one:
+    type: server.yaml
+  two:
+    type: server.yaml
+""",
+            'http://no.where/b.yaml': b"""heat_template_version: 2013-05-23
+resources:
+  one:
+    type: server.yaml
+""",
+            'http://no.where/server.yaml': b"""
+heat_template_version: 2013-05-23
+resources:
+  server:
+    type: OS::Nova::Server
+    properties:
+      user_data: {get_file: boot.sh}
+""",
+            'http://no.where/boot.sh': b'#!/bin/sh',
+        }
+        mock_url.side_effect = lambda url: io.BytesIO(contents[url])
+        file_cache = {}
+        for url in ('http://no.where/a.yaml', 'http://no.where/b.yaml'):
+            files, tmpl = template_utils.process_template_path(
+                url, file_cache=file_cache)
+            self.assertEqual({'http://no.where/server.yaml',
+                              'http://no.where/boot.sh'}, set(files))
+        # every file is only fetched once
+        self.assertEqual(
+            sorted(contents),
+            sorted(c[0][0] for c in mock_url.call_args_list))
+
+
 @mock.patch('urllib.request.urlopen')
 class TestTemplateGetFileFunctions(testtools.TestCase):
 
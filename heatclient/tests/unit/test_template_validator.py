@@ -0,0 +1,216 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from unittest import mock
+
+from oslo_serialization import jsonutils
+import testtools
+
+from heatclient.common import template_format
+from heatclient.common import template_validator
+
+
+HOT = '''
+heat_template_version: 2016-10-14
+description: test
+parameters:
+  flavor:
+    type: string
+resources:
+  server:
+    type: OS::Nova::Server
+    properties:
+      flavor: {get_param: flavor}
+      name: {get_param: OS::stack_name}
+      user_data: {get_file: 'file:///tmp/boot.sh'}
+  volume:
+    type: OS::Cinder::Volume
+    depends_on: [server]
+    properties:
+      name: {list_join: ['-', [{get_resource: server}, 'vol']]}
+outputs:
+  ip:
+    value: {get_attr: [server, first_address]}
+'''
+
+CFN = '''
+{"AWSTemplateFormatVersion": "2010-09-09",
+ "Parameters": {"Flavor": {"Type": "String"}},
+ "Resources": {
+   "Server": {"Type": "AWS::EC2::Instance",
+              "Properties": {"InstanceType": {"Ref": "Flavor"},
+                             "KeyName": {"Ref": "AWS::StackName"}}},
+   "Ip": {"Type": "AWS::EC2::EIP", "DependsOn": "Server",
+          "Properties": {"InstanceId": {"Ref": "Server"}}}},
+ "Outputs": {"Ip": {"Value": {"Fn::GetAtt": ["Server", "PublicIp"]}}}}
+'''
+
+FILES = {'file:///tmp/boot.sh': '#!/bin/sh'}
+
+
+class TemplateValidatorTest(testtools.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.validator = template_validator.TemplateValidator()
+
+    def _validate(self, tmpl, **kwargs):
+        return self.validator.validate(template_format.parse(tmpl),
+                                       **kwargs)
+
+    def test_valid(self):
+        self.assertEqual([], self._validate(HOT, files=FILES))
+        self.assertEqual([], self._validate(CFN, files={}))
+
+    def test_invalid_section(self):
+        self.assertEqual(
+            ['resource: The template section is invalid'],
+            self._validate(HOT + 'resource: {}\n', files=FILES))
+
+    def test_invalid_resource_keys(self):
+        tmpl = HOT.replace('    depends_on', '    properies: {}\n'
+                                             '    depends_on')
+        self.assertEqual(
+            ['resources.volume: "properies" is not a valid keyword inside '
+             'a resource definition'],
+            self._validate(tmpl, files=FILES))
+
+    def test_resource_description(self):
+        tmpl = HOT.replace('    depends_on', '    description: A volume\n'
+                                             '    depends_on')
+        self.assertEqual([], self._validate(tmpl, files=FILES))
+        tmpl = CFN.replace('"DependsOn"', '"Description": "An IP", '
+                                          '"DependsOn"')
+        self.assertEqual([], self._validate(tmpl, files={}))
+
+    def test_undefined_references(self):
+        tmpl = (HOT.replace('{get_param: flavor}', '{get_param: flavour}')
+                .replace('{get_resource: server}', '{get_resource: sever}')
+                .replace('[server, first', '[srv, first')
+                .replace('depends_on: [server]', 'depends_on: servers'))
+        self.assertEqual([
+            'resources.volume: depends on undefined resource "servers"',
+            'resources.server.properties.flavor: The Parameter (flavour) '
+            'was not defined in template.',
+            'resources.volume.properties.name.list_join[1][0]: The '
+            'specified reference "sever" is not in the template.',
+            'outputs.ip.value: The specified reference "srv" is not in the '
+            'template.',
+        ], self._validate(tmpl, files=FILES))
+
+    def test_cfn_undefined_references(self):
+        tmpl = (CFN.replace('{"Ref": "Flavor"}', '{"Ref": "Flavour"}')
+                .replace('["Server", "PublicIp"]', '["Sever", "PublicIp"]'))
+        self.assertEqual([
+            'Resources.Server.Properties.InstanceType: The Parameter '
+            '(Flavour) was not defined in template.',
+            'Outputs.Ip.Value: The specified reference "Sever" is not in '
+            'the template.',
+        ], self._validate(tmpl, files={}))
+
+    def test_unresolved_get_file(self):
+        self.assertEqual(
+            ['resources.server.properties.user_data: Could not fetch file '
+             'file:///tmp/boot.sh'],
+            self._validate(HOT, files={}))
+        # files which weren't fetched can't be checked
+        self.assertEqual([], self._validate(HOT))
+
+    def test_output_without_value(self):
+        self.assertEqual(
+            ['outputs.ip: Each output definition must contain a value key'],
+            self._validate(HOT.replace('    value:', '    vaule:'),
+                           files=FILES))
+
+    def test_nested_template(self):
+        nested = {'heat_template_version': '2016-10-14',
+                  'resources': {'port': {
+                      'type': 'OS::Neutron::Port',
+                      'properties': {'network': {'get_param': 'net'}}}}}
+        files = dict(FILES)
+        files['file:///tmp/port.yaml'] = jsonutils.dumps(nested)
+        tmpl = HOT + ('  port:\n'
+                      '    type: file:///tmp/port.yaml\n'
+                      '  other:\n'
+                      '    type: file:///tmp/missing.yaml\n')
+        tmpl = tmpl.replace('outputs:\n  ip:\n    value: '
+                            '{get_attr: [server, first_address]}\n', '')
+        tmpl = tmpl.replace('resources:', 'outputs: {}\nresources:')
+        self.assertEqual([
+            'resources.port: resources.port.properties.network: The '
+            'Parameter (net) was not defined in template.',
+            'resources.other: Could not fetch template '
+            'file:///tmp/missing.yaml',
+        ], self._validate(tmpl, files=files))
+
+    def test_resource_types(self):
+        self.validator = template_validator.TemplateValidator(
+            resource_types=['OS::Nova::Server'])
+        self.assertEqual(
+            ['resources.volume: The Resource Type (OS::Cinder::Volume) '
+             'could not be found.'],
+            self._validate(HOT, files=FILES))
+        env = {'resource_registry': {'OS::Cinder::*': 'OS::Heat::None'}}
+        self.assertEqual(
+            [], self._validate(HOT, files=FILES, environment=env))
+
+    def test_template_functions(self):
+        self.validator = template_validator.TemplateValidator(
+            template_functions={
+                'heat_template_version.2013-05-23': {
+                    'get_param', 'get_resource', 'get_attr', 'get_file',
+                    'list_join', 'Fn::Select'},
+                'heat_template_version.2016-10-14': {
+                    'get_param', 'get_resource', 'get_attr', 'get_file',
+                    'list_join', 'yaql'}})
+        self.assertEqual([], self._validate(HOT, files=FILES))
+        self.assertEqual(
+            ['resources.volume.properties.name: The function "yaql" is not '
+             'supported by this template version'],
+            self._validate(HOT.replace('2016-10-14', '2013-05-23').replace(
+                '{list_join:', '{yaql:'), files=FILES))
+        self.assertEqual(
+            ['heat_template_version: "2014-10-16" is not a valid template '
+             'version'],
+            self._validate(HOT.replace('2016-10-14', '2014-10-16'),
+                           files=FILES))
+        # version aliases are left to the server
+        self.assertEqual([], self._validate(
+            HOT.replace('2016-10-14', 'newton'), files=FILES))
+
+    def test_validate_many(self):
+        jobs = [{'template': template_format.parse(HOT), 'files': FILES},
+                {'template': template_format.parse(HOT), 'files': {}},
+                {'template': None}]
+        results = list(self.validator.validate_many(jobs, max_workers=2))
+        self.assertEqual(3, len(results))
+        errors = {id(job): errors for job, errors in results}
+        self.assertEqual([], errors[id(jobs[0])])
+        self.assertEqual(1, len(errors[id(jobs[1])]))
+        self.assertEqual(['The template is not a JSON object or YAML '
+                          'mapping.'], errors[id(jobs[2])])
+
+    def test_from_client(self):
+        hc = mock.Mock()
+        hc.resource_types.list.return_value = [
+            mock.Mock(resource_type='OS::Nova::Server')]
+        hc.template_versions.list.side_effect = Exception('forbidden')
+        validator = template_validator.TemplateValidator.from_client(hc)
+        self.assertEqual(frozenset(['OS::Nova::Server']),
+                         validator.resource_types)
+        self.assertIsNone(validator.template_functions)
+
+        hc.resource_types.catalog = None
+        hc.template_versions.catalog = None
+        validator = template_validator.TemplateValidator.from_client(hc)
+        self.assertIsNone(validator.resource_types)
+        hc.resource_types.list.assert_called_once_with()
@@ -11,6 +11,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from unittest import mock
+
 import testtools
 
 from heatclient.v1 import template_versions
@@ -55,3 +57,41 @@ class TemplateVersionManagerTest(testtools.TestCase):
         manager = template_versions.TemplateVersionManager(FakeClient())
         functions = manager.get('heat_template_version.2015-04-30')
         self.assertEqual('get_attr', getattr(functions[0], 'function'))
+
+    def test_cached_catalog(self):
+        responses = {
+            '/template_versions': {'template_versions': [
+                {'version': 'heat_template_version.2013-05-23',
+                 'type': 'hot'},
+                {'version': 'heat_template_version.2016-10-14',
+                 'type': 'hot'}]},
+            '/template_versions/heat_template_version.2013-05-23/functions'
+            '?with_condition_func=False': {'template_functions': [
+                {'functions': 'get_attr'}]},
+            '/template_versions/heat_template_version.2016-10-14/functions'
+            '?with_condition_func=False': {'template_functions': [
+                {'functions': 'get_attr'}, {'functions': 'yaql'}]},
+        }
+        client = mock.Mock()
+        client.get_endpoint.return_value = 'http://heat/v1/tenant'
+
+        def get(url, **kwargs):
+            resp = mock.Mock(headers={'content-type': 'application/json'})
+            resp.json.return_value = responses[url]
+            return resp
+
+        client.get.side_effect = get
+        manager = template_versions.TemplateVersionManager(client)
+        manager.enable_cache()
+
+        for i in range(2):
+            self.assertEqual(
+                frozenset(['get_attr', 'yaql']),
+                manager.function_names('heat_template_version.2016-10-14'))
+            self.assertEqual(['heat_template_version.2016-10-14'],
+                             manager.versions_with_function('yaql'))
+            self.assertEqual(['heat_template_version.2013-05-23',
+                              'heat_template_version.2016-10-14'],
+                             manager.versions_with_function('get_attr'))
+        # every catalog URL is only fetched once
+        self.assertEqual(len(responses), client.get.call_count)
@@ -0,0 +1,90 @@
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import stat
+import time
+from unittest import mock
+
+import fixtures
+import testtools
+
+from heatclient.common import token_cache
+
+
+class TokenCacheTest(testtools.TestCase):
+
+    def setUp(self):
+        super().setUp()
+        if not token_cache.is_supported():
+            self.skipTest('cryptography is not installed')
+        self.cache_dir = self.useFixture(fixtures.TempDir()).path
+        self.cache = token_cache.TokenCache(self.cache_dir)
+        self.key = self.cache.cache_key(auth_url='http://keystone',
+                                        username='user', project_name='p')
+
+    def test_cache_key(self):
+        self.assertEqual(self.key, self.cache.cache_key(
+            project_name='p', username='user', auth_url='http://keystone'))
+        self.assertNotEqual(self.key, self.cache.cache_key(
+            auth_url='http://keystone', username='user', project_name='q'))
+
+    def test_store_get(self):
+        self.assertIsNone(self.cache.get(self.key, 'password'))
+        self.cache.store(self.key, 'password', 'token', 'http://heat',
+                         time.time() + 3600)
+        self.assertEqual(('token', 'http://heat'),
+                         self.cache.get(self.key, 'password'))
+        # entries are read from disk
+        cache = token_cache.TokenCache(self.cache_dir)
+        self.assertEqual(('token', 'http://heat'),
+                         cache.get(self.key, 'password'))
+
+    def test_encrypted(self):
+        self.cache.store(self.key, 'password', 'secret-token', 'http://heat',
+                         time.time() + 3600)
+        tokens_dir = os.path.join(self.cache_dir, 'tokens')
+        self.assertEqual(0o700, stat.S_IMODE(os.stat(tokens_dir).st_mode))
+        for name in ('key', self.key):
+            path = os.path.join(tokens_dir, name)
+            self.assertEqual(0o600, stat.S_IMODE(os.stat(path).st_mode))
+            with open(path, 'rb') as f:
+                self.assertNotIn(b'secret-token', f.read())
+
+    def test_wrong_secret(self):
+        self.cache.store(self.key, 'password', 'token', 'http://heat',
+                         time.time() + 3600)
+        self.assertIsNone(self.cache.get(self.key, 'new password'))
+        # the unreadable entry is dropped
+        self.assertIsNone(self.cache.get(self.key, 'password'))
+
+    def test_expired(self):
+        now = time.time()
+        self.cache.store(self.key, 'password', 'token', 'http://heat',
+                         now + token_cache.EXPIRY_MARGIN + 10)
+        self.assertIsNotNone(self.cache.get(self.key, 'password'))
+        with mock.patch.object(time, 'time', return_value=now + 11):
+            self.assertIsNone(self.cache.get(self.key, 'password'))
+        self.assertIsNone(self.cache.get(self.key, 'password'))
+
+    def test_invalidate(self):
+        self.cache.store(self.key, 'password', 'token', 'http://heat',
+                         time.time() + 3600)
+        self.cache.invalidate(self.key)
+        self.assertIsNone(self.cache.get(self.key, 'password'))
+        self.cache.invalidate(self.key)
+
+    def test_unsupported(self):
+        with mock.patch.object(token_cache, 'fernet', None):
+            self.assertFalse(token_cache.is_supported())
+            self.assertRaises(RuntimeError, token_cache.TokenCache,
+                              self.cache_dir)
@@ -13,10 +13,13 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import argparse
+import io
 import os
 from pathlib import Path
 from unittest import mock
 
+import fixtures
 import testtools
 
 from heatclient.common import utils
@@ -338,6 +341,88 @@ class ShellTest(testtools.TestCase):
         )
         self.assertEqual(expected, utils.event_log_formatter(events_list))
 
+    def test_write_event_log(self):
+        out = io.StringIO()
+        flushed = []
+        out.flush = lambda: flushed.append(out.getvalue().count('\n'))
+
+        def events():
+            for i in range(2):
+                # earlier events are written and flushed before later ones
+                # are fetched
+                self.assertEqual(i, out.getvalue().count('\n'))
+                self.assertEqual(list(range(1, i + 1)), flushed)
+                yield hc_res.Resource(manager=None, info={
+                    'event_time': '2015-09-28T12:12:1%d' % i,
+                    'id': str(i), 'resource_name': 'res_name',
+                    'resource_status': 'CREATE_COMPLETE',
+                    'resource_status_reason': 'done'})
+
+        self.assertEqual(2, utils.write_event_log(events(), out))
+        self.assertEqual(
+            '2015-09-28 12:12:10 0 [res_name]: CREATE_COMPLETE  done\n'
+            '2015-09-28 12:12:11 1 [res_name]: CREATE_COMPLETE  done\n',
+            out.getvalue())
+        self.assertEqual(0, utils.write_event_log([], mock.Mock(spec=[])))
+
+    def test_event_log_context_stack_path(self):
+        context = utils.EventLogContext()
+        context.id_to_res_info.update({
+            'nested-id': ('nested-id', 'nested'),
+            'nested-rg1': ('nested-id', 'rg1'),
+            'rg1-id': ('rg1-id', 'nested-rg1')})
+        self.assertEqual(('nested', 'rg1'), context.stack_path('rg1-id'))
+        resource_path = ['1']
+        context.prepend_paths(resource_path, 'rg1-id')
+        self.assertEqual(['nested', 'rg1', '1'], resource_path)
+
+        # resolved paths are remembered
+        del context.id_to_res_info['nested-id']
+        self.assertEqual(('nested', 'rg1'), context.stack_path('rg1-id'))
+
+        # and resolved again once a stack gets a new parent
+        context._add_res_info('nested-id', ('nested-id', 'parent'))
+        self.assertEqual(('parent', 'rg1'), context.stack_path('rg1-id'))
+
+    def test_event_log_context_replaced_nested_stack(self):
+        def name(stack_id, res_name, phys_id):
+            return context.build_resource_name(hc_res.Resource(
+                manager=None, info={
+                    'stack_id': stack_id, 'resource_name': res_name,
+                    'physical_resource_id': phys_id,
+                    'resource_status': 'CREATE_IN_PROGRESS'}))
+
+        context = utils.EventLogContext()
+        name('root-id', 'root', 'root-id')
+        name('root-id', 'group', 'root-group-a')
+        name('n1-id', 'root-group-a', 'n1-id')
+        self.assertEqual('root.group.0', name('n1-id', '0', 'server-1'))
+
+        # the group is replaced by a new nested stack
+        name('root-id', 'group', 'root-group-b')
+        name('n2-id', 'root-group-b', 'n2-id')
+        self.assertEqual('root.group.0', name('n2-id', '0', 'server-2'))
+        self.assertEqual('root.group.0', name('n1-id', '0', 'server-1'))
+
+        # a path resolved before the parent of its stack was known
+        self.assertEqual('port', name('n3-id', 'port', 'port-1'))
+        name('n2-id', '1', 'root-group-b-1-c')
+        name('n3-id', 'root-group-b-1-c', 'n3-id')
+        self.assertEqual('root.group.1.port', name('n3-id', 'port', 'port-1'))
+
+    def test_event_log_context_bounded(self):
+        context = utils.EventLogContext(max_size=2)
+        for i in range(5):
+            context.build_resource_name(hc_res.Resource(manager=None, info={
+                'stack_id': 'stack-%d' % i, 'resource_name': 'stack',
+                'physical_resource_id': 'stack-%d' % i,
+                'resource_status': 'CREATE_COMPLETE'}))
+            self.assertEqual(('stack',),
+                             context.stack_path('stack-%d' % i))
+        self.assertEqual(['stack-3', 'stack-4'],
+                         list(context.id_to_res_info))
+        self.assertLessEqual(len(context._paths), 2)
+
 
 class ShellTestParameterFiles(testtools.TestCase):
 
@@ -452,3 +537,143 @@ class TestURLFunctions(testtools.TestCase):
             'http://foo/bar',
             utils.base_url_for_url(
                 'http://foo/bar/baz.template'))
+
+
+class TestPositiveInt(testtools.TestCase):
+
+    def test_positive_int(self):
+        self.assertEqual(3, utils.positive_int('3'))
+        for value in ('0', '-2', 'three'):
+            self.assertRaises(argparse.ArgumentTypeError,
+                              utils.positive_int, value)
+
+
+class TestRunConcurrently(testtools.TestCase):
+
+    def test_run_concurrently(self):
+        results = list(utils.run_concurrently(lambda x: x * 2, range(10),
+                                              max_workers=3))
+        self.assertEqual([(i, i * 2, None) for i in range(10)],
+                         sorted(results))
+
+    def test_run_concurrently_error(self):
+        def func(x):
+            if x == 2:
+                raise exc.HTTPNotFound()
+            return x
+
+        results = {item: (result, error) for item, result, error in
+                   utils.run_concurrently(func, [1, 2, 3])}
+        self.assertEqual((1, None), results[1])
+        self.assertIsNone(results[2][0])
+        self.assertIsInstance(results[2][1], exc.HTTPNotFound)
+
+    def test_run_concurrently_empty(self):
+        self.assertEqual([], list(utils.run_concurrently(str, [])))
+
+    @mock.patch('time.sleep')
+    def test_run_concurrently_rate_limit(self, mock_sleep):
+        results = list(utils.run_concurrently(str, range(5), max_workers=1,
+                                              rate_limit=2))
+        self.assertEqual(5, len(results))
+        delays = [c[0][0] for c in mock_sleep.call_args_list]
+        # the first call starts straight away, then one every half second
+        self.assertEqual(4, len(delays))
+        for i, delay in enumerate(delays):
+            self.assertAlmostEqual(0.5 * (i + 1), delay, delta=0.1)
+
+
+class TestStreamTable(testtools.TestCase):
+
+    def _print(self, func, *args, **kwargs):
+        with mock.patch('sys.stdout', new_callable=io.StringIO) as out:
+            func(*args, **kwargs)
+        return out.getvalue()
+
+    def _objs(self):
+        return [mock.Mock(name_='x', status='a\nlonger'),
+                mock.Mock(name_='', status='b'),
+                mock.Mock(name_='wide name', status='a')]
+
+    def test_print_list_matches_prettytable(self):
+        fields = ['name_', 'status']
+        for sortby_index in (None, 0, 1):
+            for sample_size in (None, 3):
+                self.assertEqual(
+                    self._print(utils.print_list, self._objs(), fields,
+                                sortby_index=sortby_index),
+                    self._print(utils.print_list, self._objs(), fields,
+                                sortby_index=sortby_index, stream=True,
+                                sample_size=sample_size))
+        self.assertEqual(
+            self._print(utils.print_list, [], fields),
+            self._print(utils.print_list, [], fields, stream=True))
+
+    def test_print_list_stream_default(self):
+        self.useFixture(fixtures.MockPatchObject(
+            utils, 'STREAM_TABLES', True))
+        with mock.patch('prettytable.PrettyTable') as pt:
+            self._print(utils.print_list, self._objs(), ['status'])
+        pt.assert_not_called()
+
+    def test_print_list_generator(self):
+        fields = ['name_', 'status']
+        formatter = mock.Mock(side_effect=lambda o: o.status)
+        for sortby_index in (None, 1):
+            formatter.reset_mock()
+            self.assertEqual(
+                self._print(utils.print_list, self._objs(), fields,
+                            formatters={'status': formatter},
+                            sortby_index=sortby_index),
+                self._print(utils.print_list, iter(self._objs()), fields,
+                            formatters={'status': formatter},
+                            sortby_index=sortby_index, stream=True,
+                            sample_size=None))
+            # each row is only built once
+            self.assertEqual(6, formatter.call_count)
+
+    def test_print_update_list_generator(self):
+        changes = [{'resource_name': 'server', 'state': 'Replaced'},
+                   {'resource_name': 'port', 'state': None}]
+        fields = ['state', 'resource_name']
+        self.assertEqual(
+            self._print(utils.print_update_list, changes, fields),
+            self._print(utils.print_update_list, iter(changes), fields,
+                        stream=True, sample_size=None))
+
+    def test_print_update_list_matches_prettytable(self):
+        changes = [{'resource_name': 'server', 'state': 'Replaced'},
+                   {'resource_name': 'port', 'state': None}]
+        fields = ['state', 'resource_name']
+        for lst in (changes, []):
+            self.assertEqual(
+                self._print(utils.print_update_list, lst, fields),
+                self._print(utils.print_update_list, lst, fields,
+                            stream=True))
+
+    def test_stream_table_sample(self):
+        rows = iter([['a', 1], ['bb', 2], ['a longer cell', 3]])
+        out = io.StringIO()
+        utils.stream_table(['name', 'n'], rows, sample_size=2,
+                           out=out)
+        # columns are sized from the sample, later cells overflow
+        self.assertEqual('+------+---+\n'
+                         '| name | n |\n'
+                         '+------+---+\n'
+                         '| a    | 1 |\n'
+                         '| bb   | 2 |\n'
+                         '| a longer cell | 3 |\n'
+                         '+------+---+\n', out.getvalue())
+
+    def test_stream_table_writes_incrementally(self):
+        out = io.StringIO()
+
+        def rows():
+            for i in range(3):
+                # the rows before the current one have been written
+                self.assertEqual(i + 3 if i > 0 else 0,
+                                 out.getvalue().count('\n'))
+                yield [i]
+
+        utils.stream_table(['n'], rows(), sample_size=1, out=out)
+        self.assertEqual(7, out.getvalue().count('\n'))
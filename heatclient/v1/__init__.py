@@ -15,4 +15,11 @@
 
 __all__ = ['Client']
 
-from heatclient.v1.client import Client  # noqa
+
+def __getattr__(name):
+    # the client pulls in every manager, so it is imported on first use
+    if name == 'Client':
+        from heatclient.v1.client import Client
+        return Client
+    raise AttributeError('module {!r} has no attribute {!r}'.format(
+        __name__, name))
@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from heatclient.common import catalog_cache
 from heatclient.common import http
 from heatclient.v1 import actions
 from heatclient.v1 import build_info
@@ -34,10 +35,19 @@ class Client:
     :param string token: Token for authentication.
     :param integer timeout: Allows customization of the timeout for client
                             http requests. (optional)
+    :param catalog_cache: Cache near-static catalogs such as resource types
+                          locally. True caches them in the default cache
+                          directory, and a string in that directory.
+                          (optional)
+    :param integer catalog_cache_ttl: Seconds after which cached catalog
+                                      entries are refreshed. (optional)
     """
 
     def __init__(self, *args, **kwargs):
         """Initialize a new client for the Heat v1 API."""
+        cache = kwargs.pop('catalog_cache', None)
+        cache_ttl = kwargs.pop('catalog_cache_ttl',
+                               catalog_cache.DEFAULT_TTL)
         self.http_client = http._construct_http_client(*args, **kwargs)
         self.stacks = stacks.StackManager(self.http_client)
         self.resources = resources.ResourceManager(self.http_client)
@@ -54,3 +64,8 @@ class Client:
         self.services = services.ServiceManager(self.http_client)
         self.template_versions = template_versions.TemplateVersionManager(
             self.http_client)
+        if cache:
+            cache_dir = (catalog_cache.default_cache_dir() if cache is True
+                         else cache)
+            self.resource_types.enable_cache(cache_dir, ttl=cache_ttl)
+            self.template_versions.enable_cache(cache_dir, ttl=cache_ttl)
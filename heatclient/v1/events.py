@@ -41,11 +41,14 @@ class Event(base.Resource):
 class EventManager(stacks.StackChildManager):
     resource_class = Event
 
-    def list(self, stack_id, resource_name=None, **kwargs):
+    def list(self, stack_id, resource_name=None, compact=False, **kwargs):
         """Get a list of events.
 
         :param stack_id: ID or name of stack the events belong to
         :param resource_name: Optional name of resources to filter events by
+        :param compact: return read-only :class:`heatclient.common.base.
+                        ResourceRecord` objects which use less memory for
+                        large listings
         :rtype: list of :class:`Event`
         """
         params = {}
@@ -69,7 +72,7 @@ class EventManager(stacks.StackChildManager):
             params = collections.OrderedDict(sorted(params.items()))
             url += '?%s' % parse.urlencode(params, True)
 
-        return self._list(url, 'events')
+        return self._list(url, 'events', compact=compact)
 
     def get(self, stack_id, resource_name, event_id):
         """Get the details for a specific event.
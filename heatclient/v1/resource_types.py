@@ -39,6 +39,18 @@ class ResourceType(base.Resource):
 class ResourceTypeManager(base.BaseManager):
     resource_class = ResourceType
     KEY = 'resource_types'
+    catalog_name = KEY
+
+    def _cached_get(self, url, **kwargs):
+        def load():
+            return utils.get_response_body(self.client.get(url, **kwargs))
+
+        if self.catalog is None:
+            return load()
+        key = url
+        if 'params' in kwargs:
+            key += '?%s' % parse.urlencode(kwargs['params'], True)
+        return self.catalog.get(key, load)
 
     def list(self, **kwargs):
         """Get a list of resource types.
@@ -57,7 +69,7 @@ class ResourceTypeManager(base.BaseManager):
         if params:
             url += '?%s' % parse.urlencode(params, True)
 
-        return self._list(url, self.KEY)
+        return self._cached_list(url, self.KEY)
 
     def get(self, resource_type, with_description=False):
         """Get the details for a specific resource_type.
@@ -68,10 +80,8 @@ class ResourceTypeManager(base.BaseManager):
         url_str = '/{}/{}'.format(
                   self.KEY,
                   parse.quote(encodeutils.safe_encode(resource_type)))
-        resp = self.client.get(url_str,
-                               params={'with_description': with_description})
-        body = utils.get_response_body(resp)
-        return body
+        return self._cached_get(
+            url_str, params={'with_description': with_description})
 
     def generate_template(self, resource_type, template_type='cfn'):
         url_str = '/{}/{}/template'.format(
@@ -80,6 +90,4 @@ class ResourceTypeManager(base.BaseManager):
         if template_type:
             url_str += '?%s' % parse.urlencode(
                 {'template_type': template_type}, True)
-        resp = self.client.get(url_str)
-        body = utils.get_response_body(resp)
-        return body
+        return self._cached_get(url_str)
@@ -45,12 +45,21 @@ class Resource(base.Resource):
                 return link['href'].split('/')[-2]
 
 
+class ResourceRecord(base.ResourceRecord):
+    __slots__ = ()
+
+    stack_name = Resource.stack_name
+
+
 class ResourceManager(stacks.StackChildManager):
     resource_class = Resource
+    record_class = ResourceRecord
 
-    def list(self, stack_id, **kwargs):
+    def list(self, stack_id, compact=False, **kwargs):
         """Get a list of resources.
 
+        :param compact: return read-only :class:`ResourceRecord` objects
+                        which use less memory for large listings
         :rtype: list of :class:`Resource`
         """
         params = {}
@@ -67,6 +76,8 @@ class ResourceManager(stacks.StackChildManager):
         if params:
             url += '?%s' % parse.urlencode(params, True)
 
+        if compact:
+            return self._list(url, "resources", compact=True)
         return self._list(url, "resources")
 
     def get(self, stack_id, resource_name, with_attr=None):
@@ -102,6 +113,28 @@ class ResourceManager(stacks.StackChildManager):
         body = utils.get_response_body(resp)
         return body.get('metadata')
 
+    def watch_metadata(self, stack_id, resource_name,
+                       interval=utils.WATCH_INTERVAL,
+                       max_interval=utils.WATCH_MAX_INTERVAL, timeout=None):
+        """Watch the metadata of a specific resource.
+
+        The current metadata is yielded first, then the metadata is polled
+        and yielded again each time it changes.
+
+        :param stack_id: ID or name of stack containing the resource
+        :param resource_name: ID of resource to watch the metadata of
+        :param interval: initial seconds between polls
+        :param max_interval: maximum seconds between polls while the
+            metadata is unchanged
+        :param timeout: stop watching after this many seconds
+        """
+        stack_id = self._resolve_stack_id(stack_id)
+        url_str = '/stacks/{}/resources/{}/metadata'.format(
+                  parse.quote(stack_id),
+                  parse.quote(encodeutils.safe_encode(resource_name)))
+        return self._watch(url_str, 'metadata', interval=interval,
+                           max_interval=max_interval, timeout=timeout)
+
     def signal(self, stack_id, resource_name, data=None):
         """Signal a specific resource.
 
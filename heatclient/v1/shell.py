@@ -18,19 +18,22 @@ import sys
 
 from oslo_serialization import jsonutils
 from oslo_utils import strutils
-from urllib import request
-import yaml
 
 from heatclient._i18n import _
-from heatclient.common import deployment_utils
-from heatclient.common import event_utils
-from heatclient.common import hook_utils
-from heatclient.common import http
-from heatclient.common import template_format
-from heatclient.common import template_utils
+from heatclient.common import lazy
 from heatclient.common import utils
 import heatclient.exc as exc
 
+# Only used by some of the commands, so imported on first use
+request = lazy.import_module('urllib.request')
+yaml = lazy.import_module('yaml')
+deployment_utils = lazy.import_module('heatclient.common.deployment_utils')
+event_utils = lazy.import_module('heatclient.common.event_utils')
+hook_utils = lazy.import_module('heatclient.common.hook_utils')
+http = lazy.import_module('heatclient.common.http')
+template_format = lazy.import_module('heatclient.common.template_format')
+template_utils = lazy.import_module('heatclient.common.template_utils')
+
 logger = logging.getLogger(__name__)
 
 
@@ -290,7 +293,7 @@ def do_stack_preview(hc, args):
         'resources': utils.json_formatter,
         'links': utils.link_formatter,
     }
-    utils.print_dict(stack.to_dict(), formatters=formatters)
+    utils.print_dict(stack.to_dict(read_only=True), formatters=formatters)
 
 
 @utils.arg('id', metavar='<NAME or ID>', nargs='+',
@@ -703,7 +706,7 @@ def do_output_list(hc, args):
         outputs = hc.stacks.output_list(args.id)
     except exc.HTTPNotFound:
         try:
-            outputs = hc.stacks.get(args.id).to_dict()
+            outputs = hc.stacks.get(args.id).to_dict(read_only=True)
         except exc.HTTPNotFound:
             raise exc.CommandError(_('Stack not found: %s') % args.id)
 
@@ -738,7 +741,7 @@ def do_output_show(hc, args):  # noqa: C901
         except exc.HTTPNotFound:
             try:
                 output = None
-                stack = hc.stacks.get(args.id).to_dict()
+                stack = hc.stacks.get(args.id).to_dict(read_only=True)
                 for o in stack.get('outputs', []):
                     if o['output_key'] == output_key:
                         output = {'output': o}
@@ -782,7 +785,7 @@ def do_output_show(hc, args):  # noqa: C901
             resolved = False
         except exc.HTTPNotFound:
             try:
-                outputs = hc.stacks.get(args.id).to_dict()
+                outputs = hc.stacks.get(args.id).to_dict(read_only=True)
                 resolved = True
             except exc.HTTPNotFound:
                 raise exc.CommandError(_('Stack not found: %s') % args.id)
@@ -1195,7 +1198,8 @@ def do_event_list(hc, args):
             display_fields.insert(0, 'logical_resource_id')
 
     if args.format == 'log':
-        print(utils.event_log_formatter(events))
+        if not utils.write_event_log(events, sys.stdout):
+            print()
     else:
         utils.print_list(events, display_fields, sortby_index=None)
 
@@ -1751,4 +1755,5 @@ def _do_stack_show(hc, fields):
             'links': utils.link_formatter,
             'tags': utils.json_formatter
         }
-        utils.print_dict(stack.to_dict(), formatters=formatters)
+        utils.print_dict(stack.to_dict(read_only=True),
+                         formatters=formatters)
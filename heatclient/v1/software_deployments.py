@@ -49,6 +49,24 @@ class SoftwareDeploymentManager(base.BaseManager):
         body = utils.get_response_body(resp)
         return body.get('metadata')
 
+    def watch_metadata(self, server_id, interval=utils.WATCH_INTERVAL,
+                       max_interval=utils.WATCH_MAX_INTERVAL, timeout=None):
+        """Watch the software deployment metadata for given server.
+
+        The current metadata is yielded first, then the metadata is polled
+        and yielded again each time it changes.
+
+        :param server_id: ID of the server to watch
+        :param interval: initial seconds between polls
+        :param max_interval: maximum seconds between polls while the
+            metadata is unchanged
+        :param timeout: stop watching after this many seconds
+        """
+        url = '/software_deployments/metadata/%s' % parse.quote(
+            server_id)
+        return self._watch(url, 'metadata', interval=interval,
+                           max_interval=max_interval, timeout=timeout)
+
     def get(self, deployment_id):
         """Get the details for a specific software deployment.
 
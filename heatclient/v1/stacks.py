@@ -76,6 +76,47 @@ class Stack(base.Resource):
         new = self.manager.get(self.identifier)
         if new:
             self._add_details(new._info)
+            self._lazy_outputs = False
+
+    def __getattr__(self, k):
+        if k == 'outputs' and self.__dict__.get('_lazy_outputs'):
+            if getattr(self.manager, 'strict_loading', False):
+                raise exc.LazyLoadError(
+                    _("Accessing outputs would lazily resolve the outputs "
+                      "of stack %s") % self.identifier)
+            self.resolve_outputs()
+            return self.__dict__['outputs']
+        return super().__getattr__(k)
+
+    def resolve_outputs(self, max_workers=utils.DEFAULT_CONCURRENCY,
+                        ignore_errors=False):
+        """Resolve the outputs of a stack fetched with lazy_outputs.
+
+        The output keys are listed first and each output is then shown
+        separately, with up to max_workers requests in parallel, so the
+        server never has to resolve every output in a single request.
+
+        :param ignore_errors: If True, an output which can not be shown is
+               returned with the error in its output_error instead of
+               raising it
+        """
+        self._lazy_outputs = False
+        keys = [o['output_key'] for o in
+                self.manager.output_list(self.identifier)['outputs']]
+        outputs = {}
+        for key, output, error in utils.run_concurrently(
+                lambda key: self.manager.output_show(self.identifier, key),
+                keys, max_workers):
+            if error:
+                if ignore_errors:
+                    outputs[key] = {'output_key': key,
+                                    'output_error': str(error)}
+                    continue
+                self._lazy_outputs = True
+                raise error
+            outputs[key] = output['output']
+        self._add_details({'outputs': [outputs[key] for key in keys]})
+        return self.outputs
 
     @property
     def action(self):
@@ -285,19 +326,26 @@ class StackManager(StackChildManager):
         body = utils.get_response_body(resp)
         return body
 
-    def get(self, stack_id, resolve_outputs=True):
+    def get(self, stack_id, resolve_outputs=True, lazy_outputs=False):
         """Get the metadata for a specific stack.
 
         :param stack_id: Stack ID or name to lookup
         :param resolve_outputs: If True, then outputs for this
                stack will be resolved
+        :param lazy_outputs: If True, the stack is fetched without resolving
+               outputs and the ``outputs`` attribute of the returned stack
+               is only resolved on first access, see
+               :meth:`Stack.resolve_outputs`
         """
         kwargs = {}
-        if not resolve_outputs:
+        if not resolve_outputs or lazy_outputs:
             kwargs['params'] = {"resolve_outputs": False}
         resp = self.client.get('/stacks/%s' % stack_id, **kwargs)
         body = utils.get_response_body(resp)
-        return Stack(self, body.get('stack'), loaded=True)
+        stack = Stack(self, body.get('stack'), loaded=True)
+        if resolve_outputs and lazy_outputs and 'outputs' not in stack._info:
+            stack._lazy_outputs = True
+        return stack
 
     def template(self, stack_id):
         """Get template content for a specific stack as a parsed JSON object.
@@ -27,13 +27,14 @@ class TemplateVersion(base.Resource):
 
 class TemplateVersionManager(base.BaseManager):
     resource_class = TemplateVersion
+    catalog_name = 'template_versions'
 
     def list(self):
         """Get a list of template versions.
 
         :rtype: list of :class:`TemplateVersion`
         """
-        return self._list('/template_versions', 'template_versions')
+        return self._cached_list('/template_versions', 'template_versions')
 
     def get(self, template_version, **kwargs):
         """Get a list of functions for a specific resource_type.
@@ -50,4 +51,29 @@ class TemplateVersionManager(base.BaseManager):
         if params:
             url_str += '?%s' % parse.urlencode(params, True)
 
-        return self._list(url_str, 'template_functions')
+        return self._cached_list(url_str, 'template_functions')
+
+    def function_names(self, template_version, with_condition_func=False):
+        """Get the names of the functions of a specific template version.
+
+        :param template_version: template version to get the functions for
+        :param with_condition_func: include the condition functions
+        :rtype: frozenset of function names
+        """
+        return frozenset(
+            f.functions for f in self.get(
+                template_version, with_condition_func=with_condition_func))
+
+    def versions_with_function(self, function, with_condition_func=False):
+        """Get the template versions which support a specific function.
+
+        With the catalog cache enabled this is answered from memory once the
+        functions of every version have been fetched.
+
+        :param function: name of the function, e.g. 'get_attr'
+        :param with_condition_func: include the condition functions
+        :rtype: list of template version names
+        """
+        return [v.version for v in self.list()
+                if function in self.function_names(
+                    v.version, with_condition_func=with_condition_func)]
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Load test of the heat client against a local fake orchestration API.
+
+Runs common operations on the stacks of a heatclient.tests.fake_heat_api
+server, from several threads, and reports the throughput and the latency of
+each API call, e.g.:
+
+    python tools/bench_heat_api.py --stacks 100 --latency 0.005 \\
+        --concurrency 8 --iterations 50
+"""
+
+import argparse
+import sys
+import time
+
+from heatclient.common import event_utils
+from heatclient.common import http as heat_http
+from heatclient.common import metrics
+from heatclient.common import utils
+from heatclient import exc
+from heatclient.tests import fake_heat_api
+from heatclient.v1 import client as v1client
+
+
+def show_stack(hc, name, args):
+    hc.stacks.get(name)
+
+
+def list_resources(hc, name, args):
+    hc.resources.list(name, nested_depth=args.nested_depth)
+
+
+def list_events(hc, name, args):
+    event_utils.get_events(hc, name, {}, nested_depth=args.nested_depth)
+
+
+def show_outputs(hc, name, args):
+    for output in hc.stacks.output_list(name)['outputs']:
+        hc.stacks.output_show(name, output['output_key'])
+
+
+OPERATIONS = (show_stack, list_resources, list_events, show_outputs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--stacks', type=int, default=20,
+                        help='number of stacks served')
+    parser.add_argument('--resources', type=int, default=10,
+                        help='number of resources of each stack')
+    parser.add_argument('--nested-depth', type=int, default=1,
+                        help='levels of nested stacks of each stack')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='seconds each request is delayed by')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='probability of a request failing')
+    parser.add_argument('--page-size', type=int, default=None,
+                        help='maximum number of items listed per request')
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help='number of threads sending requests')
+    parser.add_argument('--iterations', type=int, default=10,
+                        help='number of times the operations are run on '
+                             'each stack')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seed of the fake API random choices')
+    args = parser.parse_args()
+
+    api = fake_heat_api.FakeHeatAPI(latency=args.latency,
+                                    error_rate=args.error_rate,
+                                    seed=args.seed,
+                                    max_page_size=args.page_size)
+    api.populate(stacks=args.stacks, resources=args.resources,
+                 nested_depth=args.nested_depth)
+    request_metrics = metrics.RequestMetrics()
+    with fake_heat_api.FakeHeatServer(api) as server:
+        hc = v1client.Client(endpoint=server.endpoint, token='0' * 32)
+        heat_http.share_connections(hc.http_client, args.concurrency)
+        hc.http_client.add_request_hook(request_metrics)
+        names = [s.stack_name for s in hc.stacks.list(limit=args.stacks)]
+        work = [(operation, name) for _ in range(args.iterations)
+                for name in names for operation in OPERATIONS]
+
+        start = time.perf_counter()
+        failures = 0
+        for _item, _result, error in utils.run_concurrently(
+                lambda item: item[0](hc, item[1], args), work,
+                args.concurrency):
+            if error is not None:
+                if not isinstance(error, exc.HTTPException):
+                    raise error
+                failures += 1
+        elapsed = time.perf_counter() - start
+
+    requests = sum(row[2] for row in request_metrics.summary())
+    print('%d operations, %d failed, %d requests in %.2fs: '
+          '%.1f operations/s, %.1f requests/s' % (
+              len(work), failures, requests, elapsed, len(work) / elapsed,
+              requests / elapsed))
+    request_metrics.print_summary(sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Microbenchmark of the request path of heatclient.common.http.HTTPClient.
+
+Sends requests to a stub server on localhost over kept alive connections,
+so that the time measured is mostly spent in the client, and reports the
+best time per request with debug logging disabled and enabled, e.g.:
+
+    python tools/bench_http_client.py --requests 10000
+"""
+
+import argparse
+import http.server
+import logging
+import threading
+import time
+
+from heatclient.common import http as heat_http
+
+BODY = (b'{"stack": {"id": "0123", "stack_name": "mystack", '
+        b'"stack_status": "CREATE_COMPLETE", "outputs": []}}')
+
+
+class StubHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # the headers and body are written separately
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run(client, requests):
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get('/stacks/mystack/0123')
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=10000,
+                        help='number of requests sent in each run')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='number of runs at each log level')
+    args = parser.parse_args()
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = 'http://127.0.0.1:%d' % server.server_address[1]
+    client = heat_http.HTTPClient(endpoint, token='0' * 32,
+                                  region_name='RegionOne')
+    heat_http.share_connections(client, 1)
+
+    # debug messages are formatted, but not written anywhere
+    logger = logging.getLogger(heat_http.__name__)
+    logger.propagate = False
+    logger.addHandler(logging.NullHandler())
+    run(client, min(args.requests, 100))
+    best = {}
+    try:
+        # alternate the levels, keeping the best run of each, to limit the
+        # noise from the stub server sharing the interpreter
+        for _ in range(args.repeat):
+            for level in (logging.INFO, logging.DEBUG):
+                logger.setLevel(level)
+                elapsed = run(client, args.requests)
+                best[level] = min(elapsed, best.get(level, elapsed))
+    finally:
+        server.shutdown()
+    for level, elapsed in sorted(best.items()):
+        print('%-5s %d requests in %.2fs, %.1f us per request' % (
+            logging.getLevelName(level), args.requests, elapsed,
+            elapsed / args.requests * 1e6))
+
+
+if __name__ == '__main__':
+    main()